@@ -0,0 +1,63 @@
+"""
+Microbenchmarks of request body builders.
+
+    python -m benchmarks.builders
+"""
+
+import timeit
+
+from okie import Headers, FormURLEncodedBuilder, FormDataBuilder, MultipartBuilder
+from okie._builders import HTTPRequestFull
+
+FIELDS = [("field%d" % i, "value %d" % i) for i in range(1000)]
+FILES = [bytes(2 ** 20) for _ in range(8)]
+
+URLENCODED = FormURLEncodedBuilder()
+FORM_DATA = FormDataBuilder()
+MULTIPART = MultipartBuilder()
+
+
+def send(builder) -> int:
+    request = HTTPRequestFull("POST", b"example.com", b"/", builder)
+    request.segments
+    return builder.content_length
+
+
+def urlencoded_1k_fields():
+    URLENCODED.clean()
+    with URLENCODED:
+        for name, value in FIELDS:
+            URLENCODED.add_field(name, value)
+    send(URLENCODED)
+
+
+def form_data_1k_fields():
+    FORM_DATA.clean()
+    with FORM_DATA:
+        for name, value in FIELDS:
+            FORM_DATA.add_form_data(name, value.encode(), Headers())
+    send(FORM_DATA)
+
+
+def multipart_8_files():
+    MULTIPART.clean()
+    with MULTIPART:
+        MULTIPART.add_form_data("description", b"files", Headers())
+        for i, binary in enumerate(FILES):
+            MULTIPART.add_binary_data(
+                "file%d" % i, Headers(), binary, "%d.bin" % i, "application/octet-stream",
+            )
+    send(MULTIPART)
+
+
+BENCHMARKS = (urlencoded_1k_fields, form_data_1k_fields, multipart_8_files)
+
+
+def main(number: int = 200, repeat: int = 5):
+    for bench in BENCHMARKS:
+        best = min(timeit.repeat(bench, number=number, repeat=repeat))
+        print("{:<24} {:>10.2f} us/op".format(bench.__name__, best / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
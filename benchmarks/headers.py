@@ -0,0 +1,81 @@
+"""
+Microbenchmarks of per-request header handling.
+
+    python -m benchmarks.headers
+"""
+
+import timeit
+
+from okie import Headers
+from okie._builders import HTTPRequestFull, encode_head_prefix
+from okie.response import HTProtocol
+
+DEFAULT_HEADERS = Headers((
+    ("Accept", "application/json"),
+    ("Authorization", "Bearer 0123456789abcdef"),
+    ("X-Request-Source", "okie-benchmark"),
+))
+REQUEST_HEADERS = Headers((("X-Trace-Id", "4bf92f3577b34da6"),))
+
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Date: Mon, 27 Jul 2009 12:28:53 GMT\r\n"
+    b"Server: Apache/2.2.14 (Win32)\r\n"
+    b"Last-Modified: Wed, 22 Jul 2009 19:15:56 GMT\r\n"
+    b"Content-Type: application/json; charset=utf-8\r\n"
+    b"Cache-Control: max-age=0, private, must-revalidate\r\n"
+    b"Set-Cookie: a=1; Path=/\r\n"
+    b"Set-Cookie: b=2; Path=/\r\n"
+    b"Vary: Accept-Encoding\r\n"
+    b"X-Request-Id: 4bf92f3577b34da6a3ce929d0e0e4736\r\n"
+    b"Content-Length: 2\r\n"
+    b"\r\n"
+    b"{}"
+)
+
+
+def request_head():
+    HTTPRequestFull(
+        method="GET",
+        host=b"example.com",
+        path=b"/",
+        sub_builder=None,
+        headers=DEFAULT_HEADERS.get_merged(REQUEST_HEADERS),
+    ).head
+
+
+HEAD_PREFIX = encode_head_prefix("GET", b"example.com", b"/", DEFAULT_HEADERS)
+
+
+def template_head():
+    HTTPRequestFull(
+        method="GET",
+        host=b"example.com",
+        path=b"/",
+        sub_builder=None,
+        headers=REQUEST_HEADERS,
+        head_prefix=HEAD_PREFIX,
+    ).head
+
+
+def response_headers():
+    protocol = HTProtocol()
+    protocol.parser.feed_data(RESPONSE)
+
+
+def lookup():
+    DEFAULT_HEADERS["Authorization"]
+    DEFAULT_HEADERS["accept"]
+
+
+BENCHMARKS = (request_head, template_head, response_headers, lookup)
+
+
+def main(number: int = 20000, repeat: int = 5):
+    for bench in BENCHMARKS:
+        best = min(timeit.repeat(bench, number=number, repeat=repeat))
+        print("{:<20} {:>8.2f} us/op".format(bench.__name__, best / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
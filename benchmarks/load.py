@@ -0,0 +1,257 @@
+"""
+End-to-end benchmarks of `okie.Okie` against the local server in `benchmarks.server`.
+
+    python -m benchmarks.load --output results.json
+    python -m benchmarks.load --scenario get-fixed-1k --concurrency 1 10 --stdlib
+
+Each scenario is run at every concurrency level, reporting requests per second,
+p50/p99 latency, bytes per second (request and response bodies) and peak RSS of the process.
+`--stdlib` runs the same GET scenarios with `http.client` in a thread per concurrent
+client for comparison, `--workers N` runs all scenarios with `okie.ShardedOkie` too.
+
+!!! note
+    Peak RSS is the high-water mark of the whole process, run a single scenario
+    to see its own footprint.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+import argparse
+import asyncio
+import http.client
+import json
+import platform
+import resource
+import sys
+import threading
+import time
+
+from okie import Okie, ShardedOkie, FormDataBuilder, FormURLEncodedBuilder, MultipartBuilder, Headers
+from okie._builders.base import OkieRequestPart
+
+from .server import ServerProcess
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    path: str
+    make_builder: Optional[Callable[[], OkieRequestPart]] = None
+
+
+def urlencoded(fields: int) -> Callable[[], OkieRequestPart]:
+    def make() -> OkieRequestPart:
+        builder = FormURLEncodedBuilder()
+        for i in range(fields):
+            builder.add_field("field%d" % i, "value %d" % i)
+        builder.build()
+        return builder
+    return make
+
+
+def form_data(fields: int) -> Callable[[], OkieRequestPart]:
+    def make() -> OkieRequestPart:
+        builder = FormDataBuilder()
+        for i in range(fields):
+            builder.add_form_data("field%d" % i, b"value %d" % i, Headers())
+        builder.build()
+        return builder
+    return make
+
+
+def multipart(files: int, size: int) -> Callable[[], OkieRequestPart]:
+    def make() -> OkieRequestPart:
+        builder = MultipartBuilder()
+        for i in range(files):
+            builder.add_binary_data(
+                "file%d" % i, Headers(), b"x" * size, "file%d.bin" % i, "application/octet-stream",
+            )
+        builder.build()
+        return builder
+    return make
+
+
+SCENARIOS = [
+    Scenario("get-fixed-1k", "GET", "/fixed/1024"),
+    Scenario("get-fixed-64k", "GET", "/fixed/65536"),
+    Scenario("get-fixed-4m", "GET", "/fixed/4194304"),
+    Scenario("get-chunked-64k", "GET", "/chunked/65536"),
+    Scenario("get-close-1k", "GET", "/close/1024"),
+    Scenario("post-urlencoded-100", "POST", "/upload", urlencoded(100)),
+    Scenario("post-form-data-100", "POST", "/upload", form_data(100)),
+    Scenario("post-multipart-4x256k", "POST", "/upload", multipart(4, 2 ** 18)),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def peak_rss() -> int:
+    """
+    Peak resident set size of the process in bytes.
+    """
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def summarize(
+    client: str, scenario: Scenario, concurrency: int,
+    latencies: List[float], transferred: int, elapsed: float, errors: int,
+) -> Dict:
+    latencies.sort()
+    return {
+        "client": client,
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "bytes_per_second": transferred / elapsed,
+        "peak_rss": peak_rss(),
+    }
+
+
+async def run_okie(
+    port: int, scenario: Scenario, concurrency: int, requests: int, workers: Optional[int] = None,
+) -> Dict:
+    url = "http://127.0.0.1:%d%s" % (port, scenario.path)
+    builder = scenario.make_builder() if scenario.make_builder else None
+    sent = builder.content_length if builder is not None else 0
+    latencies: List[float] = []
+    transferred = errors = 0
+    remaining = requests
+
+    if workers:
+        okie = ShardedOkie(
+            workers=workers, timeout=60,
+            max_connections=concurrency, max_connections_per_origin=concurrency,
+        )
+        await okie.start()
+    else:
+        okie = Okie(timeout=60, max_connections=concurrency, max_connections_per_origin=concurrency)
+
+    async def worker():
+        nonlocal remaining, transferred, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await okie.request(scenario.method, url, data_builder=builder)
+            except (OSError, asyncio.TimeoutError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            transferred += sent + len(response.body)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        elapsed = time.perf_counter() - started
+        await okie.close_all()
+
+    client = "okie-x%d" % workers if workers else "okie"
+    return summarize(client, scenario, concurrency, latencies, transferred, elapsed, errors)
+
+
+def run_stdlib(port: int, scenario: Scenario, concurrency: int, requests: int) -> Dict:
+    local = threading.local()
+    lock = threading.Lock()
+    latencies: List[float] = []
+    counters = {"remaining": requests, "transferred": 0, "errors": 0}
+
+    def worker():
+        while True:
+            with lock:
+                if counters["remaining"] <= 0:
+                    return
+                counters["remaining"] -= 1
+            if getattr(local, "connection", None) is None:
+                local.connection = http.client.HTTPConnection("127.0.0.1", port)
+
+            started = time.perf_counter()
+            try:
+                local.connection.request(scenario.method, scenario.path)
+                response = local.connection.getresponse()
+                body = response.read()
+                if response.will_close:
+                    local.connection.close()
+                    local.connection = None
+            except OSError:
+                local.connection = None
+                with lock:
+                    counters["errors"] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                counters["transferred"] += len(body)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    return summarize(
+        "http.client", scenario, concurrency, latencies,
+        counters["transferred"], elapsed, counters["errors"],
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scenario", nargs="*", choices=[s.name for s in SCENARIOS])
+    parser.add_argument("--concurrency", nargs="*", type=int, default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per run")
+    parser.add_argument("--stdlib", action="store_true", help="compare with http.client in threads")
+    parser.add_argument("--workers", type=int, help="compare with ShardedOkie of N workers")
+    parser.add_argument("--output", help="write results to JSON file")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    results = []
+
+    with ServerProcess() as server:
+        for scenario in scenarios:
+            for concurrency in args.concurrency:
+                runs = [asyncio.run(run_okie(server.port, scenario, concurrency, args.requests))]
+                if args.workers:
+                    runs.append(asyncio.run(run_okie(
+                        server.port, scenario, concurrency, args.requests, args.workers,
+                    )))
+                if args.stdlib and scenario.make_builder is None:
+                    runs.append(run_stdlib(server.port, scenario, concurrency, args.requests))
+
+                for result in runs:
+                    results.append(result)
+                    print(
+                        "{client:<12} {scenario:<24} c={concurrency:<4} {requests_per_second:>9.0f} req/s "
+                        "p50={p50_ms:>7.2f}ms p99={p99_ms:>7.2f}ms {mb:>8.1f} MB/s "
+                        "rss={rss:>6.1f}MB errors={errors}".format(
+                            mb=result["bytes_per_second"] / 2 ** 20,
+                            rss=result["peak_rss"] / 2 ** 20,
+                            **result,
+                        )
+                    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "requests": args.requests,
+                "results": results,
+            }, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
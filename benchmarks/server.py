@@ -0,0 +1,116 @@
+"""
+Local stand-in HTTP/1.1 server for benchmarks.
+
+Paths:
+- `/fixed/<size>` - content-length body of `size` bytes
+- `/chunked/<size>` - chunked body of `size` bytes in 16KiB chunks
+- `/close/<size>` - content-length body, connection is closed after the response
+- anything else - reads request body, responds `ok`
+
+Request bodies are consumed and dropped.
+"""
+
+from typing import Dict, Optional
+import asyncio
+import multiprocessing
+import socket
+
+import httptools
+
+CHUNK = 2 ** 14
+
+
+def make_body(size: int) -> bytes:
+    return (b"0123456789abcdef" * (size // 16 + 1))[:size]
+
+
+def make_response(path: bytes) -> bytes:
+    kind, _, size = path.strip(b"/").partition(b"/")
+    body = make_body(int(size or 0))
+
+    if kind == b"chunked":
+        chunks = b"".join(
+            b"%x\r\n%b\r\n" % (len(body[i:i + CHUNK]), body[i:i + CHUNK])
+            for i in range(0, len(body), CHUNK)
+        )
+        return b"HTTP/1.1 200 OK\r\ntransfer-encoding: chunked\r\n\r\n%b0\r\n\r\n" % chunks
+    if kind == b"close":
+        return b"HTTP/1.1 200 OK\r\ncontent-length: %d\r\nconnection: close\r\n\r\n%b" % (
+            len(body), body,
+        )
+    if kind == b"fixed":
+        return b"HTTP/1.1 200 OK\r\ncontent-length: %d\r\n\r\n%b" % (len(body), body)
+    return b"HTTP/1.1 200 OK\r\ncontent-length: 2\r\n\r\nok"
+
+
+class BenchProtocol(asyncio.Protocol):
+    responses: Dict[bytes, bytes] = {}
+
+    def __init__(self):
+        self.transport: Optional[asyncio.Transport] = None
+        self.parser = httptools.HttpRequestParser(self)
+        self.url = b""
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        try:
+            self.parser.feed_data(data)
+        except httptools.HttpParserError:
+            self.transport.close()
+
+    def on_message_begin(self):
+        self.url = b""
+
+    def on_url(self, url: bytes):
+        self.url += url
+
+    def on_message_complete(self):
+        response = self.responses.get(self.url)
+        if response is None:
+            response = self.responses[self.url] = make_response(self.url)
+        self.transport.write(response)
+        if self.url.startswith(b"/close/"):
+            self.transport.close()
+
+
+def serve_forever(sock: socket.socket):
+    async def main():
+        server = await asyncio.get_event_loop().create_server(BenchProtocol, sock=sock)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class ServerProcess:
+    """
+    Runs the server in a separate process, so it doesn't share the loop (and the core)
+    with the measured client.
+    """
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(1024)
+        self.port = self.sock.getsockname()[1]
+        self.process = multiprocessing.Process(target=serve_forever, args=(self.sock,), daemon=True)
+
+    def __enter__(self) -> "ServerProcess":
+        self.process.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.process.terminate()
+        self.process.join()
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    with ServerProcess() as server:
+        print("serving on http://127.0.0.1:%d" % server.port)
+        server.process.join()
@@ -1,8 +1,19 @@
 from .client import Okie
+from .request import Request, MapResult
+from .template import RequestTemplate
+from .sharded import ShardedOkie
+from .sync import SyncOkie
+from .cache import ResponseCache, MemoryStorage, DiskStorage
+from .policy import HedgePolicy, RetryPolicy
+from .url import Query
+from .ctrl.trace import Tracer, Timings
+from .ctrl.limits import RateLimit
+from .ctrl.timeout import Timeout
 
 from ._builders.form_data import FormDataBuilder
 from ._builders.form_urlencoded import FormURLEncodedBuilder
 from ._builders.multipart import MultipartBuilder
+from ._builders.compressed import CompressedBuilder
 
 from .types import Headers, header_key
 from .enums.http_request import HttpRequestType
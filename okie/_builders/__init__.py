@@ -1,3 +1,3 @@
 from .base import OkieRequestPart
-from ._full import HTTPRequestFull
+from ._full import HTTPRequestFull, encode_head_prefix
 
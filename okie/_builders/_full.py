@@ -1,16 +1,44 @@
-from typing import Optional
+from typing import List, Optional, Tuple
+import asyncio
 
 from .base import OkieRequestPart
 from ..types import Headers
 from .utils import encode_headers
+from .stream import Segment, write_segments
 
 
 HTTP_USER_AGENT = "okie/0.x"
 
 
+def default_headers(host: bytes) -> Headers:
+    return Headers((
+        ("host", host.decode()),
+        ("user-agent", HTTP_USER_AGENT),
+    ))
+
+
+def encode_head_prefix(
+    method: str, host: bytes, target: bytes, headers: Optional[Headers] = None,
+) -> bytes:
+    """
+    Encode request line and headers, which don't change between requests,
+    for `HTTPRequestFull`'s `head_prefix`.
+    """
+
+    headers = default_headers(host).get_merged(headers)
+    return b"%b %b HTTP/1.1\r\n%b\r\n" % (method.encode(), target, encode_headers(headers))
+
+
 class HTTPRequestFull:
     """
     Dynamic HttpRequestFull builds a plain http request. Part of non-public API.
+
+    Request is produced as a list of segments: encoded request head followed by
+    the builder's buffers, which are written as they are without being joined.
+    Bodies of unknown length (lazy parts without size) are sent chunked.
+
+    With `head_prefix` (request line and static headers encoded in advance, see
+    `encode_head_prefix`) only `headers` and body headers are encoded per request.
     """
 
     def __init__(
@@ -20,48 +48,116 @@ class HTTPRequestFull:
         path: bytes,
         sub_builder: Optional[OkieRequestPart],
         headers: Optional[Headers] = None,
+        head_prefix: Optional[bytes] = None,
     ):
         self.host = host
         self.method = method
         self.path = path
         self.headers_data = headers
         self.sub_data = sub_builder
+        self.head_prefix = head_prefix
+        self._head: Optional[bytes] = None
 
     @property
     def begin(self) -> bytes:
         return b"%b %b HTTP/1.1" % (self.method.encode(), self.path)
 
+    @property
+    def has_body(self) -> bool:
+        return self.sub_data is not None and self.sub_data.content_length != 0
+
+    @property
+    def replayable(self) -> bool:
+        return not self.has_body or self.sub_data.replayable
+
+    @property
+    def chunked(self) -> bool:
+        return self.has_body and self.sub_data.content_length is None
+
     @property
     def headers(self) -> bytes:
-        headers = Headers((
-            ("host", self.host.decode()),
-            ("user-agent", HTTP_USER_AGENT),
-        ))
+        headers = default_headers(self.host).get_merged(self.headers_data)
+        return encode_headers(headers) + b"\r\n" + self.body_headers
+
+    @property
+    def body_headers(self) -> bytes:
+        """
+        Framing and content headers of the body, empty if there's no body.
+        """
 
-        headers = headers.get_merged(self.headers_data)
-        out = encode_headers(headers) + b"\r\n"
+        if not self.has_body:
+            return b""
 
         sub_builder = self.sub_data
-        if sub_builder is not None and sub_builder.body:
-            out += encode_headers(
-                Headers((
-                    ("content-length", str(sub_builder.content_length)),
-                    ("content-type", sub_builder.content_type),
-                ))
-            ) + b"\r\n"
+        body_headers = Headers((
+            ("transfer-encoding", "chunked")
+            if self.chunked else
+            ("content-length", str(sub_builder.content_length)),
+            ("content-type", sub_builder.content_type),
+        ))
+        if sub_builder.content_encoding:
+            body_headers["content-encoding"] = sub_builder.content_encoding
+        return encode_headers(body_headers) + b"\r\n"
 
-        return out
+    @property
+    def head(self) -> bytes:
+        """
+        Request line and headers terminated with an empty line, encoded once per request.
+        """
+
+        if self._head is None:
+            if self.head_prefix is None:
+                self._head = b"%b\r\n%b\r\n" % (self.begin, self.headers)
+            elif self.headers_data:
+                self._head = b"%b%b\r\n%b\r\n" % (
+                    self.head_prefix, encode_headers(self.headers_data), self.body_headers,
+                )
+            else:
+                self._head = b"%b%b\r\n" % (self.head_prefix, self.body_headers)
+        return self._head
+
+    @property
+    def header_fields(self) -> List[Tuple[bytes, bytes]]:
+        """
+        Lower-cased (name, value) pairs of the head's headers for HTTP/2 framing.
+        """
+
+        fields = []
+        for line in self.head.split(b"\r\n")[1:]:
+            if line:
+                name, _, value = line.partition(b":")
+                fields.append((name.strip().lower(), value.strip()))
+        return fields
 
     @property
     def body(self) -> bytes:
-        if self.sub_data is not None and self.sub_data.body:
+        if self.has_body:
             return self.sub_data.body
         return b""
 
     @property
-    def full(self):
-        return b"\r\n".join((
-            self.begin,
-            self.headers,
-            self.body,
-        )) + b"\r\n"
+    def segments(self) -> List[Segment]:
+        """
+        Get request as list of buffers for `StreamWriter.writelines`,
+        may contain lazy parts, see `write`.
+        """
+
+        if self.has_body:
+            return [self.head, *self.sub_data.segments]
+        return [self.head]
+
+    @property
+    def full(self) -> bytes:
+        return b"".join(self.segments)
+
+    async def write(self, writer: asyncio.StreamWriter):
+        """
+        Write the request reading lazy parts of the body on the way.
+        """
+
+        if not self.has_body:
+            writer.write(self.head)
+            await writer.drain()
+            return
+
+        await write_segments(writer, self.head, self.sub_data.segments, self.chunked)
@@ -1,4 +1,6 @@
-from typing import Generic, TypeVar, Optional
+from typing import Generic, TypeVar, Optional, List
+
+from .stream import LazyPart
 
 T = TypeVar("T")
 
@@ -16,9 +18,17 @@ class OkieRequestPart(Generic[T]):
         return "*/*"
 
     @property
-    def content_length(self) -> int:
+    def content_encoding(self) -> Optional[str]:
+        """
+        Get the content-encoding of the body. Default - none (identity).
+        """
+
+        return None
+
+    @property
+    def content_length(self) -> Optional[int]:
         """
-        Get the length of already built data
+        Get the length of already built data, `None` if it isn't known up front
         """
 
         return len(self.body)
@@ -31,6 +41,25 @@ class OkieRequestPart(Generic[T]):
 
         return self._body or b""
 
+    @property
+    def replayable(self) -> bool:
+        """
+        Whether the body can be sent again, e.g. by a retry. False if it has
+        lazy parts, which are read only once.
+        """
+
+        return all(
+            segment.replayable for segment in self.segments if isinstance(segment, LazyPart)
+        )
+
+    @property
+    def segments(self) -> List[bytes]:
+        """
+        Get built data as list of buffers, which are sent without joining them.
+        """
+
+        return [self.body]
+
     def build(self):
         """
         Build body.
@@ -0,0 +1,60 @@
+"""
+Growable byte buffer for builders. Part of non-public API.
+"""
+
+
+class Buffer:
+    """
+    Bytes are appended in place, clearing keeps the allocated capacity,
+    so a builder reused across requests doesn't reallocate.
+
+    Content is handed out as a `memoryview` without copying. Views, which are
+    still alive (e.g. being written to a socket), never change: the buffer moves
+    to a new bytearray instead of overwriting them.
+    """
+
+    __slots__ = ("_data", "_length", "_exported")
+
+    def __init__(self):
+        self._data = bytearray()
+        self._length = 0
+        self._exported = False
+
+    def __len__(self) -> int:
+        return self._length
+
+    def write(self, data: bytes):
+        end = self._length + len(data)
+        try:
+            # overwrites the space left by `clear` first, grows the bytearray past it
+            self._data[self._length:end] = data
+        except BufferError:
+            # bytearray can't grow while a view is alive
+            self._data = self._data[:self._length] + data
+        self._length = end
+
+    def clear(self):
+        if self._exported:
+            self._exported = False
+            try:
+                # resizing fails while a view is alive
+                self._data.append(0)
+                self._data.pop()
+            except BufferError:
+                self._data = bytearray()
+        self._length = 0
+
+    def view(self) -> memoryview:
+        """
+        Get the content without copying it.
+        """
+
+        self._exported = True
+        return memoryview(self._data)[:self._length]
+
+    def getvalue(self) -> bytes:
+        with memoryview(self._data) as view:
+            return view[:self._length].tobytes()
+
+
+__all__ = ["Buffer"]
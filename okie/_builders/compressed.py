@@ -0,0 +1,74 @@
+from typing import List, Optional
+import zlib
+
+from .base import OkieRequestPart
+from .stream import LazyPart
+
+
+class CompressedBuilder(OkieRequestPart[OkieRequestPart]):
+    """
+    Gzip-compresses body of another builder and marks it with `content-encoding: gzip`.
+    Built segments of the wrapped builder are compressed one by one without joining them.
+
+    ```python
+    with FormURLEncodedBuilder() as builder:
+        builder.add_field("key", "value")
+    await okie.request("POST", url, data_builder=CompressedBuilder(builder))
+    ```
+
+    !!! note
+        Parts which are read while the request is written (`MultipartBuilder.add_file`)
+        can't be compressed.
+    """
+
+    def __init__(self, builder: OkieRequestPart, level: int = 6):
+        self.intermediate = builder
+        self.level = level
+        self._segments: Optional[List[bytes]] = None
+
+    @property
+    def content_type(self) -> str:
+        return self.intermediate.content_type
+
+    @property
+    def content_encoding(self) -> str:
+        return "gzip"
+
+    @property
+    def segments(self) -> List[bytes]:
+        if self._segments is None:
+            # 16 + MAX_WBITS writes gzip header and trailer
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            segments = []
+            for segment in self.intermediate.segments:
+                if isinstance(segment, LazyPart):
+                    raise ValueError("Parts read while the request is written can't be compressed")
+                data = compressor.compress(segment)
+                if data:
+                    segments.append(data)
+            segments.append(compressor.flush())
+            self._segments = segments
+        return self._segments
+
+    @property
+    def content_length(self) -> int:
+        return sum(map(len, self.segments))
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(self.segments)
+
+    def build(self):
+        """
+        Build the wrapped builder and compress it again.
+        """
+
+        self.intermediate.build()
+        self._segments = None
+
+    def clean(self):
+        self.intermediate.clean()
+        self._segments = None
+
+
+__all__ = ["CompressedBuilder"]
@@ -1,10 +1,11 @@
-from typing import List
+from typing import List, Optional
 import uuid
 
 from ..types import Headers
 
 from .base import OkieRequestPart
 from .utils import encode_headers
+from .stream import LazyPart, Segment, segments_length
 
 
 def make_boundary() -> bytes:
@@ -18,6 +19,23 @@ def make_boundary() -> bytes:
     return b"%032x" % uuid.uuid4().int
 
 
+def make_form_field_head(
+    *,
+    name: str,
+    headers: Headers,
+    boundary: bytes,
+) -> bytes:
+    """
+    Delimiter and headers of a form field, its value follows as a separate segment.
+    """
+
+    return b'--%b\r\ncontent-disposition: form-data; name="%b"\r\n%b\r\n' % (
+        boundary,
+        name.encode(),
+        encode_headers(headers) + b"\r\n" if headers else b"",
+    )
+
+
 def make_form_field(
     *,
     name: str,
@@ -25,30 +43,25 @@ def make_form_field(
     headers: Headers,
     boundary: bytes,
 ) -> bytes:
-    return (
-            b"--%b\r\n"
-            b'content-disposition: form-data; name="%b"\r\n'
-            b'%b'
-            b'\r\n'
-            b"%b"
-            b"\r\n" % (
-                boundary,
-                encode_headers(headers) + b"\r\n",
-                name.encode(),
-                value
-            )
-    )
+    return b"".join((
+        make_form_field_head(name=name, headers=headers, boundary=boundary), value, b"\r\n",
+    ))
 
 
-class FormDataBuilder(OkieRequestPart[List[bytes]]):
+class FormDataBuilder(OkieRequestPart[List[Segment]]):
     """
     FormDataBuilder is superclass for multipart builder, but `okie.MultipartBuilder`
     has `add_binary_data` which is designed for bigger file-binaries.
+
+    Fields are kept as segments: encoded head of a field followed by its value as given,
+    values aren't copied. Line break closing a value is prepended to the next head.
     """
 
     def __init__(self):
         self.boundary = make_boundary()
         self.intermediate = []
+        self._segments: List[Segment] = []
+        self._content_length: Optional[int] = 0
 
     @property
     def content_type(self) -> str:
@@ -73,22 +86,65 @@ class FormDataBuilder(OkieRequestPart[List[bytes]]):
             `content-disposition` header is added by the library.
 
         """
-        self.intermediate.append(
-            make_form_field(
-                name=name,
-                value=value,
-                headers=headers,
-                boundary=self.boundary,
-            )
+        self.add_field_segments(
+            make_form_field_head(name=name, headers=headers, boundary=self.boundary),
+            value,
         )
 
+    def add_field_segments(self, head: bytes, value: Segment):
+        """
+        Append field's head and value to intermediate.
+        """
+
+        if self.intermediate:
+            head = b"\r\n" + head
+        self.intermediate.extend((head, value))
+
+    @property
+    def trailer(self) -> bytes:
+        """
+        Closing delimiter of the form.
+        """
+
+        if self.intermediate:
+            return b"\r\n--%b--\r\n\r\n" % self.boundary
+        return b"--%b--\r\n\r\n" % self.boundary
+
+    @property
+    def content_length(self) -> Optional[int]:
+        """
+        Get the length of built form, `None` if some of files are of unknown size.
+        Counted on `build`, without joining the segments.
+        """
+
+        return self._content_length
+
+    @property
+    def body(self) -> bytes:
+        """
+        Get built data joined, prefer `segments` which doesn't copy the parts.
+        Not available when there are parts read while the request is written.
+        """
+
+        if self._body is None:
+            if any(isinstance(segment, LazyPart) for segment in self._segments):
+                raise ValueError("Body has parts read while the request is written, use segments")
+            self._body = b"".join(self._segments)
+        return self._body
+
+    @property
+    def segments(self) -> List[Segment]:
+        return self._segments
+
     def build(self):
-        self._body = b"".join(
-            self.intermediate
-        ) + b"--%b--\r\n\r\n" % self.boundary
+        self._body = None
+        self._segments = [*self.intermediate, self.trailer]
+        self._content_length = segments_length(self._segments)
 
     def clean(self):
         super().clean()
+        self._segments.clear()
+        self._content_length = 0
         self.intermediate.clear()
 
 
@@ -1,13 +1,16 @@
-from typing import Dict
+from typing import Dict, List, Optional
 
 from urllib.parse import urlencode
 
 from .base import OkieRequestPart
+from .buffer import Buffer
 
 
 class FormURLEncodedBuilder(OkieRequestPart[Dict[str, str]]):
     """
-    Builder for '%-encoding' body.
+    Builder for '%-encoding' body. Fields are encoded into a growable buffer on `build`,
+    each build appends the fields added since the previous one. The buffer is sent
+    as a `memoryview` segment, `body` copies it.
 
     !!! note
         [Discussion-RFC](https://www.ietf.org/rfc/rfc1867.txt)
@@ -15,6 +18,7 @@ class FormURLEncodedBuilder(OkieRequestPart[Dict[str, str]]):
 
     def __init__(self):
         self.intermediate = {}
+        self._buffer = Buffer()
 
     @property
     def content_type(self) -> str:
@@ -37,17 +41,37 @@ class FormURLEncodedBuilder(OkieRequestPart[Dict[str, str]]):
 
         self.intermediate[name] = value
 
+    @property
+    def content_length(self) -> Optional[int]:
+        return len(self._buffer)
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = self._buffer.getvalue()
+        return self._body
+
+    @property
+    def segments(self) -> List[memoryview]:
+        return [self._buffer.view()]
+
     def build(self):
         """
         Generate data and add to an existing encoded form
         """
 
-        self._body = self.body + urlencode(self.intermediate).encode()
+        if self.intermediate:
+            if self._buffer:
+                self._buffer.write(b"&")
+            self._buffer.write(urlencode(self.intermediate).encode())
+            self.intermediate.clear()
+        self._body = None
 
     def clean(self):
         """
-        "Terminate" the current encoded form, and makes it b""
+        "Terminate" the current encoded form, and makes it b"", buffer's capacity is kept
         """
 
-        super().clean()
+        self._buffer.clear()
+        self._body = None
         self.intermediate.clear()
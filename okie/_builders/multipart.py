@@ -1,15 +1,17 @@
+from typing import Any, Optional
+
 from .utils import encode_headers
 from ..types import Headers
 
 from .form_data import FormDataBuilder
+from .stream import make_part
 
 
-def make_binary_field(
+def make_binary_field_head(
     *,
     field_name: str,
     boundary: bytes,
     headers: Headers,
-    binary: bytes,
     filename: str,
     content_type: str,
 ) -> bytes:
@@ -23,19 +25,38 @@ def make_binary_field(
         b"content-type: %b"
         b"\r\n"
         b"%b"
-        b"\r\n\r\n"
-        b"%b"
         b"\r\n" % (
             boundary,
             field_name.encode(),
             (filename or field_name).encode(),
             content_type.encode(),
-            encode_headers(headers),
-            binary,
+            encode_headers(headers) + b"\r\n" if headers else b"",
         )
     )
 
 
+def make_binary_field(
+    *,
+    field_name: str,
+    boundary: bytes,
+    headers: Headers,
+    binary: bytes,
+    filename: str,
+    content_type: str,
+) -> bytes:
+    return b"".join((
+        make_binary_field_head(
+            field_name=field_name,
+            boundary=boundary,
+            headers=headers,
+            filename=filename,
+            content_type=content_type,
+        ),
+        binary,
+        b"\r\n",
+    ))
+
+
 class MultipartBuilder(FormDataBuilder):
     """
     Similar to FormDataBuilder differs in specifying `content-type` and `filename`
@@ -58,20 +79,57 @@ class MultipartBuilder(FormDataBuilder):
         ##### Parameters
         - field_name: `str` - *field name*
         - headers: `okie.types.Headers` - *headers for field*
-        - binary: `str` - *file's binary*
+        - binary: `bytes` - *file's binary, it's sent as is without being copied*
         - filename: `str` - *name of posting file*
         - content_type: `str` - *file mime-type*
 
         """
-        self.intermediate.append(
-            make_binary_field(
+        self.add_field_segments(
+            make_binary_field_head(
                 field_name=field_name,
                 boundary=self.boundary,
                 headers=headers,
-                binary=binary,
                 filename=filename,
                 content_type=content_type,
-            )
+            ),
+            binary,
+        )
+
+    def add_file(
+        self,
+        field_name: str,
+        source: Any,
+        filename: Optional[str] = None,
+        content_type: str = "application/octet-stream",
+        headers: Optional[Headers] = None,
+        size: Optional[int] = None,
+    ):
+        """
+        Add file field which is read in chunks while the request is written.
+
+        ##### Parameters
+        - field_name: `str` - *field name*
+        - source: `(str, os.PathLike, BinaryIO, AsyncIterable[bytes])` - *path of local file,
+        binary file object or async iterable of chunks*
+        - filename: `str` - *name of posting file*
+        - content_type: `str` - *file mime-type*
+        - headers: `okie.types.Headers` - *headers for field*
+        - size: `int` - *size of the content, if it isn't known for async iterables,
+        the request body is sent chunked*
+
+        !!! note
+            Async iterables can be sent only once, files are re-read on every request.
+        """
+
+        self.add_field_segments(
+            make_binary_field_head(
+                field_name=field_name,
+                boundary=self.boundary,
+                headers=headers or Headers(),
+                filename=filename,
+                content_type=content_type,
+            ),
+            make_part(source, size),
         )
 
 
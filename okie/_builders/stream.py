@@ -0,0 +1,179 @@
+"""
+Body segments, which are read lazily while the request is written. Part of non-public API.
+"""
+
+from typing import Any, AsyncIterable, List, Optional, Union
+import asyncio
+import os
+
+CHUNK_SIZE = 2 ** 16
+"""
+Size of a single read from file or async iterable source
+"""
+
+Segment = Union[bytes, memoryview, "LazyPart"]
+
+
+class LazyPart:
+    """
+    Segment of the body which is produced while the request is written.
+    `size` is `None` if the length isn't known up front, `replayable` is false
+    if the part can be sent only once.
+    """
+
+    size: Optional[int] = None
+    replayable = True
+
+    def __len__(self) -> int:
+        if self.size is None:
+            raise TypeError("size of {} isn't known".format(type(self).__name__))
+        return self.size
+
+    async def write(self, writer: asyncio.StreamWriter, chunked: bool):
+        raise NotImplementedError
+
+
+def write_chunk(writer: asyncio.StreamWriter, data: bytes, chunked: bool):
+    if not data:
+        return
+    if chunked:
+        writer.writelines((b"%x\r\n" % len(data), data, b"\r\n"))
+    else:
+        writer.write(data)
+
+
+class FilePart(LazyPart):
+    """
+    Local file given by path or binary file object. File objects are sent from
+    the position they had when the part was made, so the part can be sent again.
+    Exactly `size` bytes are sent, `ValueError` is raised if the file ends earlier.
+    Uses `loop.sendfile` when the body isn't chunked, which falls back to reads
+    where the transport doesn't support it.
+    """
+
+    def __init__(self, source: Union[str, os.PathLike, Any], size: Optional[int] = None):
+        self.source = source
+        if isinstance(source, (str, os.PathLike)):
+            self.offset = 0
+            self.size = os.path.getsize(source) if size is None else size
+        else:
+            self.offset = source.tell() if source.seekable() else None
+            if size is None and self.offset is not None:
+                size = source.seek(0, os.SEEK_END) - self.offset
+                source.seek(self.offset)
+            self.size = size
+            # position of non-seekable file can't be restored
+            self.replayable = self.offset is not None
+
+    async def write(self, writer: asyncio.StreamWriter, chunked: bool):
+        if isinstance(self.source, (str, os.PathLike)):
+            with open(self.source, "rb") as file:
+                await self._write_file(file, writer, chunked)
+        else:
+            await self._write_file(self.source, writer, chunked)
+
+    async def _write_file(self, file: Any, writer: asyncio.StreamWriter, chunked: bool):
+        loop = asyncio.get_event_loop()
+        if self.offset is not None:
+            file.seek(self.offset)
+
+        # HTTP/2 streams have no transport of their own to sendfile into
+        if not chunked and self.offset is not None and writer.transport is not None:
+            await writer.drain()
+            sent = await loop.sendfile(writer.transport, file, self.offset, self.size)
+            self._check_sent(sent)
+            return
+
+        sent = 0
+        while self.size is None or sent < self.size:
+            count = CHUNK_SIZE if self.size is None else min(CHUNK_SIZE, self.size - sent)
+            data = await loop.run_in_executor(None, file.read, count)
+            if not data:
+                break
+            sent += len(data)
+            write_chunk(writer, data, chunked)
+            await writer.drain()
+        self._check_sent(sent)
+
+    def _check_sent(self, sent: int):
+        # the rest of the body would be taken for the missing bytes
+        if self.size is not None and sent < self.size:
+            raise ValueError(
+                "file ended after {} of {} bytes of the part".format(sent, self.size)
+            )
+
+
+class AsyncIterablePart(LazyPart):
+    """
+    Chunks of async iterable source. Can be sent only once.
+    """
+
+    replayable = False
+
+    def __init__(self, source: AsyncIterable[bytes], size: Optional[int] = None):
+        self.source = source
+        self.size = size
+
+    async def write(self, writer: asyncio.StreamWriter, chunked: bool):
+        async for data in self.source:
+            write_chunk(writer, data, chunked)
+            await writer.drain()
+
+
+def make_part(source: Any, size: Optional[int] = None) -> LazyPart:
+    """
+    Make lazy part of path, binary file object or async iterable of bytes.
+    """
+
+    if hasattr(source, "__aiter__"):
+        return AsyncIterablePart(source, size)
+    return FilePart(source, size)
+
+
+def segments_length(segments: List[Segment]) -> Optional[int]:
+    """
+    Get the total length of segments, `None` if any of lazy parts has unknown size.
+    """
+
+    total = 0
+    for segment in segments:
+        if isinstance(segment, LazyPart):
+            if segment.size is None:
+                return None
+            total += segment.size
+        else:
+            total += len(segment)
+    return total
+
+
+async def write_segments(
+    writer: asyncio.StreamWriter,
+    head: bytes,
+    segments: List[Segment],
+    chunked: bool,
+):
+    """
+    Write request head and body segments in order, buffers which precede lazy parts
+    are flushed with a single `writelines`. Chunked body is terminated with the last
+    (empty) chunk.
+    """
+
+    pending: List[bytes] = [head]
+    for segment in segments:
+        if not isinstance(segment, LazyPart):
+            if chunked and segment:
+                pending.extend((b"%x\r\n" % len(segment), segment, b"\r\n"))
+            else:
+                pending.append(segment)
+            continue
+
+        if pending:
+            writer.writelines(pending)
+            pending = []
+        await segment.write(writer, chunked)
+
+    if chunked:
+        pending.append(b"0\r\n\r\n")
+    if pending:
+        writer.writelines(pending)
+    await writer.drain()
@@ -0,0 +1,554 @@
+"""
+Private HTTP cache of GET responses (RFC 9111) with pluggable storage.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+import asyncio
+import hashlib
+import os
+import pickle
+import time
+
+from .types import Headers
+from .response import Response, RawHeaders
+from .ctrl.loop import Coalescer
+
+DEFAULT_CACHE_SIZE = 64 * 2 ** 20
+"""
+Default bound of stored bytes
+"""
+
+CACHEABLE_STATUSES = frozenset((200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501))
+"""
+Statuses cacheable by default, freshness of which may be estimated heuristically
+"""
+
+HEURISTIC_FRACTION = 0.1
+"""
+Fraction of the time since `Last-Modified` a response without explicit freshness is fresh for
+"""
+
+# not taken from 304 responses when cached entry is refreshed
+_BODY_HEADERS = frozenset((b"content-length", b"content-encoding", b"transfer-encoding", b"content-type"))
+
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+"""
+Request headers, concurrent requests with different values of which never share a response
+"""
+
+AUTHORIZED_CACHE_DIRECTIVES = frozenset(("public", "s-maxage"))
+"""
+Response directives, which allow storing a response to a request with `Authorization`
+"""
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse `Cache-Control` into lower-cased directives mapped to their arguments.
+    """
+
+    directives = {}
+    if not value:
+        return directives
+    for directive in value.split(","):
+        name, _, argument = directive.partition("=")
+        name = name.strip().lower()
+        if name:
+            directives[name] = argument.strip().strip('"') or None
+    return directives
+
+
+def _parse_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _vary(headers: Headers) -> List[str]:
+    return [name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()]
+
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(0, int(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class CacheEntry:
+    """
+    Stored response and the times it was requested and received at (`time.time()`).
+    `vary` holds values of request headers the response varies on.
+    """
+
+    __slots__ = (
+        "status_code", "status", "raw_headers", "body", "request_time", "response_time",
+        "vary", "_headers",
+    )
+
+    def __init__(
+        self,
+        status_code: int,
+        status: Optional[str],
+        raw_headers: RawHeaders,
+        body: Any,
+        request_time: float,
+        response_time: float,
+        vary: Tuple[Tuple[str, Optional[str]], ...] = (),
+    ):
+        self.status_code = status_code
+        self.status = status
+        self.raw_headers = raw_headers
+        self.body = body
+        self.request_time = request_time
+        self.response_time = response_time
+        self.vary = vary
+        self._headers: Optional[Headers] = None
+
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            headers = self._headers = Headers()
+            for name, value in self.raw_headers:
+                headers.add(name.decode("latin-1"), value.decode("latin-1"))
+        return self._headers
+
+    @property
+    def size(self) -> int:
+        """
+        Approximate count of bytes the entry takes.
+        """
+
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.raw_headers) + 256
+
+    def freshness_lifetime(self) -> float:
+        headers = self.headers
+        cache_control = parse_cache_control(headers.get("cache-control"))
+        max_age = _seconds(cache_control.get("max-age"))
+        if max_age is not None:
+            return max_age
+
+        date = _parse_date(headers.get("date")) or self.response_time
+        if "expires" in headers:
+            expires = _parse_date(headers["expires"])
+            # invalid dates mean already expired
+            return max(0.0, expires - date) if expires is not None else 0.0
+
+        last_modified = _parse_date(headers.get("last-modified"))
+        if last_modified is not None and self.status_code in CACHEABLE_STATUSES:
+            return max(0.0, (date - last_modified) * HEURISTIC_FRACTION)
+        return 0.0
+
+    def current_age(self, now: float) -> float:
+        headers = self.headers
+        date = _parse_date(headers.get("date"))
+        apparent_age = max(0.0, self.response_time - date) if date is not None else 0.0
+        age = _seconds(headers.get("age")) or 0
+        response_delay = self.response_time - self.request_time
+        return max(apparent_age, age + response_delay) + now - self.response_time
+
+    def is_fresh(self, now: float) -> bool:
+        if "no-cache" in parse_cache_control(self.headers.get("cache-control")):
+            return False
+        return self.freshness_lifetime() > self.current_age(now)
+
+    def validators(self) -> Headers:
+        """
+        Conditional request headers to revalidate the entry with.
+        """
+
+        conditional = Headers()
+        if "etag" in self.headers:
+            conditional["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            conditional["If-Modified-Since"] = self.headers["last-modified"]
+        return conditional
+
+    def refresh(self, response: Response, request_time: float, response_time: float):
+        """
+        Update the entry with headers of 304 response.
+        """
+
+        fresh = {name.lower() for name, _ in response.raw_headers} - _BODY_HEADERS
+        self.raw_headers = [
+            (name, value) for name, value in self.raw_headers if name.lower() not in fresh
+        ] + [(name, value) for name, value in response.raw_headers if name.lower() in fresh]
+        self.request_time = request_time
+        self.response_time = response_time
+        self._headers = None
+
+    def to_response(self, url: Optional[str] = None) -> Response:
+        response = Response()
+        response.url = url
+        response.status_code = self.status_code
+        response.status = self.status
+        response._raw_headers = list(self.raw_headers)
+        response.body = self.body
+        response.closed = True
+        return response
+
+
+class CacheStorage:
+    """
+    Storage interface, implementations bound their size and evict entries themselves.
+    Methods are coroutines, so storages can do blocking I/O off the event loop.
+    """
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    async def put(self, key: str, entry: CacheEntry):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+
+class MemoryStorage(CacheStorage):
+    """
+    Least recently used entries are evicted once `max_bytes` is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        self.size = 0
+        # entries are refreshed in place, so their size is kept as it was stored
+        self._entries: "OrderedDict[str, Tuple[CacheEntry, int]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        self._entries.move_to_end(key)
+        return item[0]
+
+    async def put(self, key: str, entry: CacheEntry):
+        self._forget(key)
+        size = entry.size
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (entry, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def _forget(self, key: str):
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self.size -= item[1]
+
+    async def delete(self, key: str):
+        self._forget(key)
+
+    async def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+
+class DiskStorage(CacheStorage):
+    """
+    Entries stored in `directory` a file each, pickled metadata followed by the body.
+    Entries found in the directory are picked up, the least recently modified are
+    evicted first.
+
+    !!! note
+        Files are read and written on a thread of the storage in order of the calls,
+        an entry is written to a temporary file, which replaces the stored one, so it's
+        never read half-written. Entries, which can't be read, are cache misses,
+        ones, which can't be written, aren't stored.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="okie-cache")
+
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".tmp"):
+                # left by an interrupted write
+                _unlink(path)
+            elif name.endswith(".entry"):
+                try:
+                    entries.append((os.path.getmtime(path), name, os.path.getsize(path)))
+                except OSError:
+                    continue
+        for _, name, size in sorted(entries):
+            self._sizes[name[:-len(".entry")]] = size
+            self.size += size
+        for digest in self._evicted():
+            _unlink(self._path(digest))
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest + ".entry")
+
+    def _run(self, function: Callable, *args) -> Awaitable:
+        return asyncio.get_event_loop().run_in_executor(self._executor, function, *args)
+
+    def _forget(self, digest: str):
+        size = self._sizes.pop(digest, None)
+        if size is not None:
+            self.size -= size
+
+    def _evicted(self) -> List[str]:
+        evicted = []
+        while self.size > self.max_bytes and self._sizes:
+            digest, size = self._sizes.popitem(last=False)
+            self.size -= size
+            evicted.append(digest)
+        return evicted
+
+    def _read(self, digest: str) -> Optional[Tuple[str, Dict[str, Any], bytes]]:
+        try:
+            with open(self._path(digest), "rb") as file:
+                stored_key, state = pickle.load(file)
+                return stored_key, state, file.read()
+        except Exception:
+            # missing, truncated or otherwise broken entry
+            return None
+
+    def _write(self, digest: str, key: str, state: Dict[str, Any], body: bytes) -> Optional[int]:
+        path = self._path(digest)
+        try:
+            with open(path + ".tmp", "wb") as file:
+                pickle.dump((key, state), file)
+                file.write(body)
+                size = file.tell()
+            os.replace(path + ".tmp", path)
+        except OSError:
+            _unlink(path + ".tmp")
+            return None
+        return size
+
+    def _remove(self, digests: List[str]):
+        for digest in digests:
+            _unlink(self._path(digest))
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        digest = self._digest(key)
+        if digest not in self._sizes:
+            return None
+
+        item = await self._run(self._read, digest)
+        if item is None:
+            await self.delete(key)
+            return None
+        stored_key, state, body = item
+        if stored_key != key:
+            return None
+
+        if digest in self._sizes:
+            self._sizes.move_to_end(digest)
+        return CacheEntry(body=body, **state)
+
+    async def put(self, key: str, entry: CacheEntry):
+        digest = self._digest(key)
+        self._forget(digest)
+        if len(entry.body) + 256 > self.max_bytes:
+            await self._run(self._remove, [digest])
+            return
+
+        state = dict(
+            status_code=entry.status_code,
+            status=entry.status,
+            raw_headers=entry.raw_headers,
+            request_time=entry.request_time,
+            response_time=entry.response_time,
+            vary=entry.vary,
+        )
+        size = await self._run(self._write, digest, key, state, entry.body)
+        if size is None:
+            return
+
+        # concurrent put of the same key may have been accounted meanwhile
+        self._forget(digest)
+        self._sizes[digest] = size
+        self.size += size
+        evicted = self._evicted()
+        if evicted:
+            await self._run(self._remove, evicted)
+
+    async def delete(self, key: str):
+        digest = self._digest(key)
+        self._forget(digest)
+        await self._run(self._remove, [digest])
+
+    async def clear(self):
+        digests = list(self._sizes)
+        self._sizes.clear()
+        self.size = 0
+        await self._run(self._remove, digests)
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class ResponseCache:
+    """
+    Private cache in front of `okie.Okie.request` for GET requests without body.
+
+    - fresh responses are served without a request, freshness is taken from
+    `Cache-Control: max-age`, `Expires` or estimated from `Last-Modified`
+    - stale responses with `ETag`/`Last-Modified` are revalidated with a conditional
+    request, `304 Not Modified` is answered with the stored response
+    - concurrent requests for the same URL and credentials (`Authorization`, `Cookie`)
+    share one request, unless the response varies on headers they differ in
+    - `no-store` and `no-cache` directives of requests and responses are respected,
+    `Vary` is matched against request headers
+    - responses to requests with `Authorization` are stored only if they're
+    `public` or have `s-maxage` (RFC 9111 section 3.5)
+
+    ```python
+    okie = Okie(timeout=5, cache=ResponseCache(DiskStorage("/tmp/okie-cache")))
+    ```
+    """
+
+    def __init__(self, storage: Optional[CacheStorage] = None):
+        self.storage = storage or MemoryStorage()
+        self._in_flight: Coalescer[Tuple[Optional[str], ...], Tuple[Response, Headers]] = Coalescer()
+
+    async def lookup(self, key: str, headers: Headers) -> Optional[CacheEntry]:
+        entry = await self.storage.get(key)
+        if entry is None:
+            return None
+        if any(headers.get(name) != value for name, value in entry.vary):
+            return None
+        return entry
+
+    async def _store(self, key: str, response: Response, headers: Headers, request_time: float):
+        response_headers = response.headers or Headers()
+        cache_control = parse_cache_control(response_headers.get("cache-control"))
+        vary = _vary(response_headers)
+        if (
+            response.status_code not in CACHEABLE_STATUSES
+            or "no-store" in cache_control
+            or "*" in vary
+            or "authorization" in headers and not AUTHORIZED_CACHE_DIRECTIVES & cache_control.keys()
+        ):
+            await self.storage.delete(key)
+            return
+
+        entry = CacheEntry(
+            response.status_code,
+            response.status,
+            list(response.raw_headers),
+            bytes(response.body or b""),
+            request_time,
+            time.time(),
+            tuple((name, headers.get(name)) for name in vary),
+        )
+        if entry.freshness_lifetime() or "etag" in entry.headers or "last-modified" in entry.headers:
+            await self.storage.put(key, entry)
+
+    async def _fetch(
+        self,
+        key: str,
+        url: str,
+        headers: Headers,
+        send: Callable[[Optional[Headers]], Awaitable[Response]],
+    ) -> Response:
+        entry = await self.lookup(key, headers)
+        request_time = time.time()
+        if entry is None:
+            response = await send(None)
+        else:
+            response = await send(entry.validators())
+
+        if response.status_code == 304 and entry is not None:
+            entry.refresh(response, request_time, time.time())
+            await self.storage.put(key, entry)
+            return entry.to_response(url)
+
+        await self._store(key, response, headers, request_time)
+        return response
+
+    async def _fetch_shared(
+        self,
+        key: str,
+        url: str,
+        headers: Headers,
+        send: Callable[[Optional[Headers]], Awaitable[Response]],
+    ) -> Tuple[Response, Headers]:
+        return await self._fetch(key, url, headers, send), headers
+
+    async def fetch(
+        self,
+        key: str,
+        url: str,
+        headers: Headers,
+        send: Callable[[Optional[Headers]], Awaitable[Response]],
+    ) -> Response:
+        """
+        Get response for the request from the cache or with `send`, which is given
+        conditional headers to add to the request if the stored response is revalidated.
+
+        ##### Parameters
+        - key `str` *URL with query*
+        - url `str` *URL of the request*
+        - headers `okie.Headers` *headers of the request*
+        - send *makes the request*
+
+        ##### Returns
+        - `okie.response.Response`
+        """
+
+        cache_control = parse_cache_control(headers.get("cache-control"))
+        if "no-store" in cache_control:
+            return await send(None)
+
+        if "no-cache" not in cache_control:
+            entry = await self.lookup(key, headers)
+            if entry is not None:
+                now = time.time()
+                max_age = _seconds(cache_control.get("max-age"))
+                if entry.is_fresh(now) and (max_age is None or entry.current_age(now) <= max_age):
+                    return entry.to_response(url)
+
+        flight_key = (key,) + tuple(headers.get(name) for name in CREDENTIAL_HEADERS)
+        response, sent_headers = await self._in_flight.run(
+            flight_key, lambda: self._fetch_shared(key, url, headers, send),
+        )
+        response = _copy(response)
+        if sent_headers is headers:
+            return response
+
+        vary = _vary(response.headers or Headers())
+        if "*" in vary or any(headers.get(name) != sent_headers.get(name) for name in vary):
+            # shared response is a variant for other request headers
+            return await self._fetch(key, url, headers, send)
+        return response
+
+
+def _copy(response: Response) -> Response:
+    copy = Response()
+    for slot in Response.__slots__:
+        setattr(copy, slot, getattr(response, slot))
+    return copy
+
+
+__all__ = [
+    "ResponseCache", "CacheStorage", "MemoryStorage", "DiskStorage", "CacheEntry",
+    "parse_cache_control",
+]
@@ -1,13 +1,49 @@
-from typing import Optional, Union
-
-import httptools
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List,
+    Mapping, Optional, Set, Union,
+)
+from collections import deque
+import asyncio as _asyncio
+import ssl
 
 from .ctrl import asyncio
-from ._builders import OkieRequestPart, HTTPRequestFull
+from .ctrl.resolver import Resolver
+from .ctrl.http2 import Http2Connection, Http2Stream
+from .ctrl.limits import RateLimit
+from .ctrl.trace import Timings, Tracer, clock
+from .ctrl.timeout import Timeout, TimeoutType, make_timeout, deadline
+from ._builders import OkieRequestPart, HTTPRequestFull, encode_head_prefix
 from .types import Headers
-from .response import HTProtocol, Response
+from .encoding import ACCEPT_ENCODING
+from .request import Request, MapResult, IDEMPOTENT_METHODS
+from .response import HTProtocol, Response, BodyStream, Http2BodyStream, PipelineProtocol
+from .template import RequestTemplate
+from .cache import ResponseCache
+from .policy import HedgePolicy, RetryPolicy
+from .url import ParsedURL, ParamsType, parse_url, with_query
 from .enums.http_request import HttpRequestType
 
+PIPELINED_METHODS = IDEMPOTENT_METHODS - {HttpRequestType.HEAD}
+"""
+Methods sent pipelined by `Okie.request_many`
+"""
+
+DEFAULT_MAP_CONCURRENCY = 10
+
+
+def _discard_attempt(task: _asyncio.Future):
+    # response of the losing attempt may have been ready before it got cancelled
+    if not task.cancelled() and task.exception() is None:
+        task.result().discard()
+
+
+def cache_key(url: str, params: ParamsType) -> str:
+    """
+    Key of the request in `Okie.cache`, URL with query parameters.
+    """
+
+    return url if not params else with_query(url.encode(), params).decode()
+
 
 class Okie(asyncio.AsyncioConnectionController):
     # Current Okie requester uses okie.ctrl.asyncio connection manager
@@ -15,17 +51,77 @@ class Okie(asyncio.AsyncioConnectionController):
 
     def __init__(
         self,
-        timeout: float,
+        timeout: TimeoutType,
         ssl_handshake_timeout: Optional[float] = None,
         headers: Optional[Headers] = None,
+        max_connections: int = asyncio.DEFAULT_MAX_CONNECTIONS,
+        max_connections_per_origin: int = asyncio.DEFAULT_MAX_CONNECTIONS_PER_ORIGIN,
+        max_idle_connections: int = asyncio.DEFAULT_MAX_IDLE_CONNECTIONS,
+        keepalive_timeout: Optional[float] = asyncio.DEFAULT_KEEPALIVE_TIMEOUT,
+        max_connection_lifetime: Optional[float] = None,
+        max_connection_requests: Optional[int] = None,
+        resolver: Optional[Resolver] = None,
+        happy_eyeballs_delay: Optional[float] = asyncio.DEFAULT_HAPPY_EYEBALLS_DELAY,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        decompress: bool = False,
+        tracer: Optional[Tracer] = None,
+        cache: Optional[ResponseCache] = None,
+        http2: bool = False,
+        http2_prior_knowledge: bool = False,
+        hedge: Optional[HedgePolicy] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limits: Optional[Mapping[str, RateLimit]] = None,
+        default_rate_limit: Optional[RateLimit] = None,
     ):
         # initialize controllers
         asyncio.AsyncioConnectionController.__init__(
-            self, ssl_handshake_timeout=ssl_handshake_timeout
+            self,
+            ssl_handshake_timeout=ssl_handshake_timeout,
+            max_connections=max_connections,
+            max_connections_per_origin=max_connections_per_origin,
+            max_idle_connections=max_idle_connections,
+            keepalive_timeout=keepalive_timeout,
+            max_connection_lifetime=max_connection_lifetime,
+            max_connection_requests=max_connection_requests,
+            resolver=resolver,
+            happy_eyeballs_delay=happy_eyeballs_delay,
+            ssl_context=ssl_context,
+            tracer=tracer,
+            http2=http2,
+            http2_prior_knowledge=http2_prior_knowledge,
+            rate_limits={
+                parse_url(origin).origin: limit for origin, limit in (rate_limits or {}).items()
+            },
+            default_rate_limit=default_rate_limit,
         )
 
         self.timeout = timeout
         self.default_headers = headers or Headers()
+        self.cache = cache
+        self.hedge = hedge
+        self.retry = retry
+
+        # negotiate content-encoding and decode bodies as they're received
+        self.decompress = decompress
+        if decompress and "accept-encoding" not in self.default_headers:
+            self.default_headers = Headers(self.default_headers)
+            self.default_headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+    def _plain_request(
+        self,
+        method: Union[str, HttpRequestType],
+        url: ParsedURL,
+        data_builder: Optional[OkieRequestPart],
+        headers: Optional[Headers],
+        params: ParamsType = None,
+    ) -> HTTPRequestFull:
+        return HTTPRequestFull(
+            method=str(HttpRequestType(method).value),
+            host=url.host,
+            path=with_query(url.target, params) if params else url.target,
+            sub_builder=data_builder,
+            headers=self.default_headers.get_merged(headers),
+        )
 
     async def _request(
         self,
@@ -33,44 +129,338 @@ class Okie(asyncio.AsyncioConnectionController):
         url: str,
         data_builder: Optional[OkieRequestPart] = None,
         headers: Optional[Headers] = None,
+        params: ParamsType = None,
+        stream: bool = False,
+        timeout: Optional[Timeout] = None,
     ) -> Response:
-        url: httptools.parser.URL = httptools.parse_url(url.encode())
-
-        async with self.make_connection(
-            url.host,
-            url.port,
-            url.schema.startswith(b"https") if url.schema else False
-        ) as stream:  # type: asyncio.AsyncioStreamType
-            r, w = stream
-            method = HttpRequestType(method)
-            plain_request = HTTPRequestFull(
-                method=str(method.value),
-                host=url.host,
-                path=url.path,
-                sub_builder=data_builder,
-                headers=self.default_headers.get_merged(headers),
+        parsed_url = parse_url(url)
+        plain_request = self._plain_request(method, parsed_url, data_builder, headers, params)
+        timeout = timeout or make_timeout(self.timeout)
+        return await self._send_with_policies(
+            HttpRequestType(method), url, parsed_url, plain_request, stream, timeout,
+        )
+
+    async def _send_with_policies(
+        self,
+        method: HttpRequestType,
+        url: str,
+        parsed_url: ParsedURL,
+        plain_request: HTTPRequestFull,
+        stream: bool,
+        timeout: Timeout,
+    ) -> Response:
+        """
+        Send the request, hedged per `Okie.hedge` and retried per `Okie.retry`.
+        Requests with body, which can be sent only once, are sent once.
+        """
+
+        hedge = self.hedge if self.hedge is not None and method in self.hedge.methods else None
+        retry = self.retry if self.retry is not None and method in self.retry.methods else None
+        if hedge is None and retry is None or not plain_request.replayable:
+            return await self._send(url, parsed_url, plain_request, stream, timeout, Timings())
+
+        async def attempt() -> Response:
+            return await self._send(url, parsed_url, plain_request, stream, timeout, Timings())
+
+        retried = 0
+        while True:
+            try:
+                response = await (attempt() if hedge is None else self._hedged(hedge, attempt))
+            except Exception as exc:
+                if retry is None:
+                    raise
+                retry.on_failure()
+                if not retry.can_retry(retried, exc):
+                    raise
+                await _asyncio.sleep(retry.backoff_delay(retried))
+                retried += 1
+                continue
+
+            if retry is not None:
+                retry.on_success()
+            return response
+
+    @staticmethod
+    async def _hedged(hedge: HedgePolicy, attempt: Callable[[], Awaitable[Response]]) -> Response:
+        """
+        Start the second attempt if the first one isn't done within hedge delay,
+        return the first successful response. The other attempt is cancelled,
+        so its connection is closed.
+        """
+
+        async def timed() -> Response:
+            started = clock()
+            response = await attempt()
+            hedge.latencies.record(clock() - started)
+            return response
+
+        attempts = [_asyncio.ensure_future(timed())]
+        winner = None
+        try:
+            done, pending = await _asyncio.wait(attempts, timeout=hedge.hedge_delay())
+            if not done:
+                attempts.append(_asyncio.ensure_future(timed()))
+                pending = set(attempts)
+
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await _asyncio.wait(pending, return_when=_asyncio.FIRST_COMPLETED)
+        finally:
+            for task in attempts:
+                if task is not winner:
+                    task.cancel()
+                    task.add_done_callback(_discard_attempt)
+
+    async def _send(
+        self,
+        url: str,
+        parsed_url: ParsedURL,
+        plain_request: HTTPRequestFull,
+        stream: bool,
+        timeout: Timeout,
+        timings: Timings,
+    ) -> Response:
+        tracer = self._tracer
+        try:
+            connection = await (self.acquire_http2 if self._http2 else self.acquire_connection)(
+                parsed_url.host, parsed_url.port, parsed_url.ssl,
+                timings=timings, origin=parsed_url.origin,
+                pool_timeout=timeout.pool, connect_timeout=timeout.connect,
+            )
+            if isinstance(connection, Http2Connection):
+                h2_stream = await self._write_http2(connection, plain_request, timeout)
+            else:
+                try:
+                    with deadline(timeout.write):
+                        await plain_request.write(connection.writer)
+                except BaseException:
+                    self.release_connection(connection)
+                    raise
+        except BaseException as exc:
+            if tracer is not None:
+                tracer.on_error(url, exc)
+            raise
+
+        timings.sent = clock()
+        if tracer is not None:
+            tracer.on_request_sent(plain_request.method, url)
+
+        # the response is read by the stream, which releases the connection (or HTTP/2 stream)
+        method = plain_request.method.encode()
+        if isinstance(connection, Http2Connection):
+            body_stream = Http2BodyStream(h2_stream, method, self.decompress, tracer, timeout.read)
+            response = body_stream.response
+        else:
+            pc = HTProtocol(method, decompress=self.decompress)
+            body_stream = BodyStream(connection, pc, self.release_connection, tracer, timeout.read)
+            response = pc.response
+        response.url = url
+        response.timings = timings
+        response._stream = body_stream
+        await body_stream.read_head()
+        if parsed_url.origin in self._limiters:
+            self.observe_response(
+                parsed_url.origin,
+                response.status_code,
+                response.headers.get("retry-after") if response.headers else None,
+            )
+        if not stream:
+            await response.read()
+        return response
+
+    @staticmethod
+    async def _write_http2(
+        connection: Http2Connection, plain_request: HTTPRequestFull, timeout: Timeout,
+    ) -> Http2Stream:
+        with deadline(timeout.write):
+            h2_stream = await connection.request(
+                plain_request.method.encode(), plain_request.path, plain_request.header_fields,
+                end_stream=not plain_request.has_body,
+            )
+            try:
+                if plain_request.has_body:
+                    await connection.send_body(h2_stream, plain_request.sub_data.segments)
+            except BaseException:
+                h2_stream.close()
+                raise
+        return h2_stream
+
+    async def _pipeline(
+        self, requests: List[Request], timeout: Timeout,
+    ) -> List[Optional[Response]]:
+        """
+        Write requests back to back on one connection and read responses in order.
+        Returns `None` for requests, which weren't answered before the connection was closed
+        or reset.
+        """
+
+        timings = Timings()
+        url = parse_url(requests[0].url)
+        connection = await self.acquire_connection(
+            url.host, url.port, url.ssl, timings=timings, origin=url.origin,
+            pool_timeout=timeout.pool, connect_timeout=timeout.connect,
+        )
+        try:
+            plain_requests = [
+                self._plain_request(
+                    request.method,
+                    parse_url(request.url),
+                    request.data_builder,
+                    request.headers,
+                    request.params,
+                )
+                for request in requests
+            ]
+            pipeline = PipelineProtocol(
+                [r.method.encode() for r in plain_requests], self.decompress
+            )
+
+            async def write_all():
+                try:
+                    with deadline(timeout.write):
+                        for plain_request in plain_requests:
+                            await plain_request.write(connection.writer)
+                    timings.sent = clock()
+                except ConnectionError:
+                    # server closed mid-pipeline, unanswered requests are sent again
+                    pass
+                except BaseException:
+                    # unblock the reader
+                    connection.close()
+                    raise
+
+            writing = _asyncio.ensure_future(write_all())
+            reset = False
+            try:
+                await pipeline.read(connection.reader, timeout.read)
+            except ConnectionError:
+                # reset mid-pipeline, unanswered requests are sent again as after EOF
+                reset = True
+            finally:
+                if not writing.done():
+                    writing.cancel()
+                try:
+                    await writing
+                except _asyncio.CancelledError:
+                    pass
+
+            last = pipeline.protocols[-1]
+            connection.reusable = not reset and pipeline.complete and last.keep_alive
+        finally:
+            self.release_connection(connection)
+
+        timings.completed = clock()
+        answered = []
+        for request, pc in zip(requests, pipeline.protocols):
+            response = pc.response
+            if not response.closed:
+                answered.append(None)
+                continue
+            response.url = request.url
+            response.timings = timings
+            answered.append(response)
+        return answered
+
+    async def _request_many(
+        self, requests: List[Request], connections: int, timeout: Timeout,
+    ) -> List[Response]:
+        responses: List[Optional[Response]] = [None] * len(requests)
+        pipelines: Dict[asyncio.Origin, List[int]] = {}
+        jobs = []
+
+        async def send(index: int):
+            responses[index] = await self._send_request(requests[index], timeout)
+
+        async def pipeline(indexes: List[int]):
+            answered = await self._pipeline([requests[i] for i in indexes], timeout)
+            for index, response in zip(indexes, answered):
+                responses[index] = response
+            for index, response in zip(indexes, answered):
+                if response is None:
+                    await send(index)
+
+        for index, request in enumerate(requests):
+            origin = parse_url(request.url).origin
+            if (
+                HttpRequestType(request.method) not in PIPELINED_METHODS
+                or self._http2 and origin not in self._http1_origins
+                or origin in self._limiters or self._default_rate_limit is not None
+                or request.data_builder is not None and not request.data_builder.replayable
+                or self._cacheable(request.method, request.data_builder)
+            ):
+                # HTTP/2 streams are concurrent anyway, rate limits admit requests one by one,
+                # one-shot bodies can't be sent again if the pipeline is cut,
+                # GETs go through the cache when it's set
+                jobs.append(send(index))
+                continue
+            pipelines.setdefault(origin, []).append(index)
+
+        for indexes in pipelines.values():
+            size = -(-len(indexes) // connections)
+            jobs.extend(
+                pipeline(indexes[start:start + size])
+                for start in range(0, len(indexes), size)
             )
-            w.write(plain_request.full)
 
-            await w.drain()
+        await _asyncio.gather(*jobs)
+        return responses
+
+    def prepare(
+        self,
+        method: Union[str, HttpRequestType],
+        url: str,
+        headers: Optional[Headers] = None,
+        params: ParamsType = None,
+    ) -> RequestTemplate:
+        """
+        Make template for repeated requests to the same endpoint: URL is parsed
+        and request line with `self.default_headers` merged with `headers` is encoded once.
+
+        ##### Parameters
+        - method `(str, okie.HTTPRequestType)` *HTTP request type*
+        - url `str` *resource identifier*
+        - headers `okie.Headers` *headers sent with every request of the template*
+        - params `(Mapping, Iterable[Tuple[str, Any]], okie.Query)` *query parameters appended to the URL*
 
-            pc = HTProtocol()
-            parser = httptools.parser.HttpResponseParser(pc)
+        ##### Returns
+        - `okie.template.RequestTemplate`
 
-            # feed headers
-            parser.feed_data(await r.readuntil(b"\r\n\r\n"))
-            # feed the rest body
-            parser.feed_data(await r.readexactly(len(pc.response)))
+        !!! note
+            Headers are encoded when the template is made,
+            later changes of `self.default_headers` don't apply to it.
+        """
 
-            return pc.response
+        method = str(HttpRequestType(method).value)
+        parsed_url = parse_url(url)
+        if params:
+            parsed_url = parsed_url._replace(target=with_query(parsed_url.target, params))
+        headers = self.default_headers.get_merged(headers)
+        return RequestTemplate(
+            self,
+            method=method,
+            url=url,
+            parsed_url=parsed_url,
+            head_prefix=encode_head_prefix(method, parsed_url.host, parsed_url.target, headers),
+            headers=headers,
+            cache_key=cache_key(url, params),
+        )
 
     async def request(
         self,
         method: Union[str, HttpRequestType],
         url: str,
-        timeout: Optional[float] = None,
+        timeout: TimeoutType = None,
         data_builder: Optional[OkieRequestPart] = None,
         headers: Optional[Headers] = None,
+        stream: bool = False,
+        params: ParamsType = None,
     ) -> Response:
         """
         Makes HTTP request within given timeout if succeeds on time returns Response object
@@ -79,18 +469,223 @@ class Okie(asyncio.AsyncioConnectionController):
         ##### Parameters
         - method `(str, okie.HTTPRequestType)` *HTTP request type*
         - url `str` *resource identifier, if doesn't have schema, will assume non-ssl request*
-        - timeout `float` *optional timeout within request should be sent/read. (Task gets cancelled on error)*
+        - timeout `(float, okie.Timeout)` *optional timeout within request should be sent/read,
+        plain number replaces only the total timeout of `Okie.timeout`, `okie.Timeout` replaces all of them*
         - data_builder `okie._builders.OkieRequestPart` *partial builder object to fill `okie.builders.HTTPFullRequest`*
         - headers `okie.Headers` *headers object, gets merged with self.default_headers into new Headers before request*
+        - stream `bool` *return as soon as headers are read, the body is left to `Response.iter_chunks`/`Response.save`.
+        Connection is held until the body is drained or `Response.discard` is called*
+        - params `(Mapping, Iterable[Tuple[str, Any]], okie.Query)` *query parameters appended to the URL's
+        own query, sequence values are repeated; `okie.Query` keeps them encoded for repeated requests*
+
+        GET requests without body go through `Okie.cache` if it's set, unless streamed.
+        Requests are hedged per `Okie.hedge` and retried per `Okie.retry` if they're set,
+        unless their body can be sent only once (e.g. it has async iterable parts).
+        Requests to origins with `okie.RateLimit` (`rate_limits` keyed by origin URL like
+        `"https://api.example.com"`, or `default_rate_limit`) wait for admission within
+        the pool timeout.
 
         ##### Returns
         - `okie.response.Response`
+
+        !!! note
+            Connection of a request, which timed out or got cancelled, is closed instead of
+            going back to the pool.
         """
 
+        timeout = make_timeout(timeout, self.timeout)
+        if not stream and self._cacheable(method, data_builder):
+            return await asyncio.call_with_timeout(
+                timeout=timeout.total,
+                future=self._cached_request(url, headers, params, timeout),
+            )
+
         return await asyncio.call_with_timeout(
-            timeout=timeout or self.timeout,
+            timeout=timeout.total,
             future=self._request(
                 method=method, url=url, data_builder=data_builder,
-                headers=headers,
+                headers=headers, params=params, stream=stream, timeout=timeout,
             )
         )
+
+    def _cacheable(self, method: Union[str, HttpRequestType], data_builder: Any) -> bool:
+        return (
+            self.cache is not None
+            and data_builder is None
+            and HttpRequestType(method) is HttpRequestType.GET
+        )
+
+    async def _send_request(self, request: Request, timeout: Timeout) -> Response:
+        # batch APIs send requests as `request` does, through the cache too
+        if self._cacheable(request.method, request.data_builder):
+            return await self._cached_request(request.url, request.headers, request.params, timeout)
+        return await self._request(*request, timeout=timeout)
+
+    async def _cached_request(
+        self,
+        url: str,
+        headers: Optional[Headers],
+        params: ParamsType,
+        timeout: Timeout,
+    ) -> Response:
+        merged = self.default_headers.get_merged(headers)
+
+        async def send(conditional: Optional[Headers]) -> Response:
+            return await self._request(
+                HttpRequestType.GET, url, None,
+                conditional.get_merged(headers) if conditional else headers,
+                params, timeout=timeout,
+            )
+
+        return await self.cache.fetch(cache_key(url, params), url, merged, send)
+
+    async def request_many(
+        self,
+        requests: Iterable[Request],
+        timeout: TimeoutType = None,
+        connections: int = 1,
+    ) -> List[Response]:
+        """
+        Makes batch of requests within given timeout. Idempotent requests to the same origin
+        are pipelined: written back to back on up to `connections` keep-alive connections,
+        responses are read in order. Requests left unanswered when server closes connection
+        mid-pipeline are sent again one by one. Other requests are sent concurrently as by `request`.
+
+        ##### Parameters
+        - requests `Iterable[okie.Request]` *requests, plain (method, url, data_builder, headers, params)
+        tuples are accepted*
+        - timeout `(float, okie.Timeout)` *optional timeout, total one applies to the whole batch*
+        - connections `int` *max count of connections per origin to split pipelined requests over*
+
+        ##### Returns
+        - `List[okie.response.Response]` *responses in order of requests*
+
+        !!! note
+            HEAD requests aren't pipelined, parser can't tell where their responses end.
+            Neither are requests with bodies which can't be sent twice, e.g. async iterables,
+            nor GET requests when `Okie.cache` is set, those go through the cache.
+        """
+
+        timeout = make_timeout(timeout, self.timeout)
+        return await asyncio.call_with_timeout(
+            timeout=timeout.total,
+            future=self._request_many(
+                [Request(*request) for request in requests], connections, timeout,
+            )
+        )
+
+    async def map(
+        self,
+        requests: Union[Iterable[Request], AsyncIterable[Request]],
+        concurrency: int = DEFAULT_MAP_CONCURRENCY,
+        ordered: bool = False,
+        reorder_buffer: Optional[int] = None,
+        return_exceptions: bool = False,
+        timeout: TimeoutType = None,
+    ) -> AsyncIterator[MapResult]:
+        """
+        Make requests keeping up to `concurrency` of them in flight, yielding results as they
+        complete. Requests are taken from the input only when there's room for them, so memory
+        stays bounded however long the input is. GET requests without body go through
+        `Okie.cache` if it's set, as in `request`.
+
+        ```python
+        async for result in okie.map(Request("GET", url) for url in urls):
+            print(result.index, result.response.status_code)
+        ```
+
+        ##### Parameters
+        - requests `(Iterable[okie.Request], AsyncIterable[okie.Request])` *requests,
+        plain tuples are accepted as by `request_many`*
+        - concurrency `int` *max count of requests in flight*
+        - ordered `bool` *yield results in order of requests*
+        - reorder_buffer `int` *max count of results held back waiting for an earlier one
+        in ordered mode, `concurrency` by default; no new requests are started while it's full*
+        - return_exceptions `bool` *yield failed requests with `MapResult.error` set instead of
+        raising the error*
+        - timeout `(float, okie.Timeout)` *timeout of each request, as `request` takes*
+
+        ##### Returns
+        - `AsyncIterator[okie.MapResult]`
+
+        !!! note
+            Requests in flight are cancelled when the iteration stops early.
+        """
+
+        if concurrency < 1:
+            raise ValueError("concurrency must be positive")
+
+        timeout = make_timeout(timeout, self.timeout)
+        window = concurrency + (concurrency if reorder_buffer is None else reorder_buffer)
+        loop = _asyncio.get_event_loop()
+
+        completed: Deque[MapResult] = deque()
+        in_flight: Set[_asyncio.Future] = set()
+        buffered: Dict[int, MapResult] = {}
+        wakeup: Optional[_asyncio.Future] = None
+
+        is_async = hasattr(requests, "__aiter__")
+        source: Any = requests.__aiter__() if is_async else iter(requests)
+        exhausted = False
+        started = 0
+        next_index = 0
+
+        async def run(index: int, request: Request) -> MapResult:
+            try:
+                response = await asyncio.call_with_timeout(
+                    timeout=timeout.total,
+                    future=self._send_request(request, timeout),
+                )
+            except Exception as exc:
+                return MapResult(index, request, error=exc)
+            return MapResult(index, request, response)
+
+        def on_done(task: _asyncio.Future):
+            in_flight.discard(task)
+            if not task.cancelled():
+                completed.append(task.result())
+            if wakeup is not None and not wakeup.done():
+                wakeup.set_result(None)
+
+        try:
+            while True:
+                while (
+                    not exhausted
+                    and len(in_flight) < concurrency
+                    and (not ordered or started - next_index < window)
+                ):
+                    try:
+                        request = await source.__anext__() if is_async else next(source)
+                    except (StopIteration, StopAsyncIteration):
+                        exhausted = True
+                        break
+                    task = _asyncio.ensure_future(run(started, Request(*request)))
+                    task.add_done_callback(on_done)
+                    in_flight.add(task)
+                    started += 1
+
+                if not completed:
+                    if not in_flight:
+                        return
+                    wakeup = loop.create_future()
+                    await wakeup
+                    wakeup = None
+
+                while completed:
+                    result = completed.popleft()
+                    if result.error is not None and not return_exceptions:
+                        raise result.error
+                    if not ordered:
+                        yield result
+                        continue
+
+                    buffered[result.index] = result
+                    while next_index in buffered:
+                        yield buffered.pop(next_index)
+                        next_index += 1
+        finally:
+            if in_flight:
+                tasks = list(in_flight)
+                for task in tasks:
+                    task.cancel()
+                await _asyncio.gather(*tasks, return_exceptions=True)
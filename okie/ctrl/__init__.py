@@ -1 +1,7 @@
-from .asyncio import AsyncioConnectionController
+from .asyncio import AsyncioConnectionController, Connection
+from .http2 import Http2Connection
+from .limits import RateLimit
+from .resolver import Resolver, ThreadedResolver, CachingResolver
+from .tls import make_ssl_context
+from .trace import Tracer, Timings, PoolStats
+from .timeout import Timeout
@@ -2,21 +2,56 @@
 AsyncioConnectionController pools/manages streams with standard `asyncio` library.
 """
 
-from typing import Optional, Deque, Set, Any, Tuple
+from typing import Optional, Deque, Set, Any, Tuple, Dict, List, Mapping, Union
 from contextlib import asynccontextmanager
 import asyncio
+import socket
+import ssl as ssl_
+import time
 from collections import deque
 
+from .resolver import Address, CachingResolver, Resolver
+from .trace import PoolStats, Timings, Tracer, clock
+from .timeout import deadline
+from .http2 import Http2Connection, ALPN_PROTOCOLS, HTTP2_AVAILABLE
+from .limits import RateLimit, OriginLimiter
+from . import tls
+
 DEFAULT_SSL_HANDSHAKE_TIMEOUT = 60
 DEFAULT_HTTPS_PORT = 443
 DEFAULT_HTTP_PORT = 80
 
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_CONNECTIONS_PER_ORIGIN = 10
+DEFAULT_MAX_IDLE_CONNECTIONS = 100
+DEFAULT_KEEPALIVE_TIMEOUT = 15
+DEFAULT_HAPPY_EYEBALLS_DELAY = 0.25
+LIMITERS_SWEEP_SIZE = 256
+"""
+Count of origin limiters, past which idle ones made for `default_rate_limit` are dropped
+"""
+
 
 AsyncioStreamType = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
 """
 Asyncio stream type; Pair of stream reader/writer
 """
 
+Origin = Tuple[bytes, bytes, int]
+"""
+Pool key; (scheme, host, port) triple
+"""
+
+
+def make_origin(host: bytes, port: Optional[int], ssl: Any) -> Origin:
+    """
+    Make pool key for the destination, port defaults to scheme's well-known port.
+    """
+
+    if port is None:
+        port = DEFAULT_HTTPS_PORT if ssl else DEFAULT_HTTP_PORT
+    return b"https" if ssl else b"http", host.lower(), port
+
 
 async def close_stream(stream: AsyncioStreamType):
     _, w = stream
@@ -24,66 +59,732 @@ async def close_stream(stream: AsyncioStreamType):
     await w.wait_closed()
 
 
+def interleave_families(addresses: List[Address]) -> List[Address]:
+    """
+    Reorder addresses alternating address families, preferring the family of the first one.
+    (RFC 8305 section 4)
+    """
+
+    first = [a for a in addresses if a[0] == addresses[0][0]]
+    rest = [a for a in addresses if a[0] != addresses[0][0]]
+    out = []
+    for i in range(max(len(first), len(rest))):
+        out.extend(a[i] for a in (first, rest) if i < len(a))
+    return out
+
+
+async def _connect_socket(address: Address) -> socket.socket:
+    family, type_, proto, _, sockaddr = address
+    sock = socket.socket(family, type_, proto)
+    try:
+        sock.setblocking(False)
+        await asyncio.get_event_loop().sock_connect(sock, sockaddr)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+async def connect_socket(
+    addresses: List[Address], happy_eyeballs_delay: Optional[float],
+) -> socket.socket:
+    """
+    Connect to the first address that accepts. Next attempt starts when the previous
+    one fails or after `happy_eyeballs_delay` seconds, `None` means one at a time.
+    (RFC 8305 "Happy Eyeballs")
+    """
+
+    candidates = iter(interleave_families(addresses))
+    pending: Set[asyncio.Future] = set()
+    errors: List[BaseException] = []
+    try:
+        while True:
+            address = next(candidates, None)
+            if address is not None:
+                pending.add(asyncio.ensure_future(_connect_socket(address)))
+            elif not pending:
+                if len(errors) == 1:
+                    raise errors[0]
+                raise OSError("Multiple exceptions: {}".format(", ".join(map(str, errors))))
+
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=happy_eyeballs_delay if address is not None else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            winner = None
+            for attempt in done:
+                if attempt.exception() is not None:
+                    errors.append(attempt.exception())
+                elif winner is None:
+                    winner = attempt.result()
+                else:
+                    attempt.result().close()
+            if winner is not None:
+                return winner
+    finally:
+        for attempt in pending:
+            attempt.cancel()
+
+
+class Connection:
+    """
+    Pooled stream and its bookkeeping. Unpacks as `AsyncioStreamType`.
+
+    `reusable` is reset on every checkout; whoever uses the connection sets it
+    once the exchange finished cleanly, otherwise the stream gets closed on
+    release instead of going back to the pool.
+    """
+
+    __slots__ = (
+        "reader", "writer", "origin", "created_at", "last_used", "requests", "reusable",
+        "admitted",
+    )
+
+    def __init__(self, stream: AsyncioStreamType, origin: Origin):
+        self.reader, self.writer = stream
+        self.origin = origin
+        self.created_at = self.last_used = time.monotonic()
+        self.requests = 0
+        self.reusable = False
+        # whether the checkout holds an admission of the origin's rate limit
+        self.admitted = False
+
+    def __iter__(self):
+        yield self.reader
+        yield self.writer
+
+    @property
+    def is_closed(self) -> bool:
+        """
+        Whether peer closed (or half-closed) the stream or it's broken.
+        """
+
+        return (
+            self.writer.is_closing()
+            or self.reader.at_eof()
+            or self.reader.exception() is not None
+        )
+
+    def close(self):
+        self.writer.close()
+
+
 class AsyncioConnectionController:
-    def __init__(self, ssl_handshake_timeout: Optional[float] = None):
-        self._connections_deque: Deque[Optional[AsyncioStreamType]] = deque()
-        self._busy_connections: Set[Optional[AsyncioStreamType]] = set()
-        self._semaphore = asyncio.Semaphore()
+    """
+    Keeps idle streams per origin and limits the count of checked out streams
+    globally and per origin. Waiters for a slot are served first-in-first-out,
+    skipping only those whose origin is at its own limit.
+
+    With `http2` HTTP/2 is offered with ALPN (and spoken with prior knowledge to
+    plain-text origins if `http2_prior_knowledge` is set), an HTTP/2 connection
+    is shared by all concurrent requests to its origin and takes a single slot.
+    It requires `h2` package (`okie[http2]`), `RuntimeError` is raised without it.
+
+    Requests to origins with `okie.ctrl.limits.RateLimit` (from `rate_limits`
+    or `default_rate_limit`) are admitted before they get a slot: they wait in
+    the origin's queue for a token and for a request in flight to complete,
+    woken up by a timer or by the completion, not by a task of their own.
+    Limiters made for `default_rate_limit` are dropped once they're idle with a full
+    bucket, so they don't pile up for every origin ever requested.
+    """
+
+    def __init__(
+        self,
+        ssl_handshake_timeout: Optional[float] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_connections_per_origin: int = DEFAULT_MAX_CONNECTIONS_PER_ORIGIN,
+        max_idle_connections: int = DEFAULT_MAX_IDLE_CONNECTIONS,
+        keepalive_timeout: Optional[float] = DEFAULT_KEEPALIVE_TIMEOUT,
+        max_connection_lifetime: Optional[float] = None,
+        max_connection_requests: Optional[int] = None,
+        resolver: Optional[Resolver] = None,
+        happy_eyeballs_delay: Optional[float] = DEFAULT_HAPPY_EYEBALLS_DELAY,
+        ssl_context: Optional[ssl_.SSLContext] = None,
+        tracer: Optional[Tracer] = None,
+        http2: bool = False,
+        http2_prior_knowledge: bool = False,
+        rate_limits: Optional[Mapping[Origin, RateLimit]] = None,
+        default_rate_limit: Optional[RateLimit] = None,
+    ):
+        self._idle_connections: Dict[Origin, Deque[Connection]] = {}
+        self._idle_count = 0
+        self._busy_connections: Set[Connection] = set()
+
+        self._in_use: Dict[Origin, int] = {}
+        self._in_use_count = 0
+        self._waiters: Deque[Tuple[Origin, asyncio.Future]] = deque()
+
+        self._max_connections = max_connections
+        self._max_per_origin = max_connections_per_origin
+        self._max_idle = max_idle_connections
+        self._keepalive_timeout = keepalive_timeout
+        self._max_lifetime = max_connection_lifetime
+        self._max_requests = max_connection_requests
+        self._resolver = resolver or CachingResolver()
+        self._happy_eyeballs_delay = happy_eyeballs_delay
+        self._ssl_context = ssl_context
+        self._tls_sessions = tls.SessionCache()
+        self._tracer = tracer
+
+        if http2 and not HTTP2_AVAILABLE:
+            # offering h2 with ALPN would fail every request to servers, which accept it
+            raise RuntimeError("h2 package is required for HTTP/2, install okie[http2]")
+        self._http2 = http2
+        self._http2_prior_knowledge = http2_prior_knowledge
+        self._http2_connections: Dict[Origin, Http2Connection] = {}
+        self._http2_opening: Dict[Origin, asyncio.Future] = {}
+        self._http1_origins: Set[Origin] = set()
+
+        self._limiters: Dict[Origin, OriginLimiter] = {
+            origin: OriginLimiter(limit) for origin, limit in (rate_limits or {}).items()
+        }
+        self._default_rate_limit = default_rate_limit
+        self._configured_origins = frozenset(self._limiters)
+        self._limiters_sweep_at = LIMITERS_SWEEP_SIZE
+
+        self._created_count = 0
+        self._closed_count = 0
+        self._reused_count = 0
+
         self._closed = False
         self._ssl_hshk_timeout = ssl_handshake_timeout or DEFAULT_SSL_HANDSHAKE_TIMEOUT
 
-    @asynccontextmanager
-    async def make_connection(
+    def _has_capacity(self, origin: Origin) -> bool:
+        return (
+            self._in_use_count < self._max_connections
+            and self._in_use.get(origin, 0) < self._max_per_origin
+        )
+
+    def _take_slot(self, origin: Origin):
+        self._in_use[origin] = self._in_use.get(origin, 0) + 1
+        self._in_use_count += 1
+
+    def _release_slot(self, origin: Origin):
+        left = self._in_use[origin] - 1
+        if left:
+            self._in_use[origin] = left
+        else:
+            del self._in_use[origin]
+        self._in_use_count -= 1
+        self._wakeup()
+
+    def _wakeup(self):
+        """
+        Hand freed slots over to waiters in arrival order.
+        """
+
+        if not self._waiters:
+            return
+
+        blocked: Deque[Tuple[Origin, asyncio.Future]] = deque()
+        while self._waiters and self._in_use_count < self._max_connections:
+            origin, waiter = item = self._waiters.popleft()
+            if waiter.done():
+                continue
+            if self._in_use.get(origin, 0) >= self._max_per_origin:
+                blocked.append(item)
+                continue
+            self._take_slot(origin)
+            waiter.set_result(None)
+
+        blocked.extend(self._waiters)
+        self._waiters = blocked
+
+    async def _acquire_slot(self, origin: Origin):
+        # waiters are woken up eagerly, so if there's capacity for the origin
+        # nobody queued for it can be ahead of us
+        if self._has_capacity(origin):
+            self._take_slot(origin)
+            return
+
+        item = (origin, asyncio.get_event_loop().create_future())
+        self._waiters.append(item)
+        waiting = clock()
+        try:
+            await item[1]
+        except asyncio.CancelledError:
+            if item[1].done() and not item[1].cancelled():
+                # slot was handed over, but we won't use it
+                self._release_slot(origin)
+            else:
+                try:
+                    self._waiters.remove(item)
+                except ValueError:
+                    pass
+            raise
+
+        if self._tracer is not None:
+            self._tracer.on_pool_wait(origin, clock() - waiting)
+
+    def _limiter(self, origin: Origin) -> Optional[OriginLimiter]:
+        limiter = self._limiters.get(origin)
+        if limiter is None and self._default_rate_limit is not None:
+            if len(self._limiters) >= self._limiters_sweep_at:
+                self._sweep_limiters()
+            limiter = self._limiters[origin] = OriginLimiter(self._default_rate_limit)
+        return limiter
+
+    def _sweep_limiters(self):
+        # idle limiter with a full bucket is as good as a new one
+        now = time.monotonic()
+        for origin, limiter in list(self._limiters.items()):
+            if origin not in self._configured_origins and limiter.is_idle(now):
+                del self._limiters[origin]
+        # sweeps take amortized constant time per limiter made
+        self._limiters_sweep_at = max(LIMITERS_SWEEP_SIZE, 2 * len(self._limiters))
+
+    async def _admit(self, origin: Origin):
+        """
+        Wait until the rate limit of the origin admits a request,
+        every admission is given back with `_complete`.
+        """
+
+        limiter = self._limiter(origin)
+        if limiter is None:
+            return
+        if not limiter.waiters and limiter.delay(time.monotonic()) == 0:
+            limiter.admit()
+            return
+
+        waiter = asyncio.get_event_loop().create_future()
+        limiter.waiters.append(waiter)
+        if limiter.timer is None:
+            self._admit_waiters(limiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # admitted, but won't be used
+                self._complete(origin)
+            else:
+                try:
+                    limiter.waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _admit_waiters(self, limiter: OriginLimiter):
+        """
+        Admit waiters in arrival order while the limit allows, schedule the next
+        call for when a token is available.
+        """
+
+        limiter.timer = None
+        now = time.monotonic()
+        waiters = limiter.waiters
+        while waiters:
+            if waiters[0].done():
+                waiters.popleft()
+                continue
+            delay = limiter.delay(now)
+            if delay is None:
+                # woken up by `_complete`
+                return
+            if delay > 0:
+                limiter.timer = asyncio.get_event_loop().call_later(
+                    delay, self._admit_waiters, limiter,
+                )
+                return
+            limiter.admit()
+            waiters.popleft().set_result(None)
+
+    def _complete(self, origin: Origin):
+        limiter = self._limiters.get(origin)
+        if limiter is None:
+            return
+        limiter.in_flight -= 1
+        if limiter.waiters and limiter.timer is None:
+            self._admit_waiters(limiter)
+
+    def observe_response(self, origin: Origin, status_code: int, retry_after: Optional[str]):
+        """
+        Let the rate limit of the origin adapt to the response, see `okie.ctrl.limits.RateLimit`.
+        """
+
+        limiter = self._limiters.get(origin)
+        if limiter is not None:
+            limiter.on_response(status_code, retry_after, time.monotonic())
+
+    def _is_expired(self, connection: Connection, now: float) -> bool:
+        return (
+            self._keepalive_timeout is not None
+            and now - connection.last_used > self._keepalive_timeout
+        ) or (
+            self._max_lifetime is not None
+            and now - connection.created_at > self._max_lifetime
+        ) or (
+            self._max_requests is not None
+            and connection.requests >= self._max_requests
+        )
+
+    def _pop_idle(self, origin: Origin) -> Optional[Connection]:
+        """
+        Get the most recently used healthy connection, closing those which
+        are half-closed or expired on the way.
+        """
+
+        streams = self._idle_connections.get(origin)
+        if not streams:
+            return None
+
+        now = time.monotonic()
+        # the least recently used ones are the first to expire
+        while streams and self._is_expired(streams[0], now):
+            self._discard(streams.popleft())
+            self._idle_count -= 1
+
+        connection = None
+        while streams:
+            self._idle_count -= 1
+            candidate = streams.pop()
+            if candidate.is_closed or self._is_expired(candidate, now):
+                self._discard(candidate)
+                continue
+            connection = candidate
+            break
+
+        if not streams:
+            del self._idle_connections[origin]
+        return connection
+
+    def _discard(self, connection: Connection):
+        connection.close()
+        self._closed_count += 1
+
+    def _put_idle(self, connection: Connection):
+        if (
+            not connection.reusable
+            or connection.is_closed
+            or self._idle_count >= self._max_idle
+            or self._is_expired(connection, connection.last_used)
+        ):
+            self._discard(connection)
+            return
+
+        self._idle_connections.setdefault(connection.origin, deque()).append(connection)
+        self._idle_count += 1
+
+    @property
+    def ssl_context(self) -> ssl_.SSLContext:
+        """
+        SSLContext used for all connections with `ssl=True`, made on first use
+        by `okie.ctrl.tls.make_ssl_context` unless given.
+        """
+
+        if self._ssl_context is None:
+            self._ssl_context = tls.make_ssl_context(
+                alpn_protocols=ALPN_PROTOCOLS if self._http2 else tls.DEFAULT_ALPN_PROTOCOLS,
+            )
+        return self._ssl_context
+
+    async def _open_stream(
         self,
-        destination_host: bytes,
-        destination_port: Optional[int],
+        origin: Origin,
+        host: str,
         ssl: Any,
-        ssl_handshake_timeout: Optional[float] = None,
+        ssl_handshake_timeout: Optional[float],
+        timings: Optional[Timings] = None,
     ) -> AsyncioStreamType:
-        await self._semaphore.acquire()
-        stream = self._connections_deque.popleft() if self._connections_deque else None
-        self._busy_connections.add(stream)
-
-        if stream is None:
-            if destination_port is None:
-                destination_port = DEFAULT_HTTPS_PORT if ssl else DEFAULT_HTTP_PORT
+        addresses = await self._resolver.resolve(host, origin[2])
+        if timings is not None:
+            timings.resolved = clock()
+        sock = await connect_socket(addresses, self._happy_eyeballs_delay)
+        if timings is not None:
+            timings.connected = clock()
+        if ssl is True:
+            ssl = self.ssl_context
 
+        token = tls.resuming(self._tls_sessions.get(origin)) if ssl else None
+        try:
             stream = await asyncio.open_connection(
-                host=destination_host.decode(),
-                port=destination_port,
+                sock=sock,
                 ssl=ssl,
+                server_hostname=host if ssl else None,
                 ssl_handshake_timeout=(
                     ssl_handshake_timeout or self._ssl_hshk_timeout
                 ) if ssl else None,
             )
+            if ssl and timings is not None:
+                timings.handshaked = clock()
+            return stream
+        except BaseException:
+            sock.close()
+            raise
+        finally:
+            if token is not None:
+                tls.resumed(token)
 
+    async def acquire_connection(
+        self,
+        destination_host: bytes,
+        destination_port: Optional[int],
+        ssl: Any,
+        ssl_handshake_timeout: Optional[float] = None,
+        timings: Optional[Timings] = None,
+        pool_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        origin: Optional[Origin] = None,
+        admit: bool = True,
+    ) -> Connection:
+        """
+        Check out a pooled connection to the origin or open a new one.
+        Every acquired connection must be given back with `release_connection`.
+        Phases of acquisition are stamped on `timings` if given.
+
+        `asyncio.TimeoutError` is raised if the request isn't admitted by the origin's
+        rate limit and no slot is free within `pool_timeout` or a new connection isn't
+        open within `connect_timeout`. `origin` is the pool key made by `make_origin`,
+        if it's known in advance.
+        """
+
+        if origin is None:
+            origin = make_origin(destination_host, destination_port, ssl)
+        with deadline(pool_timeout):
+            if admit:
+                await self._admit(origin)
+            try:
+                await self._acquire_slot(origin)
+            except BaseException:
+                if admit:
+                    self._complete(origin)
+                raise
+        if timings is not None:
+            timings.slot = clock()
+
+        tracer = self._tracer
         try:
-            yield stream
+            connection = self._pop_idle(origin)
+            if connection is None:
+                if tracer is not None:
+                    tracer.on_connect_start(origin)
+                try:
+                    with deadline(connect_timeout):
+                        stream = await self._open_stream(
+                            origin, destination_host.decode(), ssl, ssl_handshake_timeout, timings,
+                        )
+                except BaseException as exc:
+                    if tracer is not None:
+                        tracer.on_connect_end(origin, exc)
+                    raise
+                connection = Connection(stream, origin)
+                self._created_count += 1
+                if tracer is not None:
+                    tracer.on_connect_end(origin, None)
+            else:
+                self._reused_count += 1
+        except BaseException:
+            self._release_slot(origin)
+            if admit:
+                self._complete(origin)
+            raise
+
+        if timings is not None:
+            timings.acquired = clock()
+        connection.reusable = False
+        connection.admitted = admit
+        self._busy_connections.add(connection)
+        return connection
+
+    def release_connection(self, connection: Connection):
+        """
+        Give the connection back to the pool if `Connection.reusable` was set,
+        close it otherwise.
+        """
+
+        connection.requests += 1
+        connection.last_used = time.monotonic()
+        if connection.reusable and connection.origin[0] == b"https":
+            self._tls_sessions.put(
+                connection.origin, connection.writer.get_extra_info("ssl_object")
+            )
+        self._busy_connections.discard(connection)
+        self._put_idle(connection)
+        self._release_slot(connection.origin)
+        if connection.admitted:
+            connection.admitted = False
+            self._complete(connection.origin)
+
+    def _speaks_http2(self, connection: Connection) -> bool:
+        if connection.origin[0] != b"https":
+            return self._http2_prior_knowledge
+        ssl_object = connection.writer.get_extra_info("ssl_object")
+        return ssl_object is not None and ssl_object.selected_alpn_protocol() == "h2"
+
+    async def acquire_http2(
+        self,
+        destination_host: bytes,
+        destination_port: Optional[int],
+        ssl: Any,
+        timings: Optional[Timings] = None,
+        pool_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        origin: Optional[Origin] = None,
+    ) -> Union[Http2Connection, Connection]:
+        """
+        Get the HTTP/2 connection to the origin shared by concurrent requests,
+        opening it if there's none. Falls back to `acquire_connection` for origins,
+        which don't speak HTTP/2; checked out `Connection` is returned then.
+
+        While the first connection to an origin is being opened, other requests
+        to it wait to learn whether it can be shared.
+
+        The request is admitted by the origin's rate limit first; the admission is
+        given back when its stream is closed or with the fallback connection.
+        """
+
+        if origin is None:
+            origin = make_origin(destination_host, destination_port, ssl)
+        with deadline(pool_timeout):
+            await self._admit(origin)
+        try:
+            connection = await self._acquire_http2(
+                destination_host, destination_port, ssl, timings,
+                pool_timeout, connect_timeout, origin,
+            )
+        except BaseException:
+            self._complete(origin)
+            raise
+        if isinstance(connection, Connection):
+            connection.admitted = True
+        return connection
+
+    async def _acquire_http2(
+        self,
+        destination_host: bytes,
+        destination_port: Optional[int],
+        ssl: Any,
+        timings: Optional[Timings],
+        pool_timeout: Optional[float],
+        connect_timeout: Optional[float],
+        origin: Origin,
+    ) -> Union[Http2Connection, Connection]:
+        while True:
+            connection = self._http2_connections.get(origin)
+            if connection is not None:
+                if connection.is_available and not (
+                    connection.is_idle and self._is_expired(connection.connection, time.monotonic())
+                ):
+                    if timings is not None:
+                        timings.slot = timings.acquired = clock()
+                    self._reused_count += 1
+                    return connection
+                if connection.is_idle:
+                    connection.close()
+                else:
+                    # draining, let its streams finish
+                    del self._http2_connections[origin]
+
+            if (
+                not self._http2
+                or origin in self._http1_origins
+                or (origin[0] != b"https" and not self._http2_prior_knowledge)
+            ):
+                return await self.acquire_connection(
+                    destination_host, destination_port, ssl, timings=timings, origin=origin,
+                    pool_timeout=pool_timeout, connect_timeout=connect_timeout, admit=False,
+                )
+
+            opening = self._http2_opening.get(origin)
+            if opening is None:
+                break
+            with deadline(connect_timeout):
+                await asyncio.shield(opening)
+
+        opening = self._http2_opening[origin] = asyncio.get_event_loop().create_future()
+        try:
+            connection = await self.acquire_connection(
+                destination_host, destination_port, ssl, timings=timings, origin=origin,
+                pool_timeout=pool_timeout, connect_timeout=connect_timeout, admit=False,
+            )
+            if not self._speaks_http2(connection):
+                self._http1_origins.add(origin)
+                return connection
+
+            try:
+                shared = Http2Connection(
+                    connection, self._release_http2, lambda: self._complete(origin),
+                )
+            except BaseException:
+                self.release_connection(connection)
+                raise
+            self._http2_connections[origin] = shared
+            return shared
+        finally:
+            del self._http2_opening[origin]
+            opening.set_result(None)
+
+    def _release_http2(self, connection: Http2Connection):
+        if self._http2_connections.get(connection.origin) is connection:
+            del self._http2_connections[connection.origin]
+        if connection.connection in self._busy_connections:
+            self.release_connection(connection.connection)
+
+    @asynccontextmanager
+    async def make_connection(
+        self,
+        destination_host: bytes,
+        destination_port: Optional[int],
+        ssl: Any,
+        ssl_handshake_timeout: Optional[float] = None,
+    ) -> Connection:
+        """
+        `acquire_connection`/`release_connection` pair as a context manager.
+        Set `Connection.reusable` when the exchange is complete to put
+        the connection back to the pool.
+        """
+
+        connection = await self.acquire_connection(
+            destination_host, destination_port, ssl, ssl_handshake_timeout
+        )
+        try:
+            yield connection
         finally:
-            self._connections_deque.append(stream)
-            self._busy_connections.discard(stream)
-            self._semaphore.release()
+            self.release_connection(connection)
+
+    def stats(self) -> PoolStats:
+        """
+        Current pool gauges and counters of created, closed and reused connections.
+        """
+
+        return PoolStats(
+            idle=self._idle_count,
+            busy=len(self._busy_connections),
+            waiters=sum(not waiter.done() for _, waiter in self._waiters),
+            created=self._created_count,
+            closed=self._closed_count,
+            reused=self._reused_count,
+        )
 
     async def close_all(self):
         if self._closed:
             return
 
         self._closed = True
-        await asyncio.wait(
-            (
-                close_stream(rw)
-                for rw in (
-                    *self._connections_deque,
-                    *self._busy_connections
-                ) if rw
+        for connection in list(self._http2_connections.values()):
+            connection.close()
+
+        streams = [
+            *(rw for idle in self._idle_connections.values() for rw in idle),
+            *self._busy_connections,
+        ]
+        if streams:
+            await asyncio.gather(
+                *(close_stream(rw) for rw in streams),
+                return_exceptions=True,
             )
-        )
 
-        self._connections_deque = deque([None] * len(self._connections_deque))
+        self._closed_count += len(streams)
+        self._idle_connections.clear()
+        self._idle_count = 0
         self._busy_connections.clear()
 
 
-async def call_with_timeout(future, timeout: float):
-    return await asyncio.wait_for(
-        fut=future, timeout=timeout
-    )
+async def call_with_timeout(future, timeout: Optional[float]):
+    """
+    Await coroutine in the current task, raise `asyncio.TimeoutError` if it takes
+    longer than `timeout` seconds.
+    """
+
+    with deadline(timeout):
+        return await future
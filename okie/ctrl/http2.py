@@ -0,0 +1,433 @@
+"""
+HTTP/2 connections multiplexing concurrent requests as streams. Requires `h2` package.
+"""
+
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from http import HTTPStatus
+import asyncio
+import time
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.errors
+    import h2.events
+    import h2.exceptions
+    import h2.settings
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
+
+HTTP2_AVAILABLE = h2 is not None
+"""
+Whether `h2` package is installed, install `okie[http2]` to get it
+"""
+
+ALPN_PROTOCOLS = ("h2", "http/1.1")
+"""
+Protocols offered with ALPN when HTTP/2 is enabled, HTTP/1.1 is the fallback
+"""
+
+DEFAULT_STREAM_WINDOW = 2 ** 20
+DEFAULT_CONNECTION_WINDOW = 2 ** 24
+READ_SIZE = 2 ** 16
+
+CONNECTION_SPECIFIC_HEADERS = frozenset((
+    b"connection", b"keep-alive", b"proxy-connection", b"transfer-encoding", b"upgrade", b"te",
+))
+"""
+HTTP/1.1 headers, which are forbidden in HTTP/2 (RFC 7540 section 8.1.2.2)
+"""
+
+HeaderFields = List[Tuple[bytes, bytes]]
+
+
+def reason_phrase(status_code: int) -> str:
+    """
+    HTTP/2 has no reason phrase, the standard one is used for `Response.status`.
+    """
+
+    try:
+        return HTTPStatus(status_code).phrase
+    except ValueError:
+        return ""
+
+
+class Http2Stream:
+    """
+    Response side of a stream: headers, data as received, end or error. Part of non-public API.
+
+    Data is acknowledged (stream's flow control window is reopened) once it's
+    taken with `take`, so a slow reader makes the server wait instead of
+    data piling up in memory.
+    """
+
+    __slots__ = (
+        "connection", "stream_id", "headers", "chunks", "ended", "error",
+        "_unacked", "_waiter",
+    )
+
+    def __init__(self, connection: "Http2Connection", stream_id: int):
+        self.connection = connection
+        self.stream_id = stream_id
+        self.headers: Optional[HeaderFields] = None
+        self.chunks: List[bytes] = []
+        self.ended = False
+        self.error: Optional[BaseException] = None
+        self._unacked = 0
+        self._waiter: Optional[asyncio.Future] = None
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def on_headers(self, headers: HeaderFields):
+        self.headers = headers
+        self._wake()
+
+    def on_data(self, data: bytes, flow_controlled_length: int):
+        if data:
+            self.chunks.append(data)
+        self._unacked += flow_controlled_length
+        self._wake()
+
+    def on_end(self):
+        self.ended = True
+        self._wake()
+
+    def on_error(self, error: BaseException):
+        self.error = error
+        self._wake()
+
+    async def wait(self):
+        """
+        Wait for the next event on the stream, raise the error if the stream failed.
+        """
+
+        if self.error is None:
+            self._waiter = asyncio.get_event_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        if self.error is not None:
+            raise self.error
+
+    def take(self) -> bytes:
+        """
+        Get data received so far and acknowledge it.
+        """
+
+        data = b"".join(self.chunks) if len(self.chunks) > 1 else self.chunks[0]
+        self.chunks.clear()
+        self.acknowledge()
+        return data
+
+    def acknowledge(self):
+        if self._unacked:
+            self.connection.acknowledge(self.stream_id, self._unacked)
+            self._unacked = 0
+
+    def close(self):
+        """
+        Forget the stream, it's reset if the response wasn't complete.
+        """
+
+        self.connection.close_stream(self)
+
+
+class _DataWriter:
+    """
+    `StreamWriter`-like sink for lazy body parts, data is sent as DATA frames on `drain`.
+    """
+
+    transport = None
+
+    def __init__(self, connection: "Http2Connection", stream_id: int):
+        self.connection = connection
+        self.stream_id = stream_id
+        self.pending: List[bytes] = []
+
+    def write(self, data: bytes):
+        self.pending.append(data)
+
+    def writelines(self, data: List[bytes]):
+        self.pending.extend(data)
+
+    async def drain(self):
+        pending, self.pending = self.pending, []
+        for data in pending:
+            await self.connection.send_data(self.stream_id, data)
+
+
+class Http2Connection:
+    """
+    HTTP/2 connection shared by concurrent requests to one origin, each of them is
+    a stream. The connection keeps the pool slot of its underlying `Connection`
+    until it's closed, then `on_close` is called.
+
+    Frames are read by a background task, which dispatches them to the streams.
+    Sending respects flow control windows of the peer, streams wait for a free
+    slot if `SETTINGS_MAX_CONCURRENT_STREAMS` of the peer is reached.
+
+    `on_request_done` is called once for every `request` call: when its stream
+    is closed or when it failed to open one.
+    """
+
+    def __init__(
+        self,
+        connection,
+        on_close: Callable[["Http2Connection"], None],
+        on_request_done: Optional[Callable[[], None]] = None,
+    ):
+        if h2 is None:
+            raise RuntimeError("h2 package is required for HTTP/2")
+
+        self.connection = connection
+        self.origin = connection.origin
+        self._on_close = on_close
+        self._on_request_done = on_request_done
+        self._streams: Dict[int, Http2Stream] = {}
+        self._stream_waiters: Deque[asyncio.Future] = deque()
+        self._window_waiters: Deque[asyncio.Future] = deque()
+        self._closed = False
+        self._goaway = False
+
+        state = self._state = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=True, header_encoding=None)
+        )
+        state.local_settings = h2.settings.Settings(client=True, initial_values={
+            h2.settings.SettingCodes.ENABLE_PUSH: 0,
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: DEFAULT_STREAM_WINDOW,
+        })
+        state.initiate_connection()
+        state.increment_flow_control_window(DEFAULT_CONNECTION_WINDOW - 65535)
+        self._flush()
+        self._reading = asyncio.ensure_future(self._read_frames())
+
+    @property
+    def is_available(self) -> bool:
+        """
+        Whether new streams can be opened on the connection.
+        """
+
+        return not self._closed and not self._goaway
+
+    @property
+    def is_idle(self) -> bool:
+        return not self._streams
+
+    def _flush(self):
+        data = self._state.data_to_send()
+        if data and not self.connection.writer.is_closing():
+            self.connection.writer.write(data)
+
+    async def _read_frames(self):
+        reader = self.connection.reader
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    raise ConnectionResetError("Connection closed by peer")
+                for event in self._state.receive_data(data):
+                    self._dispatch(event)
+                self._flush()
+                if self._goaway and not self._streams:
+                    raise ConnectionResetError("Connection closed by peer")
+        except asyncio.CancelledError:
+            self._terminate(ConnectionResetError("Connection closed"))
+            raise
+        except Exception as exc:
+            self._terminate(exc)
+
+    def _dispatch(self, event):
+        stream = self._streams.get(getattr(event, "stream_id", None))
+        if isinstance(event, h2.events.ResponseReceived):
+            if stream is not None:
+                stream.on_headers(event.headers)
+        elif isinstance(event, h2.events.DataReceived):
+            if stream is not None:
+                stream.on_data(event.data, event.flow_controlled_length)
+            else:
+                # stream was reset by us, data in flight still counts for the connection
+                self._state.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            if stream is not None:
+                stream.on_end()
+        elif isinstance(event, h2.events.StreamReset):
+            if stream is not None:
+                stream.on_error(ConnectionResetError(
+                    "Stream reset by peer with error code {}".format(event.error_code)
+                ))
+        elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+            self._wake(self._window_waiters)
+            self._wake(self._stream_waiters)
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self._goaway = True
+            last_stream_id = event.last_stream_id or 0
+            for stream_id, stream in self._streams.items():
+                if stream_id > last_stream_id:
+                    # wasn't processed by peer, safe to retry
+                    stream.on_error(ConnectionResetError("Connection closed by peer"))
+
+    @staticmethod
+    def _wake(waiters: Deque[asyncio.Future]):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _wait(self, waiters: Deque[asyncio.Future]):
+        waiter = asyncio.get_event_loop().create_future()
+        waiters.append(waiter)
+        await waiter
+        if self._closed:
+            raise ConnectionResetError("Connection closed")
+
+    def _terminate(self, error: BaseException):
+        if self._closed:
+            return
+
+        self._closed = True
+        for stream in self._streams.values():
+            stream.on_error(ConnectionResetError(str(error) or "Connection closed"))
+        self._wake(self._window_waiters)
+        self._wake(self._stream_waiters)
+        self.connection.close()
+        if self._reading is not asyncio.current_task():
+            self._reading.cancel()
+        self._on_close(self)
+
+    async def request(
+        self,
+        method: bytes,
+        target: bytes,
+        fields: HeaderFields,
+        end_stream: bool,
+    ) -> Http2Stream:
+        """
+        Open stream and send request headers, `host` field becomes `:authority`
+        and connection-specific fields are dropped.
+        """
+
+        try:
+            while len(self._streams) >= self._state.remote_settings.max_concurrent_streams:
+                await self._wait(self._stream_waiters)
+            if not self.is_available:
+                raise ConnectionResetError("Connection closed")
+
+            authority = b""
+            headers = []
+            for name, value in fields:
+                if name == b"host":
+                    authority = value
+                elif name not in CONNECTION_SPECIFIC_HEADERS:
+                    headers.append((name, value))
+
+            stream_id = self._state.get_next_available_stream_id()
+            self._state.send_headers(stream_id, [
+                (b":method", method),
+                (b":authority", authority),
+                (b":scheme", self.origin[0]),
+                (b":path", target),
+                *headers,
+            ], end_stream=end_stream)
+        except BaseException:
+            if self._on_request_done is not None:
+                self._on_request_done()
+            raise
+
+        stream = self._streams[stream_id] = Http2Stream(self, stream_id)
+        self._flush()
+        return stream
+
+    async def send_data(self, stream_id: int, data: bytes, end_stream: bool = False):
+        """
+        Send data in frames, waiting for the peer's flow control windows.
+        """
+
+        view = memoryview(data)
+        while view:
+            if self.error_of(stream_id) is not None:
+                raise self.error_of(stream_id)
+
+            size = min(
+                self._state.local_flow_control_window(stream_id),
+                self._state.max_outbound_frame_size,
+                len(view),
+            )
+            if size <= 0:
+                await self._wait(self._window_waiters)
+                continue
+
+            self._state.send_data(stream_id, view[:size].tobytes())
+            view = view[size:]
+            self._flush()
+            await self.connection.writer.drain()
+
+        if end_stream:
+            self._state.end_stream(stream_id)
+            self._flush()
+
+    def error_of(self, stream_id: int) -> Optional[BaseException]:
+        stream = self._streams.get(stream_id)
+        return stream.error if stream is not None else ConnectionResetError("Stream closed")
+
+    async def send_body(self, stream: Http2Stream, segments: list):
+        """
+        Send request body segments and end the stream. Lazy parts write into
+        a `StreamWriter`-like object, their data is sent on its `drain`.
+        """
+
+        writer = None
+        for segment in segments:
+            if isinstance(segment, (bytes, bytearray, memoryview)):
+                await self.send_data(stream.stream_id, segment)
+                continue
+
+            if writer is None:
+                writer = _DataWriter(self, stream.stream_id)
+            await segment.write(writer, False)
+            await writer.drain()
+        await self.send_data(stream.stream_id, b"", end_stream=True)
+
+    def acknowledge(self, stream_id: int, size: int):
+        if not self._closed:
+            self._state.acknowledge_received_data(size, stream_id)
+            self._flush()
+
+    def close_stream(self, stream: Http2Stream):
+        if self._streams.pop(stream.stream_id, None) is None:
+            return
+
+        if not self._closed:
+            if not stream.ended:
+                try:
+                    self._state.reset_stream(stream.stream_id, h2.errors.ErrorCodes.CANCEL)
+                except h2.exceptions.ProtocolError:
+                    pass
+            stream.acknowledge()
+            self._flush()
+
+        self.connection.requests += 1
+        self.connection.last_used = time.monotonic()
+        if self._on_request_done is not None:
+            self._on_request_done()
+        self._wake(self._stream_waiters)
+        if self._goaway and not self._streams:
+            self.close()
+
+    def close(self):
+        """
+        Close the connection, streams in flight fail with `ConnectionResetError`.
+        """
+
+        if not self._closed and not self.connection.writer.is_closing():
+            self._state.close_connection()
+            self._flush()
+        self._terminate(ConnectionResetError("Connection closed"))
+
+
+__all__ = [
+    "Http2Connection", "Http2Stream", "ALPN_PROTOCOLS", "HTTP2_AVAILABLE", "reason_phrase",
+]
@@ -0,0 +1,147 @@
+"""
+Per-origin rate and concurrency limits, adapting to `429`/`503` and `Retry-After`.
+"""
+
+from typing import Deque, NamedTuple, Optional
+from collections import deque
+from email.utils import parsedate_to_datetime
+import asyncio
+import time
+
+THROTTLED_STATUSES = frozenset((429, 503))
+
+DECREASE_FACTOR = 0.5
+"""
+Rate is multiplied by it on `429` response without `Retry-After`
+"""
+
+INCREASE_FRACTION = 0.05
+"""
+Fraction of configured rate regained by every successful response
+"""
+
+MIN_RATE_FRACTION = 0.05
+"""
+Adapted rate doesn't go below this fraction of configured rate
+"""
+
+
+class RateLimit(NamedTuple):
+    """
+    Limits of requests to one origin.
+
+    ##### Parameters
+    - rate `float` *requests per second (token bucket refill rate), `None` means no limit*
+    - burst `int` *requests, which may be sent at once after idle time (bucket size)*
+    - max_in_flight `int` *requests sent and not yet complete, `None` means no limit*
+    - adaptive `bool` *slow down on `429`/`503` responses: wait for `Retry-After`,
+    halve the rate on `429` without it and regain it gradually on other responses*
+    """
+
+    rate: Optional[float] = None
+    burst: int = 1
+    max_in_flight: Optional[int] = None
+    adaptive: bool = True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Get delay of `Retry-After` header in seconds, which is either seconds or HTTP-date.
+    """
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class OriginLimiter:
+    """
+    Token bucket and in-flight count of one origin with the queue of waiters for them.
+    Part of non-public API, see `AsyncioConnectionController`.
+    """
+
+    __slots__ = (
+        "limit", "rate", "tokens", "updated", "in_flight", "paused_until", "decreased_at",
+        "waiters", "timer",
+    )
+
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self.rate = limit.rate
+        self.tokens = float(limit.burst)
+        self.updated = self.paused_until = time.monotonic()
+        self.decreased_at = float("-inf")
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def delay(self, now: float) -> Optional[float]:
+        """
+        Get seconds until a request can be admitted, `None` if it waits
+        for a request in flight to complete.
+        """
+
+        if self.limit.max_in_flight is not None and self.in_flight >= self.limit.max_in_flight:
+            return None
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.rate is None:
+            return 0
+
+        self.tokens = min(float(self.limit.burst), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def is_idle(self, now: float) -> bool:
+        """
+        Tell whether nothing waits or is in flight, the bucket is full and the rate isn't cut.
+        """
+
+        return (
+            not self.waiters
+            and self.timer is None
+            and self.in_flight == 0
+            and self.rate == self.limit.rate
+            and self.delay(now) == 0
+            and self.tokens >= self.limit.burst
+        )
+
+    def admit(self):
+        if self.rate is not None:
+            self.tokens -= 1
+        self.in_flight += 1
+
+    def on_response(self, status_code: int, retry_after: Optional[str], now: float):
+        if not self.limit.adaptive:
+            return
+
+        if status_code not in THROTTLED_STATUSES:
+            if self.rate is not None and self.rate < self.limit.rate:
+                self.rate = min(self.limit.rate, self.rate + self.limit.rate * INCREASE_FRACTION)
+            return
+
+        pause = parse_retry_after(retry_after)
+        if pause is not None:
+            self.paused_until = max(self.paused_until, now + pause)
+            # a single request probes the origin once the pause is over
+            self.tokens = min(self.tokens, 1.0)
+            self.updated = self.paused_until
+        elif (
+            status_code == 429
+            and self.rate is not None
+            and now - self.decreased_at >= 1 / self.rate
+        ):
+            # responses to requests sent at the old rate mustn't cut it again
+            self.decreased_at = now
+            self.rate = max(self.limit.rate * MIN_RATE_FRACTION, self.rate * DECREASE_FACTOR)
+
+
+__all__ = ["RateLimit", "OriginLimiter", "parse_retry_after"]
@@ -0,0 +1,69 @@
+"""
+Event loops for background threads and worker processes, sharing of concurrent calls.
+"""
+
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+import asyncio
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+def new_event_loop(use_uvloop: Optional[bool] = None) -> asyncio.AbstractEventLoop:
+    """
+    Make uvloop event loop if it's installed, `use_uvloop=True` requires it
+    and `False` makes the default one.
+    """
+
+    if use_uvloop is not False:
+        try:
+            import uvloop
+        except ImportError:
+            if use_uvloop:
+                raise
+        else:
+            return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+class Coalescer(Generic[K, T]):
+    """
+    Concurrent calls with the same key share the first one, it's forgotten once done.
+    The shared call is cancelled once all of its callers left, e.g. timed out,
+    so it's bounded by the longest timeout of them.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[K, asyncio.Future] = {}
+        self._callers: Dict[asyncio.Future, int] = {}
+
+    def _forget(self, key: K, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    async def run(self, key: K, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await the call in flight for `key`, start `call()` if there's none.
+        """
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._in_flight[key] = asyncio.ensure_future(call())
+            future.add_done_callback(lambda f: self._forget(key, f))
+            # retrieve the exception in case every caller got cancelled
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._callers[future] = self._callers.get(future, 0) + 1
+        try:
+            # cancelled caller mustn't cancel the call others are waiting for
+            return await asyncio.shield(future)
+        finally:
+            left = self._callers.pop(future) - 1
+            if left:
+                self._callers[future] = left
+            elif not future.done():
+                # later callers start a new call instead of joining the cancelled one
+                self._forget(key, future)
+                future.cancel()
+
+
+__all__ = ["new_event_loop", "Coalescer"]
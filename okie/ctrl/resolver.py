@@ -0,0 +1,130 @@
+"""
+Resolvers turn host names into addresses for `AsyncioConnectionController`.
+"""
+
+from typing import Dict, List, Optional, Tuple, Any, Union
+import asyncio
+import ipaddress
+import socket
+import time
+
+from .loop import Coalescer
+
+DEFAULT_DNS_TTL = 60
+DEFAULT_NEGATIVE_DNS_TTL = 5
+DEFAULT_DNS_CACHE_SIZE = 1024
+
+
+Address = Tuple[int, int, int, str, Any]
+"""
+`socket.getaddrinfo` entry; (family, type, proto, canonname, sockaddr)
+"""
+
+
+class Resolver:
+    """
+    Resolver interface.
+    """
+
+    async def resolve(self, host: str, port: int) -> List[Address]:
+        """
+        Get addresses of the host, raise `OSError` if there are none.
+        """
+
+        raise NotImplementedError
+
+
+def resolve_literal(host: str, port: int) -> Optional[List[Address]]:
+    """
+    Make address of IP-literal host without lookup, `None` for host names.
+    """
+
+    try:
+        ip = ipaddress.ip_address(host)
+    except ValueError:
+        return None
+
+    if ip.version == 4:
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (host, port))]
+    return [(socket.AF_INET6, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (host, port, 0, 0))]
+
+
+class ThreadedResolver(Resolver):
+    """
+    Resolves with `loop.getaddrinfo`, which runs in default executor.
+    """
+
+    async def resolve(self, host: str, port: int) -> List[Address]:
+        addresses = resolve_literal(host, port)
+        if addresses is not None:
+            return addresses
+
+        addresses = await asyncio.get_event_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP,
+        )
+        if not addresses:
+            raise OSError("getaddrinfo() returned empty list for {!r}".format(host))
+        return addresses
+
+
+_Entry = Tuple[float, Union[List[Address], OSError]]
+
+
+class CachingResolver(Resolver):
+    """
+    Caches results of another resolver for `ttl` seconds and failures for
+    `negative_ttl` seconds. Concurrent lookups of the same host share one
+    lookup of the underlying resolver.
+
+    !!! note
+        `getaddrinfo` doesn't expose record TTLs, so the same `ttl` is applied to all hosts.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[Resolver] = None,
+        ttl: float = DEFAULT_DNS_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_DNS_TTL,
+        max_size: int = DEFAULT_DNS_CACHE_SIZE,
+    ):
+        self._resolver = resolver or ThreadedResolver()
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._max_size = max_size
+        self._cache: Dict[Tuple[str, int], _Entry] = {}
+        self._in_flight: Coalescer[Tuple[str, int], List[Address]] = Coalescer()
+
+    async def resolve(self, host: str, port: int) -> List[Address]:
+        key = (host, port)
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                if isinstance(result, OSError):
+                    raise result.with_traceback(None)
+                return result
+            del self._cache[key]
+
+        return await self._in_flight.run(key, lambda: self._lookup(key))
+
+    async def _lookup(self, key: Tuple[str, int]) -> List[Address]:
+        try:
+            result = await self._resolver.resolve(*key)
+        except OSError as exc:
+            self._store(key, self._negative_ttl, exc)
+            raise
+        else:
+            self._store(key, self._ttl, result)
+            return result
+
+    def _store(self, key: Tuple[str, int], ttl: float, result: Union[List[Address], OSError]):
+        if len(self._cache) >= self._max_size:
+            # dict keeps insertion order, drop the oldest entry
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = (time.monotonic() + ttl, result)
+
+    def clear(self):
+        self._cache.clear()
+
+
+__all__ = ["Resolver", "ThreadedResolver", "CachingResolver", "Address"]
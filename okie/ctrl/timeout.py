@@ -0,0 +1,95 @@
+"""
+Per-phase request timeouts and deadlines, which don't need a Task of their own.
+"""
+
+from typing import NamedTuple, Optional, Union
+import asyncio
+
+
+class Timeout(NamedTuple):
+    """
+    Timeouts of request phases in seconds, `None` means no limit.
+
+    ##### Parameters
+    - total `float` *whole request until the response is read, or until its headers
+    are read for streamed responses*
+    - connect `float` *opening a connection: name resolution, TCP connect and TLS handshake*
+    - pool `float` *waiting for a connection slot when the pool is at its limits*
+    - write `float` *writing the request*
+    - read `float` *waiting for each piece of the response, including those read by
+    `Response.iter_chunks` after the request returned*
+
+    !!! note
+        Plain number given where a timeout is expected means `Timeout(total=number)`.
+    """
+
+    total: Optional[float] = None
+    connect: Optional[float] = None
+    pool: Optional[float] = None
+    write: Optional[float] = None
+    read: Optional[float] = None
+
+
+TimeoutType = Union[None, float, Timeout]
+
+
+def make_timeout(timeout: TimeoutType, default: TimeoutType = None) -> Timeout:
+    """
+    Normalize `timeout`, plain number replaces only the total timeout of `default`.
+    """
+
+    if isinstance(timeout, Timeout):
+        return timeout
+    if not isinstance(default, Timeout):
+        default = Timeout(total=default)
+    if timeout is None:
+        return default
+    return default._replace(total=timeout)
+
+
+class deadline:
+    """
+    Cancel the current task once `timeout` seconds passed and raise `asyncio.TimeoutError`
+    instead of `CancelledError` from the block. Unlike `asyncio.wait_for` the awaited
+    code runs in the current task, only a timer handle is scheduled.
+
+    ```python
+    with deadline(5):
+        await reader.read(2 ** 16)
+    ```
+    """
+
+    __slots__ = ("_timeout", "_task", "_handle", "expired")
+
+    def __init__(self, timeout: Optional[float]):
+        self._timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self.expired = False
+
+    def __enter__(self) -> "deadline":
+        if self._timeout is not None:
+            self._task = asyncio.current_task()
+            self._handle = asyncio.get_event_loop().call_later(self._timeout, self._expire)
+        return self
+
+    def _expire(self):
+        self.expired = True
+        self._task.cancel()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._handle is None:
+            return False
+
+        self._handle.cancel()
+        if self.expired and (exc_type is None or exc_type is asyncio.CancelledError):
+            # Task.uncancel is there since 3.11, it tells whether
+            # the task was cancelled from outside too
+            uncancel = getattr(self._task, "uncancel", None)
+            if uncancel is not None and uncancel() > 0:
+                return False
+            raise asyncio.TimeoutError from exc_val
+        return False
+
+
+__all__ = ["Timeout", "TimeoutType", "make_timeout", "deadline"]
@@ -0,0 +1,118 @@
+"""
+TLS configuration shared by all connections of a controller and session resumption.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+import contextvars
+import os
+import ssl
+
+DEFAULT_ALPN_PROTOCOLS = ("http/1.1",)
+DEFAULT_TLS_SESSIONS = 256
+
+_resumed_session: contextvars.ContextVar = contextvars.ContextVar("okie_resumed_session")
+"""
+Session to offer in the handshake of the connection being opened
+"""
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    SSLContext offering a previously established session in client handshakes.
+    `asyncio` doesn't pass a session to `wrap_bio`, so it's taken from the context
+    the connection is opened in, see `resuming`.
+    """
+
+    def wrap_bio(
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: Optional[str] = None,
+        session: Optional[ssl.SSLSession] = None,
+    ) -> ssl.SSLObject:
+        if session is None and not server_side:
+            session = _resumed_session.get(None)
+        return super().wrap_bio(incoming, outgoing, server_side, server_hostname, session)
+
+
+def resuming(session: Optional[ssl.SSLSession]) -> contextvars.Token:
+    """
+    Offer the session in handshakes started until the token is reset with `resumed`.
+    """
+
+    return _resumed_session.set(session)
+
+
+def resumed(token: contextvars.Token):
+    _resumed_session.reset(token)
+
+
+def make_ssl_context(
+    cafile: Optional[Union[str, os.PathLike]] = None,
+    capath: Optional[Union[str, os.PathLike]] = None,
+    cadata: Optional[Union[str, bytes]] = None,
+    certfile: Optional[Union[str, os.PathLike]] = None,
+    keyfile: Optional[Union[str, os.PathLike]] = None,
+    password: Optional[Union[str, bytes, Callable[[], Any]]] = None,
+    alpn_protocols: Optional[Iterable[str]] = DEFAULT_ALPN_PROTOCOLS,
+    verify: bool = True,
+) -> ResumingSSLContext:
+    """
+    Make client-side SSLContext with session resumption.
+
+    ##### Parameters
+    - cafile, capath, cadata *custom CA bundle, system default CAs are used if none given*
+    - certfile, keyfile, password *client certificate chain and its private key*
+    - alpn_protocols *protocols to offer with ALPN*
+    - verify `bool` *verify server certificate and host name*
+
+    ##### Returns
+    - `okie.ctrl.tls.ResumingSSLContext`
+    """
+
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    if cafile or capath or cadata:
+        context.load_verify_locations(cafile, capath, cadata)
+    else:
+        context.load_default_certs(ssl.Purpose.SERVER_AUTH)
+
+    if certfile:
+        context.load_cert_chain(certfile, keyfile, password)
+    if alpn_protocols:
+        context.set_alpn_protocols(list(alpn_protocols))
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class SessionCache:
+    """
+    Last TLS session of each origin, bounded by count of origins.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_TLS_SESSIONS):
+        self._max_size = max_size
+        self._sessions: Dict[Any, ssl.SSLSession] = {}
+
+    def get(self, origin: Any) -> Optional[ssl.SSLSession]:
+        return self._sessions.get(origin)
+
+    def put(self, origin: Any, ssl_object: Optional[ssl.SSLObject]):
+        """
+        Store session of the connection, TLS 1.3 tickets arrive after the handshake,
+        so it's done once connection was used.
+        """
+
+        if ssl_object is None or ssl_object.session is None:
+            return
+        if origin not in self._sessions and len(self._sessions) >= self._max_size:
+            del self._sessions[next(iter(self._sessions))]
+        self._sessions[origin] = ssl_object.session
+
+    def clear(self):
+        self._sessions.clear()
+
+
+__all__ = ["ResumingSSLContext", "make_ssl_context", "SessionCache"]
@@ -0,0 +1,143 @@
+"""
+Request lifecycle hooks and per-phase timings.
+"""
+
+from typing import Any, NamedTuple, Optional
+import time
+
+clock = time.perf_counter
+"""
+Clock of `Timings` stamps
+"""
+
+
+class Tracer:
+    """
+    Lifecycle hooks, subclass and override the ones of interest.
+    Hooks are called synchronously from the request task, so they must not block.
+    Without a tracer given to `okie.Okie` the hooks cost a single `None` check per phase.
+
+    Origins are (scheme, host, port) triples, see `okie.ctrl.asyncio.Origin`.
+    """
+
+    def on_pool_wait(self, origin: Any, waited: float):
+        """
+        Connection slot was taken after waiting `waited` seconds for one to be released.
+        """
+
+    def on_connect_start(self, origin: Any):
+        """
+        No idle connection to the origin, a new one is being opened.
+        """
+
+    def on_connect_end(self, origin: Any, error: Optional[BaseException]):
+        """
+        Connection is open (TLS handshake included) or failed with `error`.
+        """
+
+    def on_request_sent(self, method: str, url: str):
+        """
+        Request was written and drained.
+        """
+
+    def on_first_byte(self, response: Any):
+        """
+        First bytes of the response arrived.
+        """
+
+    def on_complete(self, response: Any):
+        """
+        Response body was read completely.
+        """
+
+    def on_error(self, url: Optional[str], error: BaseException):
+        """
+        Request failed or was cancelled, the connection is discarded.
+        """
+
+
+class Timings:
+    """
+    `clock` stamps of request phases, `None` for those which didn't happen,
+    e.g. connect phases when a pooled connection was reused.
+    Durations are in seconds.
+    """
+
+    __slots__ = (
+        "started", "slot", "resolved", "connected", "handshaked",
+        "acquired", "sent", "first_byte", "completed",
+    )
+
+    def __init__(self):
+        self.started: float = clock()
+        self.slot: Optional[float] = None
+        self.resolved: Optional[float] = None
+        self.connected: Optional[float] = None
+        self.handshaked: Optional[float] = None
+        self.acquired: Optional[float] = None
+        self.sent: Optional[float] = None
+        self.first_byte: Optional[float] = None
+        self.completed: Optional[float] = None
+
+    @staticmethod
+    def _span(start: Optional[float], end: Optional[float]) -> Optional[float]:
+        return None if start is None or end is None else end - start
+
+    @property
+    def pool_wait(self) -> Optional[float]:
+        return self._span(self.started, self.slot)
+
+    @property
+    def dns(self) -> Optional[float]:
+        return self._span(self.slot, self.resolved)
+
+    @property
+    def connect(self) -> Optional[float]:
+        return self._span(self.resolved, self.connected)
+
+    @property
+    def tls(self) -> Optional[float]:
+        return self._span(self.connected, self.handshaked)
+
+    @property
+    def write(self) -> Optional[float]:
+        return self._span(self.acquired, self.sent)
+
+    @property
+    def ttfb(self) -> Optional[float]:
+        """
+        Time from the request being sent to the first byte of the response.
+        """
+
+        return self._span(self.sent, self.first_byte)
+
+    @property
+    def read(self) -> Optional[float]:
+        return self._span(self.first_byte, self.completed)
+
+    @property
+    def total(self) -> Optional[float]:
+        return self._span(self.started, self.completed)
+
+    def __repr__(self) -> str:
+        phases = ("pool_wait", "dns", "connect", "tls", "write", "ttfb", "read", "total")
+        return "Timings({})".format(", ".join(
+            "{}={:.6f}".format(phase, getattr(self, phase))
+            for phase in phases if getattr(self, phase) is not None
+        ))
+
+
+class PoolStats(NamedTuple):
+    """
+    Pool gauges (`idle`, `busy`, `waiters`) and counters since the controller was made.
+    """
+
+    idle: int
+    busy: int
+    waiters: int
+    created: int
+    closed: int
+    reused: int
+
+
+__all__ = ["Tracer", "Timings", "PoolStats", "clock"]
@@ -0,0 +1,145 @@
+"""
+Incremental content decoders for `Content-Encoding` of responses.
+"""
+
+from typing import List, Optional, Tuple
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+class Decoder:
+    """
+    Decoder interface, chunks are decoded as they come.
+    """
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class GzipDecoder(Decoder):
+    def __init__(self):
+        # 16 + MAX_WBITS expects gzip header and trailer
+        self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class DeflateDecoder(Decoder):
+    """
+    `deflate` is zlib-wrapped stream by the spec, but some servers send raw deflate,
+    which is detected on the first chunk.
+    """
+
+    def __init__(self):
+        self._obj = zlib.decompressobj()
+        self._first = True
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._first and data:
+            self._first = False
+            try:
+                return self._obj.decompress(data)
+            except zlib.error:
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class BrotliDecoder(Decoder):
+    def __init__(self):
+        self._obj = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        # brotli and brotlicffi name the method differently
+        if hasattr(self._obj, "process"):
+            return self._obj.process(data)
+        return self._obj.decompress(data)
+
+
+class ChainDecoder(Decoder):
+    """
+    Decodes multiple codings in reverse order of application.
+    """
+
+    def __init__(self, decoders: List[Decoder]):
+        self._decoders = decoders
+
+    def decompress(self, data: bytes) -> bytes:
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self) -> bytes:
+        data = b""
+        for decoder in self._decoders:
+            data = (decoder.decompress(data) if data else b"") + decoder.flush()
+        return data
+
+
+DECODERS = {
+    "gzip": GzipDecoder,
+    "x-gzip": GzipDecoder,
+    "deflate": DeflateDecoder,
+}
+if brotli is not None:
+    DECODERS["br"] = BrotliDecoder
+
+ACCEPT_ENCODING = ", ".join(("gzip", "deflate", "br") if brotli is not None else ("gzip", "deflate"))
+"""
+Value of `Accept-Encoding` sent when decompression is enabled
+"""
+
+
+DECODED_HEADERS = {
+    b"content-encoding": b"original-content-encoding",
+    b"content-length": b"original-content-length",
+}
+"""
+Headers of a decoded response, which describe the encoded body, and their new names
+"""
+
+
+def decoded_headers(raw_headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """
+    Rename headers describing the encoded body to `original-*`, so headers of
+    a decoded response match its body.
+    """
+
+    return [(DECODED_HEADERS.get(name.lower(), name), value) for name, value in raw_headers]
+
+
+def make_decoder(content_encoding: str) -> Optional[Decoder]:
+    """
+    Make decoder for value of `Content-Encoding`, `None` if it's identity or isn't supported,
+    in which case the body is left as is.
+    """
+
+    codings = [
+        coding.strip().lower()
+        for coding in content_encoding.split(",")
+        if coding.strip() and coding.strip().lower() != "identity"
+    ]
+    if not codings or any(coding not in DECODERS for coding in codings):
+        return None
+
+    decoders = [DECODERS[coding]() for coding in reversed(codings)]
+    return decoders[0] if len(decoders) == 1 else ChainDecoder(decoders)
+
+
+__all__ = ["Decoder", "make_decoder", "decoded_headers", "ACCEPT_ENCODING"]
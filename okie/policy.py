@@ -0,0 +1,174 @@
+"""
+Hedged requests and retries of failed attempts, see `HedgePolicy` and `RetryPolicy`.
+"""
+
+from typing import Collection, Deque, List, Optional, Tuple, Type
+from collections import deque
+import random
+
+from .request import IDEMPOTENT_METHODS
+from .enums.http_request import HttpRequestType
+
+DEFAULT_LATENCY_WINDOW = 1000
+DEFAULT_MIN_SAMPLES = 20
+
+HEDGED_METHODS = frozenset((
+    HttpRequestType.GET,
+    HttpRequestType.HEAD,
+    HttpRequestType.OPTIONS,
+))
+"""
+Methods hedged by default; safe and cheap to send twice
+"""
+
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    ConnectionResetError, ConnectionAbortedError, BrokenPipeError,
+)
+"""
+Errors of connections closed by peer, e.g. a pooled connection the server timed out
+"""
+
+
+class LatencyTracker:
+    """
+    Percentiles of the latest `window` latencies. Sorted sample is remade once
+    a tenth of the window is new, so lookups stay cheap.
+    """
+
+    def __init__(self, window: int = DEFAULT_LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._sorted: List[float] = []
+        self._stale = 0
+        self._resort_every = max(1, window // 10)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float):
+        self._samples.append(latency)
+        self._stale += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get `q`-th percentile (0-100) of tracked latencies, `None` if there are none.
+        """
+
+        if not self._samples:
+            return None
+        if self._stale and (self._stale >= self._resort_every or len(self._sorted) < self._resort_every):
+            self._sorted = sorted(self._samples)
+            self._stale = 0
+        return self._sorted[min(len(self._sorted) - 1, int(len(self._sorted) * q / 100))]
+
+
+class HedgePolicy:
+    """
+    Send a second attempt of a request if the first one isn't answered within the hedge
+    delay, the first to succeed wins. The other attempt is cancelled and its connection
+    is closed, so a single slow upstream instance doesn't set the tail latency.
+
+    ```python
+    okie = Okie(timeout=5, hedge=HedgePolicy(delay=0.05, percentile=95))
+    ```
+
+    ##### Parameters
+    - delay `float` *fixed hedge delay; with `percentile` used until enough latencies are tracked*
+    - percentile `float` *take the delay from this percentile (0-100) of latencies of won attempts*
+    - min_samples `int` *count of tracked latencies needed to use `percentile`*
+    - window `int` *count of latest latencies tracked*
+    - methods *methods to hedge, `HEDGED_METHODS` by default*
+
+    !!! note
+        Every attempt checks out its own connection. Requests to an origin multiplexed
+        over HTTP/2 are hedged as another stream of the shared connection.
+    """
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: Optional[float] = None,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        window: int = DEFAULT_LATENCY_WINDOW,
+        methods: Collection[HttpRequestType] = HEDGED_METHODS,
+    ):
+        if delay is None and percentile is None:
+            raise ValueError("either delay or percentile is required")
+
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.methods = methods
+        self.latencies = LatencyTracker(window)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Get delay of the second attempt, `None` means no hedging.
+        """
+
+        if self.percentile is not None and len(self.latencies) >= self.min_samples:
+            return self.latencies.percentile(self.percentile)
+        return self.delay
+
+
+class RetryPolicy:
+    """
+    Retry requests, which failed with connection errors, after exponential backoff
+    with full jitter, `uniform(0, min(max_backoff, backoff * 2 ** retry))`.
+
+    Retries are throttled by a token budget (as gRPC does): failed attempt takes a token,
+    successful one gives back `token_ratio` of it, retries are allowed only while more
+    than half of `max_tokens` is left. When an upstream is down the retry rate drops
+    to a fraction of the request rate instead of multiplying it.
+
+    ##### Parameters
+    - retries `int` *max count of retries of a request*
+    - backoff `float` *base backoff in seconds*
+    - max_backoff `float` *cap of backoff in seconds*
+    - max_tokens `float` *size of the retry budget*
+    - token_ratio `float` *tokens given back by a successful attempt*
+    - retry_on *exception types to retry, `RETRYABLE_ERRORS` by default*
+    - methods *methods to retry, `okie.request.IDEMPOTENT_METHODS` by default*
+    """
+
+    def __init__(
+        self,
+        retries: int = 2,
+        backoff: float = 0.05,
+        max_backoff: float = 1.0,
+        max_tokens: float = 10,
+        token_ratio: float = 0.1,
+        retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+        methods: Collection[HttpRequestType] = IDEMPOTENT_METHODS,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_tokens = self.tokens = max_tokens
+        self.token_ratio = token_ratio
+        self.retry_on = retry_on
+        self.methods = methods
+
+    def on_success(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.token_ratio)
+
+    def on_failure(self):
+        self.tokens = max(0, self.tokens - 1)
+
+    def can_retry(self, retried: int, error: BaseException) -> bool:
+        """
+        Whether to retry the request, which failed with `error` after `retried` retries.
+        """
+
+        return (
+            retried < self.retries
+            and isinstance(error, self.retry_on)
+            and self.tokens > self.max_tokens / 2
+        )
+
+    def backoff_delay(self, retried: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** retried))
+
+
+__all__ = [
+    "HedgePolicy", "RetryPolicy", "LatencyTracker", "HEDGED_METHODS", "RETRYABLE_ERRORS",
+]
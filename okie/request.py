@@ -0,0 +1,49 @@
+from typing import Any, NamedTuple, Optional, Union
+
+from ._builders import OkieRequestPart
+from .types import Headers
+from .url import ParamsType
+from .enums.http_request import HttpRequestType
+
+
+class Request(NamedTuple):
+    """
+    Description of a request for batch APIs, same arguments as `okie.Okie.request` takes.
+    Plain tuples in the same order are accepted as well.
+    """
+
+    method: Union[str, HttpRequestType]
+    url: str
+    data_builder: Optional[OkieRequestPart] = None
+    headers: Optional[Headers] = None
+    params: ParamsType = None
+
+
+class MapResult(NamedTuple):
+    """
+    Outcome of a request made by `okie.Okie.map`; either `response` or `error` is set.
+    """
+
+    index: int
+    """
+    Position of the request in the input
+    """
+    request: Request
+    response: Optional[Any] = None
+    error: Optional[BaseException] = None
+
+
+IDEMPOTENT_METHODS = frozenset((
+    HttpRequestType.GET,
+    HttpRequestType.HEAD,
+    HttpRequestType.PUT,
+    HttpRequestType.DELETE,
+    HttpRequestType.OPTIONS,
+    HttpRequestType.TRACE,
+))
+"""
+Methods which can be safely sent again
+"""
+
+
+__all__ = ["Request", "MapResult", "IDEMPOTENT_METHODS"]
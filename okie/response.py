@@ -1,62 +1,577 @@
-from typing import Optional
+from typing import AsyncIterator, Callable, List, Optional, Any, Tuple
+import asyncio
+import inspect
+import json
 
-from .types import header_key as hk, Headers
+import httptools
+
+from .types import Headers
+from .encoding import Decoder, make_decoder, decoded_headers
+from .ctrl.trace import Timings, Tracer, clock
+from .ctrl.timeout import deadline
+from .ctrl.http2 import reason_phrase
+
+READ_SIZE = 2 ** 16
+"""
+Size of a single socket read while receiving the body
+"""
+
+
+RawHeaders = List[Tuple[bytes, bytes]]
+"""
+Header (name, value) pairs as received
+"""
 
 
 class Response:
+    """
+    Response headers are kept as received until `headers` is accessed for the first time.
+
+    `timings` holds stamps of the request phases, see `okie.ctrl.trace.Timings`;
+    pipelined responses share the record of their batch.
+    """
+
     # class-members:
     url: Optional[str]
     body: Optional[bytes]
-    headers: Optional[Headers]
 
     status: Optional[str]
     status_code: Optional[int]
     closed: bool
+    timings: Optional[Timings]
 
     _cnt_len = -1
 
-    __slots__ = ("url", "body", "headers", "status", "status_code", "closed")
+    __slots__ = (
+        "url", "body", "status", "status_code", "closed", "timings",
+        "_stream", "_headers", "_raw_headers",
+    )
 
     def __init__(self):
         for slot in self.__slots__:
             setattr(self, slot, None)
 
+    @property
+    def headers(self) -> Optional[Headers]:
+        """
+        Case-insensitive headers, decoded on first access.
+        """
+
+        if self._headers is None and self._raw_headers:
+            headers = self._headers = Headers()
+            for name, value in self._raw_headers:
+                headers.add(name.decode(), value.decode())
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: Optional[Headers]):
+        self._headers = headers
+        self._raw_headers = None
+
+    @property
+    def raw_headers(self) -> RawHeaders:
+        """
+        Header (name, value) pairs as received, empty if headers were set explicitly.
+        """
+
+        return self._raw_headers or []
+
+    @property
+    def charset(self) -> Optional[str]:
+        """
+        Charset parameter of content-type header.
+        """
+
+        content_type = self.headers.get("content-type") if self.headers else None
+        if not content_type:
+            return None
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "charset":
+                return value.strip().strip('"') or None
+        return None
+
+    async def text(self, encoding: Optional[str] = None, errors: str = "strict") -> str:
+        """
+        Read the body and decode it with `encoding`, charset of the response or utf-8.
+        """
+
+        return (await self.read()).decode(encoding or self.charset or "utf-8", errors)
+
+    async def json(self, loads: Callable[[Any], Any] = json.loads) -> Any:
+        """
+        Read the body and deserialize it with `loads`. Body is decoded if the response
+        has non-utf-8 charset, otherwise `loads` gets bytes.
+        """
+
+        body = await self.read()
+        charset = self.charset
+        if charset and charset.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return loads(body.decode(charset))
+        return loads(body)
+
     def __len__(self) -> int:
         """
-        Gets the value content-length header
+        Gets the value content-length header, if there's no such header
+        (chunked or close-delimited body) gets the length of already read body.
+        Decoded responses have no content-length, so it's the decoded length.
         """
 
         if self._cnt_len != -1:
             return self._cnt_len
-        return int(self.headers[hk("content-length")])
+        if self.headers and "content-length" in self.headers:
+            return int(self.headers["content-length"])
+        return len(self.body or b"")
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """
+        Iterate over the body as it's received. Socket is read only when the next chunk
+        is requested, so memory stays bounded regardless of body size.
+        Connection goes back to the pool once the body is drained.
+
+        For non-streamed responses yields the already read body.
+        """
+
+        if self._stream is None:
+            if self.body:
+                yield self.body
+            return
+
+        stream = self._stream
+        while True:
+            chunk = await stream.read_chunk()
+            if chunk is None:
+                return
+            yield chunk
+
+    __aiter__ = iter_chunks
+
+    async def read(self) -> bytes:
+        """
+        Read the rest of the body into `Response.body`.
+        """
+
+        if self._stream is not None:
+            self.body = b"".join([chunk async for chunk in self.iter_chunks()])
+            self._stream = None
+        return self.body or b""
+
+    async def save(self, file: Any) -> int:
+        """
+        Write the body into file-like object chunk by chunk.
+
+        ##### Parameters
+        - file *object with `write(bytes)` method, which may be a coroutine function*
+
+        ##### Returns
+        - count of written bytes
+        """
+
+        written = 0
+        async for chunk in self.iter_chunks():
+            result = file.write(chunk)
+            if inspect.isawaitable(result):
+                await result
+            written += len(chunk)
+        return written
+
+    def discard(self):
+        """
+        Give up the rest of the body. Connection gets closed if the body wasn't drained.
+        """
+
+        if self._stream is not None:
+            self._stream.release()
+            self._stream = None
+
+    async def __aenter__(self) -> "Response":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.discard()
 
 
 class HTProtocol:
     """
     Http-Tools-Protocol. protocol for httptools parser. Part of non-public API.
+
+    Handles all the RFC 7230 framings: content-length and chunked ones are
+    handled by parser, close-delimited body is completed by `feed_eof`,
+    responses to HEAD requests are complete right after the headers.
+    Interim (1xx) responses are skipped.
+    With `decompress` body is decoded as it comes according to its content-encoding,
+    content-encoding and content-length headers are renamed to `original-*`.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        method: bytes = b"GET",
+        parser: Optional[httptools.HttpResponseParser] = None,
+        decompress: bool = False,
+    ):
         self.response = Response()
+        self.parser = parser or httptools.HttpResponseParser(self)
+        self.decoder: Optional[Decoder] = None
+        self._decompress = decompress
+        self.keep_alive = False
+        self.headers_complete = False
+        self.chunks: List[bytes] = []
+        self._no_body = method == b"HEAD"
+        self._may_close_delimit = False
 
     def on_url(self, url: bytes):
         self.response.url = url.decode()
 
     def on_header(self, name: bytes, value: bytes):
-        k, val = hk(name.decode()), value.decode()
-        if self.response.headers:
-            self.response.headers[k] = val
+        raw = self.response._raw_headers
+        if raw is None:
+            self.response._raw_headers = [(name, value)]
+        else:
+            raw.append((name, value))
+
+    def on_headers_complete(self):
+        # parser resets its flags once the message is complete
+        self.keep_alive = self.parser.should_keep_alive()
+        self.put_status_code(self.parser.get_status_code())
+        if self.response.status_code < 200:
+            return
+
+        self.headers_complete = True
+        status = self.response.status_code
+        if self._no_body:
+            # parser doesn't know about the request method and would expect the body
+            self.on_message_complete()
         else:
-            self.response.headers = Headers({k: val})
+            self._may_close_delimit = status != 204 and status != 304
+            if self._decompress:
+                raw = self.response.raw_headers
+                for name, value in raw:
+                    if name.lower() == b"content-encoding":
+                        self.decoder = make_decoder(value.decode())
+                if self.decoder is not None:
+                    # framing is decided by the received headers, before they're renamed
+                    self._may_close_delimit = self.close_delimited
+                    self.response._raw_headers = decoded_headers(raw)
+
+    @property
+    def close_delimited(self) -> bool:
+        """
+        Whether the body lasts until connection is closed. Checked only at EOF,
+        so headers aren't looked at while parsing.
+        """
+
+        return self._may_close_delimit and not any(
+            name.lower() in (b"content-length", b"transfer-encoding")
+            for name, _ in self.response.raw_headers
+        )
 
     def on_body(self, body: bytes):
-        self.response.body = body
+        if self.decoder is not None:
+            body = self.decoder.decompress(body)
+            if not body:
+                return
+        self.chunks.append(body)
 
     def on_message_complete(self):
+        if self.response.status_code < 200:
+            # interim response, the final one follows on the same parser
+            self.response._raw_headers = self.response.status = None
+            return
+        self._complete()
+
+    def _complete(self):
+        if self.decoder is not None:
+            tail = self.decoder.flush()
+            if tail:
+                self.chunks.append(tail)
+            self.decoder = None
         self.response.closed = True
 
+    def feed(self, data: bytes):
+        if not self.response.closed:
+            self.parser.feed_data(data)
+
+    def feed_eof(self):
+        """
+        Peer closed the connection, complete close-delimited message or fail.
+        """
+
+        if self.response.closed:
+            return
+        if not self.close_delimited:
+            raise ConnectionResetError("Connection closed before message was complete")
+
+        self.keep_alive = False
+        self._complete()
+
     def on_status(self, status: bytes):
         self.response.status = status.decode()
 
     def put_status_code(self, code: int):
         self.response.status_code = code
+
+
+class BodyStream:
+    """
+    Reads the rest of a message from the connection on demand. Part of non-public API.
+
+    Owns the connection until the message is complete or the stream is released,
+    then hands it to `release` callback. Connection of a stream, which failed or
+    timed out mid-message, isn't reused.
+    """
+
+    def __init__(
+        self,
+        connection,
+        protocol: HTProtocol,
+        release: Callable[[Any], None],
+        tracer: Optional[Tracer] = None,
+        read_timeout: Optional[float] = None,
+    ):
+        self.connection = connection
+        self.protocol = protocol
+        self._release = release
+        self._tracer = tracer
+        self._read_timeout = read_timeout
+
+    async def _read(self):
+        with deadline(self._read_timeout):
+            data = await self.connection.reader.read(READ_SIZE)
+        if data:
+            self.protocol.feed(data)
+        else:
+            self.protocol.feed_eof()
+
+    async def read_head(self):
+        """
+        Read until headers are parsed, the beginning of the body may get read too.
+        """
+
+        response = self.protocol.response
+        try:
+            await self._read()
+            if response.timings is not None:
+                response.timings.first_byte = clock()
+            if self._tracer is not None:
+                self._tracer.on_first_byte(response)
+
+            while not self.protocol.headers_complete:
+                await self._read()
+        except BaseException as exc:
+            self._fail(exc)
+            raise
+
+    async def read_chunk(self) -> Optional[bytes]:
+        """
+        Get the next piece of the body, `None` when the message is complete.
+        """
+
+        protocol = self.protocol
+        try:
+            while not protocol.chunks:
+                if protocol.response.closed:
+                    self.release()
+                    return None
+
+                await self._read()
+        except BaseException as exc:
+            self._fail(exc)
+            raise
+
+        chunk = b"".join(protocol.chunks) if len(protocol.chunks) > 1 else protocol.chunks[0]
+        protocol.chunks.clear()
+        return chunk
+
+    def _fail(self, exc: BaseException):
+        if self._tracer is not None and self.connection is not None:
+            self._tracer.on_error(self.protocol.response.url, exc)
+        self.release()
+
+    def release(self):
+        if self.connection is None:
+            return
+
+        response = self.protocol.response
+        self.connection.reusable = bool(response.closed) and self.protocol.keep_alive
+        self._release(self.connection)
+        self.connection = None
+
+        if response.closed:
+            if response.timings is not None:
+                response.timings.completed = clock()
+            if self._tracer is not None:
+                self._tracer.on_complete(response)
+
+
+class Http2BodyStream:
+    """
+    `BodyStream` of a response received on HTTP/2 stream. Part of non-public API.
+
+    Closing the stream before the response is complete resets it,
+    the connection itself stays shared.
+    """
+
+    def __init__(
+        self,
+        stream,
+        method: bytes,
+        decompress: bool = False,
+        tracer: Optional[Tracer] = None,
+        read_timeout: Optional[float] = None,
+    ):
+        self.stream = stream
+        self.response = Response()
+        self.decoder: Optional[Decoder] = None
+        self._decompress = decompress
+        self._no_body = method == b"HEAD"
+        self._tracer = tracer
+        self._read_timeout = read_timeout
+
+    async def _wait(self):
+        with deadline(self._read_timeout):
+            await self.stream.wait()
+
+    def _on_headers(self):
+        response = self.response
+        raw = response._raw_headers = []
+        for name, value in self.stream.headers:
+            if name == b":status":
+                response.status_code = int(value)
+                response.status = reason_phrase(response.status_code)
+            elif not name.startswith(b":"):
+                raw.append((name, value))
+                if self._decompress and name == b"content-encoding":
+                    self.decoder = make_decoder(value.decode())
+        if self.decoder is not None:
+            response._raw_headers = decoded_headers(raw)
+
+    async def read_head(self):
+        """
+        Wait for the response headers.
+        """
+
+        response = self.response
+        try:
+            while self.stream.headers is None:
+                if self.stream.ended:
+                    raise ConnectionResetError("Stream ended before response headers")
+                await self._wait()
+            self._on_headers()
+            if response.timings is not None:
+                response.timings.first_byte = clock()
+            if self._tracer is not None:
+                self._tracer.on_first_byte(response)
+        except BaseException as exc:
+            self._fail(exc)
+            raise
+
+    async def read_chunk(self) -> Optional[bytes]:
+        """
+        Get the next piece of the body, `None` when the message is complete.
+        """
+
+        stream = self.stream
+        try:
+            while True:
+                if stream.chunks:
+                    chunk = stream.take()
+                    if self.decoder is not None:
+                        chunk = self.decoder.decompress(chunk)
+                    if chunk and not self._no_body:
+                        return chunk
+                    continue
+                if stream.ended:
+                    self.response.closed = True
+                    tail = self.decoder.flush() if self.decoder is not None else b""
+                    self.decoder = None
+                    if tail:
+                        return tail
+                    self.release()
+                    return None
+                await self._wait()
+        except BaseException as exc:
+            self._fail(exc)
+            raise
+
+    def _fail(self, exc: BaseException):
+        if self._tracer is not None and self.stream is not None:
+            self._tracer.on_error(self.response.url, exc)
+        self.release()
+
+    def release(self):
+        if self.stream is None:
+            return
+
+        self.stream.close()
+        self.stream = None
+        response = self.response
+        if response.closed:
+            if response.timings is not None:
+                response.timings.completed = clock()
+            if self._tracer is not None:
+                self._tracer.on_complete(response)
+
+
+class PipelineProtocol:
+    """
+    Dispatches callbacks of one parser to the protocols of pipelined responses
+    in order. Part of non-public API.
+
+    Responses to HEAD requests can't be pipelined: the parser doesn't know the
+    request method and would wait for their body.
+    """
+
+    def __init__(self, methods: List[bytes], decompress: bool = False):
+        self.parser = httptools.HttpResponseParser(self)
+        self.protocols = [HTProtocol(method, self.parser, decompress) for method in methods]
+        self._current = 0
+
+    @property
+    def current(self) -> HTProtocol:
+        return self.protocols[self._current]
+
+    @property
+    def complete(self) -> bool:
+        return self.protocols[-1].response.closed is True
+
+    def on_message_begin(self):
+        # interim responses begin a message too, but don't complete one
+        if self.current.response.closed:
+            self._current += 1
+
+    def on_status(self, status: bytes):
+        self.current.on_status(status)
+
+    def on_header(self, name: bytes, value: bytes):
+        self.current.on_header(name, value)
+
+    def on_headers_complete(self):
+        self.current.on_headers_complete()
+
+    def on_body(self, body: bytes):
+        self.current.on_body(body)
+
+    def on_message_complete(self):
+        self.current.on_message_complete()
+        self._collect_body()
+
+    def _collect_body(self):
+        current = self.current
+        if current.response.closed:
+            current.response.body = b"".join(current.chunks)
+            current.chunks.clear()
+
+    async def read(self, reader: asyncio.StreamReader, read_timeout: Optional[float] = None):
+        """
+        Read responses until all of them are complete or peer closes the connection.
+        """
+
+        while not self.complete:
+            with deadline(read_timeout):
+                data = await reader.read(READ_SIZE)
+            if not data:
+                if self.current.close_delimited:
+                    self.current.feed_eof()
+                    self._collect_body()
+                return
+            self.parser.feed_data(data)
@@ -0,0 +1,350 @@
+"""
+Requests spread over worker processes, each running its own loop and `okie.Okie`.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import asyncio
+import itertools
+import multiprocessing
+import os
+import pickle
+import socket
+import struct
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:  # pragma: no cover - python < 3.8
+    shared_memory = resource_tracker = None
+
+from .client import Okie
+from .request import Request
+from .response import Response
+from .types import Headers
+from .url import ParamsType
+from .ctrl.timeout import TimeoutType, make_timeout, deadline
+from .ctrl.loop import new_event_loop
+from ._builders import OkieRequestPart
+from .enums.http_request import HttpRequestType
+
+DEFAULT_SHM_THRESHOLD = 2 ** 20
+"""
+Bodies of at least this size are passed through shared memory
+"""
+
+_FRAME = struct.Struct("!I")
+"""
+Frame header; length of pickled batch. Jobs are (id, arguments of `Okie.request`),
+outcomes are (id, succeeded, response state or exception)
+"""
+
+
+def _dump(batch: list) -> bytes:
+    data = pickle.dumps(batch, pickle.HIGHEST_PROTOCOL)
+    return _FRAME.pack(len(data)) + data
+
+
+async def _load(reader: asyncio.StreamReader) -> Optional[list]:
+    """
+    Read one batch, `None` once the peer closed the stream.
+    """
+
+    try:
+        size, = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+        return pickle.loads(await reader.readexactly(size))
+    except asyncio.IncompleteReadError:
+        return None
+
+
+class _Batcher:
+    """
+    Collects messages written within one loop iteration into a single frame.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self._batch: list = []
+
+    def send(self, message: Any):
+        if not self._batch:
+            asyncio.get_event_loop().call_soon(self.flush)
+        self._batch.append(message)
+
+    def flush(self):
+        if self._batch and not self.writer.is_closing():
+            self.writer.write(_dump(self._batch))
+        self._batch = []
+
+
+def _pack_body(body: bytes, shm_threshold: Optional[int]) -> Tuple[Any, Optional[str]]:
+    if shared_memory is None or shm_threshold is None or len(body) < shm_threshold:
+        return body, None
+
+    shm = shared_memory.SharedMemory(create=True, size=len(body))
+    shm.buf[:len(body)] = body
+    # the receiving process unlinks the segment once it's copied
+    resource_tracker.unregister(shm._name, "shared_memory")
+    shm.close()
+    return len(body), shm.name
+
+
+def _unpack_body(body: Any, shm_name: Optional[str]) -> bytes:
+    if shm_name is None:
+        return body
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        return bytes(shm.buf[:body])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+async def _serve(sock: socket.socket, okie_kwargs: Dict[str, Any], shm_threshold: Optional[int]):
+    okie = Okie(**okie_kwargs)
+    reader, writer = await asyncio.open_connection(sock=sock)
+    out = _Batcher(writer)
+    tasks = set()
+    # empty batch tells the worker is ready
+    writer.write(_dump([]))
+
+    async def handle(job_id: int, args: tuple):
+        try:
+            response = await okie.request(*args)
+            body, shm_name = _pack_body(response.body or b"", shm_threshold)
+            out.send((job_id, True, (
+                response.status_code, response.status, response.raw_headers, body, shm_name,
+            )))
+        except Exception as exc:
+            try:
+                pickle.dumps(exc)
+            except Exception:
+                exc = RuntimeError(repr(exc))
+            out.send((job_id, False, exc))
+        await writer.drain()
+
+    try:
+        while True:
+            batch = await _load(reader)
+            if batch is None:
+                break
+            for job_id, args in batch:
+                task = asyncio.ensure_future(handle(job_id, args))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        out.flush()
+        await okie.close_all()
+        writer.close()
+        await writer.wait_closed()
+
+
+def _worker_main(
+    sock: socket.socket,
+    okie_kwargs: Dict[str, Any],
+    shm_threshold: Optional[int],
+    use_uvloop: Optional[bool],
+):
+    loop = new_event_loop(use_uvloop)
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(_serve(sock, okie_kwargs, shm_threshold))
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+class _Worker:
+    def __init__(self, process: multiprocessing.Process, sock: socket.socket):
+        self.process = process
+        self.sock = sock
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.out: Optional[_Batcher] = None
+        self.reading: Optional[asyncio.Future] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+
+
+class ShardedOkie:
+    """
+    `okie.Okie`-like client dispatching requests to worker processes, so parsing and
+    building requests scale past one core. Each worker runs its own loop (uvloop if
+    installed) with its own `okie.Okie` and connection pool.
+
+    Requests and responses are batched: everything sent within one loop iteration goes
+    in one frame over a socket pair. Response bodies of at least `shm_threshold` bytes
+    are passed through shared memory instead of the socket.
+
+    ```python
+    async with ShardedOkie(workers=4, timeout=5) as okie:
+        response = await okie.request("GET", "http://localhost/")
+    ```
+
+    ##### Parameters
+    - workers `int` *count of worker processes, count of CPUs by default*
+    - shm_threshold `int` *min body size to pass through shared memory, `None` to always pickle*
+    - use_uvloop `bool` *`None` uses uvloop if it's installed*
+    - mp_context `str` *multiprocessing start method*
+    - okie_kwargs *arguments of `okie.Okie` for workers, they must be picklable*
+
+    !!! note
+        Request builders are pickled to be sent to workers, file objects and async iterables
+        can't be, use paths for lazy file parts. Streaming responses aren't supported.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        shm_threshold: Optional[int] = DEFAULT_SHM_THRESHOLD,
+        use_uvloop: Optional[bool] = None,
+        mp_context: str = "spawn",
+        **okie_kwargs: Any,
+    ):
+        self._count = workers or os.cpu_count() or 1
+        self._shm_threshold = shm_threshold
+        self._use_uvloop = use_uvloop
+        self._mp_context = multiprocessing.get_context(mp_context)
+        self._okie_kwargs = okie_kwargs
+        self._workers: List[_Worker] = []
+        self._ids = itertools.count()
+        self._closed = True
+
+    async def start(self):
+        """
+        Start the worker processes, done by `async with` as well.
+        """
+
+        self._closed = False
+
+        for _ in range(self._count):
+            parent_sock, child_sock = socket.socketpair()
+            process = self._mp_context.Process(
+                target=_worker_main,
+                args=(child_sock, self._okie_kwargs, self._shm_threshold, self._use_uvloop),
+                daemon=True,
+            )
+            process.start()
+            child_sock.close()
+            self._workers.append(_Worker(process, parent_sock))
+
+        for worker in self._workers:
+            worker.reader, worker.writer = await asyncio.open_connection(sock=worker.sock)
+            worker.out = _Batcher(worker.writer)
+            if await _load(worker.reader) is None:
+                raise RuntimeError("worker process failed to start")
+            worker.reading = asyncio.ensure_future(self._read(worker))
+
+    async def _read(self, worker: _Worker):
+        while True:
+            batch = await _load(worker.reader)
+            if batch is None:
+                break
+
+            for job_id, ok, payload in batch:
+                waiter = worker.pending.pop(job_id, None)
+                if waiter is None or waiter.done():
+                    if ok and payload[4] is not None:
+                        _unpack_body(payload[3], payload[4])
+                    continue
+                if not ok:
+                    waiter.set_exception(payload)
+                    continue
+
+                response = Response()
+                (
+                    response.status_code, response.status, response._raw_headers, body, shm_name,
+                ) = payload
+                response.body = _unpack_body(body, shm_name)
+                response.closed = True
+                waiter.set_result(response)
+
+        for waiter in worker.pending.values():
+            if not waiter.done():
+                waiter.set_exception(ConnectionResetError("worker process exited"))
+        worker.pending.clear()
+
+        if worker in self._workers:
+            # died on its own, `close_all` won't see it
+            self._workers.remove(worker)
+            worker.writer.close()
+            await asyncio.get_event_loop().run_in_executor(None, worker.process.join)
+
+    async def request(
+        self,
+        method: Union[str, HttpRequestType],
+        url: str,
+        timeout: TimeoutType = None,
+        data_builder: Optional[OkieRequestPart] = None,
+        headers: Optional[Headers] = None,
+        params: ParamsType = None,
+    ) -> Response:
+        """
+        Make request in the worker with the least requests in flight,
+        same as `okie.Okie.request` does. Workers, which exited, are left out;
+        requests in flight in them fail with `ConnectionResetError`.
+        """
+
+        if self._closed:
+            raise RuntimeError("ShardedOkie isn't started")
+        workers = [w for w in self._workers if not w.reading.done()]
+        if not workers:
+            raise ConnectionResetError("worker processes exited")
+
+        worker = min(workers, key=lambda w: len(w.pending))
+        job_id = next(self._ids)
+        waiter = worker.pending[job_id] = asyncio.get_event_loop().create_future()
+        try:
+            # the worker applies the timeout too, this one covers a worker that hangs
+            with deadline(make_timeout(timeout, self._okie_kwargs.get("timeout")).total):
+                worker.out.send((
+                    job_id,
+                    (method, url, timeout, data_builder, headers, False, params),
+                ))
+                await worker.writer.drain()
+                response = await waiter
+        finally:
+            worker.pending.pop(job_id, None)
+
+        response.url = url
+        return response
+
+    async def request_many(
+        self, requests: Iterable[Request], timeout: TimeoutType = None,
+    ) -> List[Response]:
+        """
+        Make requests concurrently, responses are in order of requests.
+        """
+
+        return list(await asyncio.gather(*(
+            self.request(
+                request.method, request.url, timeout,
+                request.data_builder, request.headers, request.params,
+            )
+            for request in map(lambda r: Request(*r), requests)
+        )))
+
+    async def close_all(self):
+        """
+        Let workers finish requests in flight and stop them.
+        """
+
+        self._closed = True
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.out.flush()
+            worker.writer.write_eof()
+        for worker in workers:
+            await worker.reading
+            worker.writer.close()
+            await asyncio.get_event_loop().run_in_executor(None, worker.process.join)
+
+    async def __aenter__(self) -> "ShardedOkie":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close_all()
+
+
+__all__ = ["ShardedOkie", "DEFAULT_SHM_THRESHOLD"]
@@ -0,0 +1,165 @@
+"""
+Blocking client for synchronous code, requests run on one background loop.
+"""
+
+from typing import Any, Deque, Optional, Tuple, Union
+from collections import deque
+from concurrent.futures import CancelledError, Future
+import asyncio
+import threading
+
+from .client import Okie
+from .response import Response
+from .types import Headers
+from .url import ParamsType
+from .ctrl.timeout import TimeoutType
+from .ctrl.loop import new_event_loop
+from ._builders import OkieRequestPart
+from .enums.http_request import HttpRequestType
+
+
+def _set_outcome(future: Future, task: asyncio.Future):
+    if task.cancelled():
+        future.set_exception(CancelledError())
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+class SyncOkie:
+    """
+    `okie.Okie` for threads: one background thread runs the loop with a single `okie.Okie`,
+    so all threads share its warm connection pool.
+
+    ```python
+    with SyncOkie(timeout=5) as okie:
+        response = okie.request("GET", "http://localhost/")
+        futures = [okie.submit("GET", url) for url in urls]
+    ```
+
+    Requests submitted while the loop is busy are handed over in one batch,
+    the loop thread is woken up once per batch rather than once per request.
+
+    ##### Parameters
+    - use_uvloop `bool` *`None` uses uvloop for the background loop if it's installed*
+    - okie_kwargs *arguments of `okie.Okie`*
+
+    !!! note
+        Responses are read in full before they're handed over, streaming isn't supported.
+    """
+
+    def __init__(self, use_uvloop: Optional[bool] = None, **okie_kwargs: Any):
+        self._loop = new_event_loop(use_uvloop)
+        self._lock = threading.Lock()
+        self._pending: Deque[Tuple[Future, tuple]] = deque()
+        self._scheduled = False
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="okie-loop", daemon=True)
+        self._thread.start()
+        try:
+            self.okie: Okie = self._call(self._make_okie(okie_kwargs))
+        except BaseException:
+            self._stop()
+            raise
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @staticmethod
+    async def _make_okie(okie_kwargs: dict) -> Okie:
+        return Okie(**okie_kwargs)
+
+    def _call(self, coroutine) -> Any:
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("SyncOkie can't be called from its loop thread, use SyncOkie.okie")
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, deque()
+            self._scheduled = False
+
+        for future, args in pending:
+            if not future.set_running_or_notify_cancel():
+                continue
+            task = self._loop.create_task(self.okie.request(*args))
+            task.add_done_callback(lambda t, f=future: _set_outcome(f, t))
+
+    def submit(
+        self,
+        method: Union[str, HttpRequestType],
+        url: str,
+        timeout: TimeoutType = None,
+        data_builder: Optional[OkieRequestPart] = None,
+        headers: Optional[Headers] = None,
+        params: ParamsType = None,
+    ) -> "Future[Response]":
+        """
+        Schedule the request on the loop, same arguments as `okie.Okie.request` takes.
+
+        ##### Returns
+        - `concurrent.futures.Future` of `okie.response.Response`
+        """
+
+        if self._closed:
+            raise RuntimeError("SyncOkie is closed")
+
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((
+                future, (method, url, timeout, data_builder, headers, False, params),
+            ))
+            wakeup = not self._scheduled
+            self._scheduled = True
+        if wakeup:
+            self._loop.call_soon_threadsafe(self._drain)
+        return future
+
+    def request(
+        self,
+        method: Union[str, HttpRequestType],
+        url: str,
+        timeout: TimeoutType = None,
+        data_builder: Optional[OkieRequestPart] = None,
+        headers: Optional[Headers] = None,
+        params: ParamsType = None,
+    ) -> Response:
+        """
+        Make the request and block until the response is read, see `okie.Okie.request`.
+        """
+
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("SyncOkie can't be called from its loop thread, use SyncOkie.okie")
+        return self.submit(method, url, timeout, data_builder, headers, params).result()
+
+    def close(self):
+        """
+        Close pooled connections and stop the loop thread.
+        """
+
+        if self._closed:
+            return
+
+        self._closed = True
+        try:
+            self._call(self.okie.close_all())
+        finally:
+            self._stop()
+
+    def _stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "SyncOkie":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+__all__ = ["SyncOkie"]
@@ -0,0 +1,118 @@
+"""
+Requests to one endpoint prepared in advance, see `okie.Okie.prepare`.
+"""
+
+from typing import Any, Optional
+
+from ._builders import OkieRequestPart, HTTPRequestFull
+from .types import Headers
+from .response import Response
+from .url import ParsedURL
+from .ctrl.asyncio import call_with_timeout
+from .ctrl.timeout import TimeoutType, make_timeout
+from .enums.http_request import HttpRequestType
+
+
+class RequestTemplate:
+    """
+    Method, URL and headers of requests resolved once: URL is parsed, pool key is made,
+    request line and static headers are encoded. Sending a request only encodes
+    its extra headers and the body.
+
+    Requests go through `cache`, `hedge` and `retry` of the client as ones made
+    with `okie.Okie.request` do.
+
+    ```python
+    template = okie.prepare("POST", "http://localhost/items", headers=Headers({"X-Api-Key": "..."}))
+    response = await template.send(body_builder=builder)
+    ```
+    """
+
+    __slots__ = ("okie", "method", "url", "parsed_url", "head_prefix", "headers", "cache_key")
+
+    def __init__(
+        self,
+        okie: Any,
+        method: str,
+        url: str,
+        parsed_url: ParsedURL,
+        head_prefix: bytes,
+        headers: Optional[Headers] = None,
+        cache_key: Optional[str] = None,
+    ):
+        self.okie = okie
+        self.method = method
+        self.url = url
+        self.parsed_url = parsed_url
+        self.head_prefix = head_prefix
+        self.headers = headers or Headers()
+        self.cache_key = cache_key or url
+
+    def _plain_request(
+        self, body_builder: Optional[OkieRequestPart], extra_headers: Optional[Headers],
+    ) -> HTTPRequestFull:
+        return HTTPRequestFull(
+            method=self.method,
+            host=self.parsed_url.host,
+            path=self.parsed_url.target,
+            sub_builder=body_builder,
+            headers=extra_headers,
+            head_prefix=self.head_prefix,
+        )
+
+    async def send(
+        self,
+        body_builder: Optional[OkieRequestPart] = None,
+        extra_headers: Optional[Headers] = None,
+        timeout: TimeoutType = None,
+        stream: bool = False,
+    ) -> Response:
+        """
+        Make the request, same as `okie.Okie.request` does.
+
+        ##### Parameters
+        - body_builder `okie._builders.OkieRequestPart` *built body of the request*
+        - extra_headers `okie.Headers` *headers of this request only*
+        - timeout `(float, okie.Timeout)` *optional timeout, as `okie.Okie.request` takes*
+        - stream `bool` *return as soon as headers are read*
+
+        ##### Returns
+        - `okie.response.Response`
+
+        !!! note
+            Extra headers are appended after the template's ones,
+            they don't replace headers of the same name.
+        """
+
+        okie = self.okie
+        method = HttpRequestType(self.method)
+        timeout = make_timeout(timeout, okie.timeout)
+
+        async def send(conditional: Optional[Headers]) -> Response:
+            return await okie._send_with_policies(
+                method, self.url, self.parsed_url,
+                self._plain_request(
+                    body_builder,
+                    conditional.get_merged(extra_headers) if conditional else extra_headers,
+                ),
+                stream, timeout,
+            )
+
+        if (
+            okie.cache is not None
+            and not stream
+            and body_builder is None
+            and method is HttpRequestType.GET
+        ):
+            future = okie.cache.fetch(
+                self.cache_key, self.url, self.headers.get_merged(extra_headers), send,
+            )
+        else:
+            future = send(None)
+        return await call_with_timeout(timeout=timeout.total, future=future)
+
+    def __repr__(self) -> str:
+        return "<RequestTemplate {} {}>".format(self.method, self.url)
+
+
+__all__ = ["RequestTemplate"]
@@ -1,4 +1,4 @@
-from typing import Iterable, Iterator, Tuple, MutableMapping, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Tuple, Mapping, MutableMapping, Optional, Union
 
 
 class header_key(str):
@@ -17,27 +17,42 @@ class header_key(str):
     """
 
     def __new__(cls, key: str):
-        return str.__new__(cls, key).lower()
+        return str.__new__(cls, key.lower())
 
     def __eq__(self, other: str):
         """
         Check if the given string is equal to header key. Case-insensitive
         """
-        return self == header_key(other)
+        if not isinstance(other, str):
+            return NotImplemented
+        return str.__eq__(self, other.lower())
+
+    def __ne__(self, other: str):
+        if not isinstance(other, str):
+            return NotImplemented
+        return str.__ne__(self, other.lower())
 
     def __contains__(self, item: str):
         """
         Checks if given string is substring of header key. Case-insensitive
         """
-        return header_key(item) in self
+        return str.__contains__(self, item.lower())
+
+    # stored lower-cased, so equal to plain lower-case strings as dict keys
+    __hash__ = str.__hash__
 
     __le__ = __ge__ = __gt__ = __lt__ = lambda *_: NotImplemented
 
 
 _Key = Union[str, header_key]
 
+_Entry = Tuple[str, ...]
+"""
+Header entry; original name followed by its values
+"""
+
 
-class Headers(MutableMapping[header_key, str]):
+class Headers(MutableMapping[str, str]):
     """
     Case-insensitive mutable mapping.
     Provides case-insensitive lookup and querying.
@@ -52,45 +67,75 @@ class Headers(MutableMapping[header_key, str]):
     h["connection"]  # raise KeyError: `connection`
     ```
 
+    Names keep their original casing for the wire, lookup is by lower-case name and
+    doesn't allocate when the key is given lower-cased.
+    Headers may have multiple values (e.g. `Set-Cookie`), see `add`/`getall`;
+    item lookup joins them with comma.
+    Copies share storage until either of them is changed.
+
     !!! note
         Headers are case-insensitive due to http headers spec
         [rfc](https://www.w3.org/Protocols/rfc2616/rfc2616-sec4.html#sec4.2)
     """
 
+    __slots__ = ("_data", "_shared")
+
     def __init__(
         self,
-        headers: Optional[Union[MutableMapping[_Key, str], Iterable[Tuple[_Key, str]]]] = None
+        headers: Optional[Union[Mapping[_Key, str], Iterable[Tuple[_Key, str]]]] = None
     ):
-        self._data: MutableMapping[header_key, str] = {}
+        self._data: Dict[str, _Entry] = {}
+        self._shared = False
         if headers:
-            is_map = isinstance(headers, MutableMapping)
-            for key, value in headers if not is_map else headers.items():
-                self._data[header_key(key)] = value
+            if isinstance(headers, Headers):
+                self._data = headers._data
+                self._shared = headers._shared = True
+                return
+
+            for key, value in headers.items() if isinstance(headers, Mapping) else headers:
+                self._data[key.lower()] = (key, value)
+
+    def _entry(self, key: _Key) -> _Entry:
+        data = self._data
+        entry = data.get(key)
+        if entry is None:
+            entry = data[key.lower()]
+        return entry
+
+    def _own(self) -> Dict[str, _Entry]:
+        if self._shared:
+            self._data = dict(self._data)
+            self._shared = False
+        return self._data
 
     def __setitem__(self, key: _Key, value: str):
         """
-        `key` will be eventually transformed to `okie.types.header_key` which is case-insensitive
+        Replaces all values of case-insensitive `key`
         """
 
-        self._data[header_key(key)] = value
+        self._own()[key.lower()] = (key, value)
 
     def __getitem__(self, item: _Key) -> str:
         """
-        Case-insensitive lookup for item(key) in headers
+        Case-insensitive lookup for item(key) in headers, multiple values are joined with comma
         """
 
-        return self._data[header_key(item)]
+        entry = self._entry(item)
+        return entry[1] if len(entry) == 2 else ", ".join(entry[1:])
 
     def __delitem__(self, key: _Key):
         """
         Case-insensitive removal of key from headers
         """
 
-        del self._data[header_key(key)]
+        del self._own()[key.lower()]
 
-    def __iter__(self) -> Iterator[header_key]:
+    def __contains__(self, item: object) -> bool:
+        return isinstance(item, str) and (item in self._data or item.lower() in self._data)
+
+    def __iter__(self) -> Iterator[str]:
         """
-        Iterates headers returning its keys
+        Iterates headers returning its lower-cased keys
         """
 
         return self._data.__iter__()
@@ -102,6 +147,36 @@ class Headers(MutableMapping[header_key, str]):
 
         return self._data.__len__()
 
+    def add(self, key: _Key, value: str):
+        """
+        Add value to the header keeping its other values
+        """
+
+        data = self._own()
+        lower = key.lower()
+        entry = data.get(lower)
+        data[lower] = (key, value) if entry is None else (*entry, value)
+
+    def getall(self, key: _Key) -> List[str]:
+        """
+        Get all values of the header, `KeyError` if there's none
+        """
+
+        return list(self._entry(key)[1:])
+
+    def raw_items(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterates (name, value) pairs in original casing, one pair per value
+        """
+
+        for entry in self._data.values():
+            name = entry[0]
+            for value in entry[1:]:
+                yield name, value
+
+    def copy(self) -> "Headers":
+        return Headers(self)
+
     def get_merged(self, headers: Optional['Headers']) -> 'Headers':
         """
         Merges two Headers into a new Headers object with respect non-self headers.
@@ -113,7 +188,17 @@ class Headers(MutableMapping[header_key, str]):
         new merged Headers object
         """
 
-        return Headers({**(headers or {}), **self})
+        if not headers:
+            return Headers(self)
+        if not self._data:
+            return Headers(headers)
+
+        merged = Headers()
+        if isinstance(headers, Headers):
+            merged._data = {**headers._data, **self._data}
+        else:
+            merged._data = {**Headers(headers)._data, **self._data}
+        return merged
 
 
 __all__ = ["header_key", "Headers"]
@@ -0,0 +1,110 @@
+"""
+URL parsing with caching and query string encoding.
+"""
+
+from typing import Any, Iterable, Mapping, NamedTuple, Optional, Tuple, Union
+from functools import lru_cache
+from urllib.parse import urlencode
+
+import httptools
+
+from .ctrl.asyncio import Origin, make_origin
+
+DEFAULT_URL_CACHE_SIZE = 1024
+
+
+class ParsedURL(NamedTuple):
+    """
+    Parts of URL needed to send a request to it.
+    """
+
+    host: bytes
+    port: Optional[int]
+    ssl: bool
+    target: bytes
+    """
+    Request target; path and query, the fragment isn't sent
+    """
+    origin: Origin
+
+
+@lru_cache(maxsize=DEFAULT_URL_CACHE_SIZE)
+def parse_url(url: str) -> ParsedURL:
+    """
+    Parse URL, results for the most recently used URLs are cached.
+    Raises `httptools.HttpParserInvalidURLError` for invalid URLs.
+    """
+
+    parsed = httptools.parse_url(url.encode())
+    ssl = parsed.schema.startswith(b"https") if parsed.schema else False
+    target = parsed.path or b"/"
+    if parsed.query:
+        target += b"?" + parsed.query
+    return ParsedURL(
+        host=parsed.host,
+        port=parsed.port,
+        ssl=ssl,
+        target=target,
+        origin=make_origin(parsed.host, parsed.port, ssl),
+    )
+
+
+ParamsType = Union[
+    None, str, bytes, "Query", Mapping[str, Any], Iterable[Tuple[str, Any]],
+]
+"""
+Query parameters; mapping or (name, value) pairs, sequence values are repeated,
+string or bytes are taken as already encoded query
+"""
+
+
+def encode_query(params: ParamsType) -> bytes:
+    """
+    Encode query parameters with `application/x-www-form-urlencoded` rules.
+    """
+
+    if not params:
+        return b""
+    if isinstance(params, Query):
+        return params.encoded
+    if isinstance(params, bytes):
+        return params
+    if isinstance(params, str):
+        return params.encode()
+    return urlencode(params, doseq=True).encode("ascii")
+
+
+class Query:
+    """
+    Query parameters encoded once, pass it as `params` of repeated requests.
+
+    ```python
+    page = Query({"per_page": 100, "fields": ["id", "name"]})
+    await okie.request("GET", "https://api.example.com/items", params=page)
+    ```
+    """
+
+    __slots__ = ("encoded",)
+
+    def __init__(self, params: ParamsType):
+        self.encoded = encode_query(params)
+
+    def __bool__(self) -> bool:
+        return bool(self.encoded)
+
+    def __repr__(self) -> str:
+        return "Query({!r})".format(self.encoded)
+
+
+def with_query(target: bytes, params: ParamsType) -> bytes:
+    """
+    Append query parameters to request target, which may have its own query already.
+    """
+
+    query = encode_query(params)
+    if not query:
+        return target
+    return b"%b%b%b" % (target, b"&" if b"?" in target else b"?", query)
+
+
+__all__ = ["ParsedURL", "parse_url", "ParamsType", "encode_query", "Query", "with_query"]
@@ -0,0 +1,55 @@
+import asyncio
+
+from okie import Okie, FormDataBuilder, MultipartBuilder, Headers
+from okie._builders import HTTPRequestFull
+
+from ..server import serve
+
+
+PAYLOAD = b"\x00" * 1024
+
+
+def make_builder() -> MultipartBuilder:
+    with MultipartBuilder() as builder:
+        builder.add_form_data("field", b"value", Headers())
+        builder.add_binary_data("file", Headers(), PAYLOAD, "a.bin", "application/octet-stream")
+    return builder
+
+
+def test_segments_are_not_joined():
+    builder = make_builder()
+    request = HTTPRequestFull("POST", b"localhost", b"/", builder)
+
+    # head, then head and value of each field, then the trailer
+    segments = request.segments
+    assert len(segments) == 6
+    assert segments[1] is builder.intermediate[0]
+    assert segments[4] is PAYLOAD
+    assert builder.content_length == len(builder.body) == sum(map(len, segments[1:]))
+    assert request.full == request.head + builder.body
+    assert b"content-length: %d\r\n" % builder.content_length in request.head
+
+
+def test_form_data_is_received_as_sent():
+    async def main():
+        async with serve() as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            builder = make_builder()
+            response = await okie.request("POST", url, data_builder=builder)
+            assert response.body == builder.body
+
+            builder.clean()
+            with builder:
+                pass
+            assert (await okie.request("POST", url, data_builder=builder)).body == builder.body
+            await okie.close_all()
+
+    asyncio.run(main())
+
+
+def test_empty_form_data():
+    builder = FormDataBuilder()
+    assert HTTPRequestFull("GET", b"localhost", b"/", builder).segments == [
+        b"GET / HTTP/1.1\r\nhost: localhost\r\nuser-agent: okie/0.x\r\n\r\n"
+    ]
@@ -0,0 +1,53 @@
+from okie import FormURLEncodedBuilder
+
+
+def test_builds_append_new_fields():
+    builder = FormURLEncodedBuilder()
+    with builder:
+        builder.add_field("a", "1 2")
+        builder.add_field("b", "&")
+    assert builder.body == b"a=1+2&b=%26"
+    assert builder.content_length == len(builder.body)
+
+    builder.build()
+    builder.add_field("c", "3")
+    builder.build()
+    assert builder.body == b"a=1+2&b=%26&c=3"
+
+
+def test_clean_keeps_capacity():
+    builder = FormURLEncodedBuilder()
+    with builder:
+        for i in range(100):
+            builder.add_field("field%d" % i, "value")
+    capacity = len(builder._buffer._data)
+
+    builder.clean()
+    assert builder.content_length == 0 and builder.body == b""
+    with builder:
+        builder.add_field("short", "form")
+    assert builder.body == b"short=form"
+    assert len(builder._buffer._data) == capacity
+
+
+def test_segments_are_views_kept_intact():
+    builder = FormURLEncodedBuilder()
+    with builder:
+        builder.add_field("a", "1")
+    segment, = builder.segments
+    assert isinstance(segment, memoryview) and segment == b"a=1"
+
+    builder.clean()
+    with builder:
+        builder.add_field("b", "2")
+    # the view may still be written, so the new form doesn't overwrite it
+    assert segment == b"a=1" and builder.body == b"b=2"
+
+    segment.release()
+    capacity = len(builder._buffer._data)
+    builder.segments
+    builder.clean()
+    with builder:
+        builder.add_field("c", "3")
+    assert builder.body == b"c=3"
+    assert len(builder._buffer._data) == capacity
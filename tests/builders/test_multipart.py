@@ -0,0 +1,101 @@
+import asyncio
+import email.parser
+import io
+
+import pytest
+
+from okie import Okie, MultipartBuilder, Headers
+
+from ..server import Request, make_response, serve
+
+CONTENT = bytes(range(256)) * 1024
+
+
+def parse_parts(content_type: str, body: bytes) -> dict:
+    message = email.parser.BytesParser().parsebytes(
+        b"content-type: %b\r\n\r\n%b" % (content_type.encode(), body)
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.get_payload()
+    }
+
+
+async def chunks():
+    for i in range(0, len(CONTENT), 10000):
+        yield CONTENT[i:i + 10000]
+
+
+def test_upload_files_lazily(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(CONTENT)
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        return make_response(b"ok")
+
+    async def main():
+        async with serve(handler) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+
+            with MultipartBuilder() as builder:
+                builder.add_form_data("field", b"value", Headers())
+                builder.add_file("path", path)
+                builder.add_file("object", io.BytesIO(CONTENT), filename="b.bin")
+            assert builder.content_length > 2 * len(CONTENT)
+            for _ in range(2):
+                await okie.request("POST", url, data_builder=builder)
+
+            with MultipartBuilder() as streamed:
+                streamed.add_file("iterable", chunks(), content_type="text/plain")
+            assert streamed.content_length is None
+            await okie.request("POST", url, data_builder=streamed)
+            await okie.close_all()
+            return builder, streamed
+
+    builder, streamed = asyncio.run(main())
+
+    for request in received[:2]:
+        assert request.header(b"content-length") == str(builder.content_length).encode()
+        assert parse_parts(builder.content_type, request.body) == {
+            "field": b"value", "path": CONTENT, "object": CONTENT,
+        }
+
+    assert received[2].header(b"transfer-encoding") == b"chunked"
+    assert parse_parts(streamed.content_type, received[2].body) == {"iterable": CONTENT}
+
+
+def test_file_part_is_sent_up_to_its_size(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(CONTENT)
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        return make_response(b"ok")
+
+    async def main():
+        async with serve(handler) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+
+            with MultipartBuilder() as builder:
+                builder.add_file("path", path, size=1000)
+                builder.add_file("object", io.BytesIO(CONTENT), size=1000)
+            await okie.request("POST", url, data_builder=builder)
+
+            for source in (path, io.BytesIO(CONTENT)):
+                with MultipartBuilder() as short:
+                    short.add_file("file", source, size=len(CONTENT) + 1)
+                with pytest.raises(ValueError):
+                    await okie.request("POST", url, data_builder=short)
+            await okie.close_all()
+            return builder
+
+    builder = asyncio.run(main())
+    assert len(received) == 1
+    assert parse_parts(builder.content_type, received[0].body) == {
+        "path": CONTENT[:1000], "object": CONTENT[:1000],
+    }
@@ -0,0 +1,244 @@
+"""
+Local stand-in HTTP/1.1 server for tests.
+"""
+
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+import socket
+import struct
+
+import httptools
+
+
+class Request:
+    def __init__(self):
+        self.method: Optional[str] = None
+        self.url = b""
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.body = b""
+        self.complete = False
+        # handler sets it to close the connection after the response
+        self.close = False
+        # or to reset it
+        self.reset = False
+
+    def on_url(self, url: bytes):
+        self.url += url
+
+    def on_header(self, name: bytes, value: bytes):
+        self.headers.append((name.lower(), value))
+
+    def on_body(self, body: bytes):
+        self.body += body
+
+    def on_message_complete(self):
+        self.complete = True
+
+    def header(self, name: bytes) -> Optional[bytes]:
+        for k, v in self.headers:
+            if k == name:
+                return v
+        return None
+
+
+class Connection:
+    """
+    Dispatches parser callbacks to requests, so pipelined requests are served in order.
+    """
+
+    def __init__(self):
+        self.parser: Optional[httptools.HttpRequestParser] = None
+        self.request: Optional[Request] = None
+        self.complete: List[Request] = []
+
+    def on_message_begin(self):
+        self.request = Request()
+
+    def on_url(self, url: bytes):
+        self.request.on_url(url)
+
+    def on_header(self, name: bytes, value: bytes):
+        self.request.on_header(name, value)
+
+    def on_body(self, body: bytes):
+        self.request.on_body(body)
+
+    def on_message_complete(self):
+        self.request.method = self.parser.get_method().decode()
+        self.request.on_message_complete()
+        self.complete.append(self.request)
+
+
+Handler = Callable[[Request], Awaitable[bytes]]
+
+
+def make_response(
+    body: bytes = b"",
+    status: int = 200,
+    headers: Tuple[Tuple[bytes, bytes], ...] = (),
+) -> bytes:
+    head = b"HTTP/1.1 %d OK\r\ncontent-length: %d\r\n" % (status, len(body))
+    for k, v in headers:
+        head += b"%b: %b\r\n" % (k, v)
+    return head + b"\r\n" + body
+
+
+async def echo(request: Request) -> bytes:
+    return make_response(request.body or request.url)
+
+
+@asynccontextmanager
+async def serve(handler: Handler = echo, ssl: Any = None):
+    """
+    Serve `handler` on a random local port, yields the server object with
+    `port` and `connections` (count of accepted connections) attached.
+    """
+
+    async def on_connection(r: asyncio.StreamReader, w: asyncio.StreamWriter):
+        server.connections += 1
+        connection = Connection()
+        parser = connection.parser = httptools.HttpRequestParser(connection)
+        try:
+            while True:
+                data = await r.read(65536)
+                if not data:
+                    return
+                parser.feed_data(data)
+                while connection.complete:
+                    request = connection.complete.pop(0)
+                    response = await handler(request)
+                    if request.method == "HEAD":
+                        response = response[:response.index(b"\r\n\r\n") + 4]
+                    w.write(response)
+                    await w.drain()
+                    if request.reset:
+                        sock = w.get_extra_info("socket")
+                        sock.setsockopt(
+                            socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0),
+                        )
+                        return
+                    if request.close:
+                        return
+        except (ConnectionError, httptools.HttpParserError):
+            pass
+        finally:
+            w.close()
+
+    server = await asyncio.start_server(on_connection, "127.0.0.1", 0, ssl=ssl)
+    server.port = server.sockets[0].getsockname()[1]
+    server.connections = 0
+    async with server:
+        yield server
+
+
+H2Handler = Callable[[Request], Awaitable[Tuple[int, Tuple[Tuple[bytes, bytes], ...], bytes]]]
+
+
+async def h2_echo(request: Request) -> Tuple[int, tuple, bytes]:
+    return 200, (), request.body or request.url
+
+
+@asynccontextmanager
+async def serve_h2(handler: H2Handler = h2_echo, ssl: Any = None):
+    """
+    Serve `handler` over HTTP/2 (h2c with prior knowledge unless `ssl` is given),
+    yields the server object with `port`, `connections` and `max_streams`
+    (the most streams in flight at once) attached.
+    """
+
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+
+    async def on_connection(r: asyncio.StreamReader, w: asyncio.StreamWriter):
+        server.connections += 1
+        conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False, header_encoding=None)
+        )
+        conn.initiate_connection()
+        w.write(conn.data_to_send())
+        requests = {}
+        windows = {}
+        tasks = set()
+
+        async def send_data(stream_id: int, data: bytes):
+            while data:
+                size = min(
+                    conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size, len(data),
+                )
+                if size <= 0:
+                    windows[stream_id] = asyncio.get_event_loop().create_future()
+                    await windows[stream_id]
+                    continue
+                conn.send_data(stream_id, data[:size])
+                data = data[size:]
+                w.write(conn.data_to_send())
+            conn.end_stream(stream_id)
+            w.write(conn.data_to_send())
+
+        async def respond(stream_id: int, request: Request):
+            server.active += 1
+            server.max_streams = max(server.max_streams, server.active)
+            try:
+                status, headers, body = await handler(request)
+            finally:
+                server.active -= 1
+            if request.reset:
+                conn.reset_stream(stream_id)
+                w.write(conn.data_to_send())
+                return
+            try:
+                conn.send_headers(stream_id, [
+                    (b":status", str(status).encode()),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ], end_stream=not body or request.method == "HEAD")
+                w.write(conn.data_to_send())
+                if body and request.method != "HEAD":
+                    await send_data(stream_id, body)
+            except h2.exceptions.StreamClosedError:
+                # reset by the client
+                pass
+
+        try:
+            while True:
+                data = await r.read(65536)
+                if not data:
+                    return
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        request = requests[event.stream_id] = Request()
+                        for name, value in event.headers:
+                            if name == b":method":
+                                request.method = value.decode()
+                            elif name == b":path":
+                                request.url = value
+                            else:
+                                request.on_header(name, value)
+                    elif isinstance(event, h2.events.DataReceived):
+                        requests[event.stream_id].on_body(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        task = asyncio.ensure_future(respond(event.stream_id, requests.pop(event.stream_id)))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+                        for waiter in windows.values():
+                            if not waiter.done():
+                                waiter.set_result(None)
+                        windows.clear()
+                w.write(conn.data_to_send())
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            w.close()
+
+    server = await asyncio.start_server(on_connection, "127.0.0.1", 0, ssl=ssl)
+    server.port = server.sockets[0].getsockname()[1]
+    server.connections = server.active = server.max_streams = 0
+    async with server:
+        yield server
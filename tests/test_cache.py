@@ -0,0 +1,211 @@
+import asyncio
+
+import pytest
+
+from okie import Okie, Headers, ResponseCache, MemoryStorage, DiskStorage
+from okie.cache import CacheEntry
+
+from .server import Request, make_response, serve
+
+
+def run_cached(handler, requests, cache=None):
+    """
+    Send batches of concurrent requests, a batch is a count or a list of headers.
+    """
+
+    async def main():
+        async with serve(handler) as server:
+            okie = Okie(timeout=5, cache=cache or ResponseCache())
+            url = "http://127.0.0.1:%d/item" % server.port
+            responses = []
+            for batch in requests:
+                if isinstance(batch, int):
+                    batch = [None] * batch
+                responses.extend(await asyncio.gather(*(
+                    okie.request("GET", url, headers=headers) for headers in batch
+                )))
+            await okie.close_all()
+            return responses
+
+    return asyncio.run(main())
+
+
+def test_fresh_response_is_served_from_cache():
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        return make_response(b"fresh", headers=((b"cache-control", b"max-age=60"),))
+
+    responses = run_cached(handler, [1, 1])
+    assert [r.body for r in responses] == [b"fresh", b"fresh"]
+    assert len(received) == 1
+
+
+def test_stale_response_is_revalidated():
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        if request.header(b"if-none-match") == b'"v1"':
+            return make_response(status=304, headers=((b"etag", b'"v1"'),))
+        return make_response(b"tagged", headers=((b"etag", b'"v1"'), (b"cache-control", b"no-cache")))
+
+    responses = run_cached(handler, [1, 1])
+    assert [r.status_code for r in responses] == [200, 200]
+    assert [r.body for r in responses] == [b"tagged", b"tagged"]
+    assert len(received) == 2
+    assert received[1].header(b"if-none-match") == b'"v1"'
+
+
+def test_concurrent_misses_are_coalesced():
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        await asyncio.sleep(0.05)
+        return make_response(b"once", headers=((b"cache-control", b"max-age=60"),))
+
+    responses = run_cached(handler, [5])
+    assert [r.body for r in responses] == [b"once"] * 5
+    assert len(received) == 1
+
+
+def test_no_store_is_not_cached():
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        return make_response(b"secret", headers=((b"cache-control", b"no-store"),))
+
+    run_cached(handler, [1, 1])
+    assert len(received) == 2
+
+
+def test_variants_and_credentials_are_not_shared():
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        await asyncio.sleep(0.05)
+        if request.header(b"authorization"):
+            return make_response(request.header(b"authorization"), headers=(
+                (b"cache-control", b"max-age=60"),
+            ))
+        return make_response(request.header(b"accept-language"), headers=(
+            (b"cache-control", b"max-age=60"), (b"vary", b"Accept-Language"),
+        ))
+
+    responses = run_cached(handler, [
+        [Headers({"Accept-Language": "en"}), Headers({"Accept-Language": "fr"})],
+        [Headers({"Authorization": "alice"}), Headers({"Authorization": "bob"})],
+        [Headers({"Authorization": "carol"})],
+    ])
+    assert [r.body for r in responses] == [b"en", b"fr", b"alice", b"bob", b"carol"]
+    assert len(received) == 5
+
+
+def test_public_authorized_response_is_stored():
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        return make_response(b"shared", headers=((b"cache-control", b"public, max-age=60"),))
+
+    responses = run_cached(handler, [
+        [Headers({"Authorization": "alice"})], [Headers({"Authorization": "bob"})],
+    ])
+    assert [r.body for r in responses] == [b"shared", b"shared"]
+    assert len(received) == 1
+
+
+def entry(body: bytes) -> CacheEntry:
+    return CacheEntry(200, b"OK", [(b"cache-control", b"max-age=60")], body, 0.0, 0.0)
+
+
+def test_memory_storage_evicts_least_recently_used():
+    async def main():
+        storage = MemoryStorage(max_bytes=entry(b"x" * 100).size * 2)
+        await storage.put("a", entry(b"x" * 100))
+        await storage.put("b", entry(b"x" * 100))
+        assert await storage.get("a") is not None
+        await storage.put("c", entry(b"x" * 100))
+        assert await storage.get("b") is None
+        assert await storage.get("a") is not None and await storage.get("c") is not None
+
+    asyncio.run(main())
+
+
+def test_disk_storage_survives_reopening(tmp_path):
+    async def main():
+        await DiskStorage(str(tmp_path)).put("http://example.com/", entry(b"on disk"))
+        return await DiskStorage(str(tmp_path)).get("http://example.com/")
+
+    reopened = asyncio.run(main())
+    assert reopened is not None
+    response = reopened.to_response("http://example.com/")
+    assert (response.status_code, response.body) == (200, b"on disk")
+    assert response.headers.get("cache-control") == "max-age=60"
+    assert [path.suffix for path in tmp_path.iterdir()] == [".entry"]
+
+
+def test_disk_storage_broken_entry_is_a_miss(tmp_path):
+    async def main():
+        storage = DiskStorage(str(tmp_path))
+        await storage.put("http://example.com/", entry(b"on disk"))
+        for path in tmp_path.iterdir():
+            path.write_bytes(b"garbage")
+        missed = await storage.get("http://example.com/")
+        return missed, storage.size
+
+    assert asyncio.run(main()) == (None, 0)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stalled_shared_fetch_is_bounded_by_timeout():
+    received = []
+
+    async def stall_first(request: Request) -> bytes:
+        received.append(request)
+        if len(received) == 1:
+            await asyncio.sleep(10)
+        return make_response(b"recovered", headers=((b"cache-control", b"max-age=60"),))
+
+    async def main():
+        async with serve(stall_first) as server:
+            okie = Okie(timeout=0.2, cache=ResponseCache())
+            url = "http://127.0.0.1:%d/item" % server.port
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.gather(okie.request("GET", url), okie.request("GET", url))
+            # sent right away, so it mustn't join the cancelled fetch
+            response = await okie.request("GET", url)
+            stats = okie.stats()
+            await okie.close_all()
+            return response, stats
+
+    response, stats = asyncio.run(main())
+    assert response.body == b"recovered"
+    assert len(received) == 2
+    assert stats.busy == 0
+
+
+def test_batch_requests_go_through_cache():
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        return make_response(request.url, headers=((b"cache-control", b"max-age=60"),))
+
+    async def main():
+        async with serve(handler) as server:
+            okie = Okie(timeout=5, cache=ResponseCache())
+            url = "http://127.0.0.1:%d/" % server.port
+            requests = [("GET", url + str(i % 2)) for i in range(4)]
+            batch = await okie.request_many(requests)
+            mapped = [result.response async for result in okie.map(requests, ordered=True)]
+            await okie.close_all()
+            return batch + mapped
+
+    responses = asyncio.run(main())
+    assert [r.body for r in responses] == [b"/0", b"/1"] * 4
+    assert sorted(r.url for r in received) == [b"/0", b"/1"]
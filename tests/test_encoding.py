@@ -0,0 +1,80 @@
+import asyncio
+import gzip
+import zlib
+
+from okie import Okie, CompressedBuilder, FormURLEncodedBuilder
+from okie.encoding import make_decoder
+
+from .server import Request, make_response, serve
+
+CONTENT = b"".join(b"line %d\n" % i for i in range(10000))
+
+
+def raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def test_decoders_decode_incrementally():
+    for encoding, encoded in (
+        ("gzip", gzip.compress(CONTENT, mtime=0)),
+        ("deflate", zlib.compress(CONTENT)),
+        ("deflate", raw_deflate(CONTENT)),
+        ("deflate, gzip", gzip.compress(zlib.compress(CONTENT))),
+    ):
+        decoder = make_decoder(encoding)
+        out = b"".join(decoder.decompress(encoded[i:i + 100]) for i in range(0, len(encoded), 100))
+        assert out + decoder.flush() == CONTENT
+
+    assert make_decoder("identity") is None
+    assert make_decoder("compress") is None
+
+
+def test_responses_are_decompressed():
+    received = []
+
+    async def compressed(request: Request) -> bytes:
+        received.append(request)
+        if request.url == b"/chunked":
+            body = gzip.compress(CONTENT, mtime=0)
+            return (
+                b"HTTP/1.1 200 OK\r\ncontent-encoding: gzip\r\ntransfer-encoding: chunked\r\n\r\n"
+                + b"".join(
+                    b"%x\r\n%b\r\n" % (len(body[i:i + 1000]), body[i:i + 1000])
+                    for i in range(0, len(body), 1000)
+                )
+                + b"0\r\n\r\n"
+            )
+        if request.url == b"/upload":
+            return make_response(gzip.decompress(request.body))
+        return make_response(gzip.compress(CONTENT, mtime=0), headers=((b"Content-Encoding", b"gzip"),))
+
+    async def main():
+        async with serve(compressed) as server:
+            url = "http://127.0.0.1:%d" % server.port
+
+            okie = Okie(timeout=5)
+            assert (await okie.request("GET", url + "/")).body == gzip.compress(CONTENT, mtime=0)
+
+            okie = Okie(timeout=5, decompress=True)
+            response = await okie.request("GET", url + "/")
+            assert response.body == CONTENT
+            assert len(response) == len(CONTENT)
+            assert "content-encoding" not in response.headers
+            assert response.headers["original-content-encoding"] == "gzip"
+            response = await okie.request("GET", url + "/chunked", stream=True)
+            chunks = [chunk async for chunk in response]
+            assert b"".join(chunks) == CONTENT
+
+            with FormURLEncodedBuilder() as builder:
+                builder.add_field("key", "value" * 1000)
+            response = await okie.request(
+                "POST", url + "/upload", data_builder=CompressedBuilder(builder),
+            )
+            assert response.body == builder.body
+            await okie.close_all()
+
+    asyncio.run(main())
+    assert received[0].header(b"accept-encoding") is None
+    assert received[1].header(b"accept-encoding").startswith(b"gzip, deflate")
+    assert received[3].header(b"content-encoding") == b"gzip"
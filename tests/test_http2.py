@@ -0,0 +1,163 @@
+import asyncio
+import shutil
+import ssl
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from okie import Okie, FormURLEncodedBuilder
+from okie.ctrl import make_ssl_context
+from okie.ctrl.http2 import Http2Stream
+from okie.response import Http2BodyStream
+
+from .server import Request, serve, serve_h2
+
+pytest.importorskip("h2")
+
+
+def test_http2_requires_h2(monkeypatch):
+    monkeypatch.setattr("okie.ctrl.asyncio.HTTP2_AVAILABLE", False)
+    with pytest.raises(RuntimeError):
+        Okie(timeout=5, http2=True)
+    Okie(timeout=5)
+
+
+def test_concurrent_requests_share_one_connection():
+    async def slow(request: Request):
+        await asyncio.sleep(0.05)
+        return 200, ((b"x-path", request.url),), request.url
+
+    async def main():
+        async with serve_h2(slow) as server:
+            okie = Okie(timeout=5, http2=True, http2_prior_knowledge=True)
+            responses = await asyncio.gather(*(
+                okie.request("GET", "http://127.0.0.1:%d/%d" % (server.port, i))
+                for i in range(20)
+            ))
+            stats = okie.stats()
+            await okie.close_all()
+            return responses, server, stats
+
+    responses, server, stats = asyncio.run(main())
+    assert [r.body for r in responses] == [b"/%d" % i for i in range(20)]
+    assert responses[0].status_code == 200 and responses[0].status == "OK"
+    assert responses[3].headers["x-path"] == "/3"
+    assert server.connections == 1
+    assert server.max_streams == 20
+    assert stats.created == 1
+
+
+def test_large_bodies_respect_flow_control():
+    async def main():
+        async with serve_h2() as server:
+            okie = Okie(timeout=5, http2=True, http2_prior_knowledge=True)
+            builder = FormURLEncodedBuilder()
+            builder.add_field("data", "x" * 300000)
+            builder.build()
+            response = await okie.request(
+                "POST", "http://127.0.0.1:%d/" % server.port, data_builder=builder,
+            )
+            await okie.close_all()
+            return response
+
+    response = asyncio.run(main())
+    assert response.body == b"data=" + b"x" * 300000
+
+
+def test_discarded_stream_keeps_connection():
+    async def main():
+        async with serve_h2() as server:
+            okie = Okie(timeout=5, http2=True, http2_prior_knowledge=True)
+            url = "http://127.0.0.1:%d/" % server.port
+            async with await okie.request("GET", url + "first", stream=True):
+                pass
+            second = await okie.request("GET", url + "second")
+            await okie.close_all()
+            return second, server.connections
+
+    second, connections = asyncio.run(main())
+    assert second.body == b"/second"
+    assert connections == 1
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is required to make a certificate")
+
+    path = tmp_path_factory.mktemp("tls")
+    cert, key = path / "cert.pem", path / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+            "-keyout", str(key), "-out", str(cert),
+        ],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+@pytest.mark.parametrize("protocols", [["h2", "http/1.1"], ["http/1.1"]])
+def test_alpn_negotiates_or_falls_back(certificate, protocols):
+    cert, key = certificate
+    server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_context.load_cert_chain(cert, key)
+    server_context.set_alpn_protocols(protocols)
+
+    async def main():
+        serving = serve_h2(ssl=server_context) if "h2" in protocols else serve(ssl=server_context)
+        async with serving as server:
+            okie = Okie(
+                timeout=5, http2=True,
+                ssl_context=make_ssl_context(cafile=cert, alpn_protocols=("h2", "http/1.1")),
+            )
+            responses = await asyncio.gather(*(
+                okie.request("GET", "https://localhost:%d/tls" % server.port) for _ in range(3)
+            ))
+            shared = bool(okie._http2_connections)
+            await okie.close_all()
+            return responses, shared, server.connections
+
+    responses, shared, connections = asyncio.run(main())
+    assert [r.body for r in responses] == [b"/tls"] * 3
+    assert shared is ("h2" in protocols)
+    if shared:
+        assert connections == 1
+
+
+def test_stream_reset_before_headers_fails_request():
+    async def reset_first(request: Request):
+        request.reset = request.url == b"/reset"
+        return 200, (), request.url
+
+    async def main():
+        async with serve_h2(reset_first) as server:
+            okie = Okie(timeout=5, http2=True, http2_prior_knowledge=True)
+            url = "http://127.0.0.1:%d/" % server.port
+            with pytest.raises(ConnectionResetError):
+                await okie.request("GET", url + "reset")
+            # the connection is still shared by other streams
+            response = await okie.request("GET", url + "ok")
+            await okie.close_all()
+            return response, server.connections
+
+    response, connections = asyncio.run(main())
+    assert (response.body, connections) == (b"/ok", 1)
+
+
+def test_stream_ended_before_headers_fails_head():
+    closed = []
+
+    async def main():
+        stream = Http2Stream(SimpleNamespace(close_stream=closed.append), 1)
+        body_stream = Http2BodyStream(stream, b"GET")
+        reading = asyncio.ensure_future(body_stream.read_head())
+        await asyncio.sleep(0)
+        stream.on_end()
+        with pytest.raises(ConnectionResetError):
+            await asyncio.wait_for(reading, 1)
+        return stream
+
+    assert closed == [asyncio.run(main())]
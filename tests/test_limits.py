@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import pytest
+
+from okie import Okie, RateLimit, Timeout
+from okie.ctrl.asyncio import LIMITERS_SWEEP_SIZE
+from okie.ctrl.limits import OriginLimiter, parse_retry_after
+
+from .server import Request, make_response, serve
+
+
+def test_rate_limit_spaces_requests():
+    async def main():
+        async with serve() as server:
+            url = "http://127.0.0.1:%d/" % server.port
+            okie = Okie(timeout=5, rate_limits={url: RateLimit(rate=20, burst=2)})
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(okie.request("GET", url) for _ in range(6)))
+            elapsed = time.perf_counter() - started
+            await okie.close_all()
+            return responses, elapsed
+
+    responses, elapsed = asyncio.run(main())
+    assert all(r.status_code == 200 for r in responses)
+    # burst of two, then four more at 20 per second
+    assert 0.18 <= elapsed < 1
+
+
+def test_max_in_flight_caps_concurrency():
+    in_flight = []
+    peak = []
+
+    async def slow(request: Request) -> bytes:
+        in_flight.append(request)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.02)
+        in_flight.remove(request)
+        return make_response(request.url)
+
+    async def main():
+        async with serve(slow) as server:
+            okie = Okie(timeout=5, default_rate_limit=RateLimit(max_in_flight=2))
+            url = "http://127.0.0.1:%d/" % server.port
+            responses = await asyncio.gather(*(okie.request("GET", url) for _ in range(8)))
+            await okie.close_all()
+            return responses
+
+    assert [r.body for r in asyncio.run(main())] == [b"/"] * 8
+    assert max(peak) == 2
+
+
+def test_retry_after_pauses_origin():
+    calls = []
+
+    async def throttle_first(request: Request) -> bytes:
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            return make_response(status=429, headers=((b"retry-after", b"1"),))
+        return make_response(b"ok")
+
+    async def main():
+        async with serve(throttle_first) as server:
+            url = "http://127.0.0.1:%d/" % server.port
+            okie = Okie(timeout=5, rate_limits={url: RateLimit(rate=100, burst=10)})
+            first = await okie.request("GET", url)
+            second = await okie.request("GET", url)
+            await okie.close_all()
+            return first, second
+
+    first, second = asyncio.run(main())
+    assert (first.status_code, second.status_code) == (429, 200)
+    assert calls[1] - calls[0] >= 0.9
+
+
+def test_pool_timeout_covers_admission():
+    async def main():
+        async with serve() as server:
+            url = "http://127.0.0.1:%d/" % server.port
+            okie = Okie(timeout=5, rate_limits={url: RateLimit(rate=5)})
+            await okie.request("GET", url)
+            with pytest.raises(asyncio.TimeoutError):
+                await okie.request("GET", url, timeout=Timeout(total=5, pool=0.05))
+            # the timed out waiter doesn't hold the origin
+            response = await okie.request("GET", url)
+            await okie.close_all()
+            return response
+
+    assert asyncio.run(main()).status_code == 200
+
+
+def test_limiter_adapts_to_throttling():
+    limiter = OriginLimiter(RateLimit(rate=10, burst=1))
+    now = limiter.updated
+    assert limiter.delay(now) == 0
+    limiter.admit()
+    assert limiter.delay(now) == pytest.approx(0.1)
+
+    limiter.on_response(429, None, now)
+    assert limiter.rate == 5
+    # responses to requests sent before the decrease don't cut the rate again
+    limiter.on_response(429, None, now + 0.05)
+    assert limiter.rate == 5
+    limiter.on_response(200, None, now + 0.1)
+    assert limiter.rate == 5.5
+
+    limiter.on_response(503, "2", now)
+    assert limiter.delay(now + 1) == pytest.approx(1)
+
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+def test_idle_default_limiters_are_dropped():
+    okie = Okie(
+        timeout=5,
+        rate_limits={"http://configured": RateLimit(rate=10)},
+        default_rate_limit=RateLimit(max_in_flight=1),
+    )
+    busy = okie._limiter((b"http", b"busy", 80))
+    busy.admit()
+    for i in range(1000):
+        okie._limiter((b"http", b"host%d" % i, 80))
+
+    assert len(okie._limiters) <= 2 * LIMITERS_SWEEP_SIZE
+    assert okie._limiters[(b"http", b"busy", 80)] is busy
+    assert (b"http", b"configured", 80) in okie._limiters
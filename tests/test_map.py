@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from okie import Okie, Request
+
+from .server import Request as ServerRequest, make_response, serve
+
+
+async def delayed(request: ServerRequest) -> bytes:
+    # /<delay in ms>
+    await asyncio.sleep(int(request.url.strip(b"/") or 0) / 1000)
+    return make_response(request.url)
+
+
+def test_map_pulls_lazily_and_limits_in_flight():
+    pulled = 0
+    peak = 0
+
+    async def main():
+        nonlocal pulled, peak
+        async with serve(delayed) as server:
+            okie = Okie(timeout=5)
+
+            def requests():
+                nonlocal pulled
+                for i in range(20):
+                    pulled += 1
+                    yield Request("GET", "http://127.0.0.1:%d/%d" % (server.port, i % 3))
+
+            results = []
+            async for result in okie.map(requests(), concurrency=4):
+                peak = max(peak, pulled - len(results))
+                results.append(result)
+            await okie.close_all()
+            return results
+
+    results = asyncio.run(main())
+    assert sorted(r.index for r in results) == list(range(20))
+    assert all(r.response.body == r.request.url[r.request.url.rindex("/"):].encode() for r in results)
+    assert peak <= 4
+
+
+def test_map_ordered_and_errors():
+    async def main():
+        async with serve(delayed) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            delays = [50, 0, 0, 10, 0]
+            ordered = [
+                r.index async for r in okie.map(
+                    (("GET", url + str(d)) for d in delays), concurrency=3, ordered=True,
+                )
+            ]
+            unordered = [
+                r.index async for r in okie.map((("GET", url + str(d)) for d in delays), concurrency=5)
+            ]
+
+            async def refused():
+                yield Request("GET", url + "0")
+                yield Request("GET", "http://127.0.0.1:1/")
+
+            captured = [r async for r in okie.map(refused(), return_exceptions=True)]
+            with pytest.raises(OSError):
+                async for _ in okie.map(refused(), ordered=True):
+                    pass
+            await okie.close_all()
+            return ordered, unordered, captured
+
+    ordered, unordered, captured = asyncio.run(main())
+    assert ordered == [0, 1, 2, 3, 4]
+    assert unordered[-1] == 0
+    captured.sort()
+    assert captured[0].response.body == b"/0"
+    assert isinstance(captured[1].error, OSError)
+
+
+def test_map_cancels_in_flight_on_break():
+    async def main():
+        async with serve(delayed) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            results = okie.map([Request("GET", url + "0")] + [Request("GET", url + "1000")] * 3)
+            async for result in results:
+                break
+            await results.aclose()
+            stats = okie.stats()
+            await okie.close_all()
+            return result, stats
+
+    result, stats = asyncio.run(main())
+    assert result.index == 0
+    assert (stats.busy, stats.waiters) == (0, 0)
@@ -0,0 +1,102 @@
+import asyncio
+
+from okie import MultipartBuilder, Okie, Request
+
+from .server import Request as ServerRequest, make_response, serve
+
+
+def test_request_many_pipelines_on_one_connection():
+    async def main():
+        async with serve() as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            responses = await okie.request_many(
+                [Request("GET", url + str(i)) for i in range(20)]
+                + [("POST", url + "post"), ("HEAD", url + "head")]
+            )
+            await okie.close_all()
+            return responses, server.connections
+
+    responses, connections = asyncio.run(main())
+    assert [r.body for r in responses[:20]] == [b"/%d" % i for i in range(20)]
+    assert responses[20].body == b"/post" and responses[21].body == b""
+    assert connections == 3
+
+
+def test_request_many_falls_back_when_server_closes():
+    served = 0
+
+    async def close_after_three(request: ServerRequest) -> bytes:
+        nonlocal served
+        served += 1
+        if served % 3 == 0:
+            request.close = True
+            return make_response(request.url, headers=((b"connection", b"close"),))
+        return make_response(request.url)
+
+    async def main():
+        async with serve(close_after_three) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            responses = await okie.request_many(
+                [("GET", url + str(i)) for i in range(10)], connections=2,
+            )
+            await okie.close_all()
+            return responses
+
+    responses = asyncio.run(main())
+    assert [r.body for r in responses] == [b"/%d" % i for i in range(10)]
+
+
+def test_request_many_falls_back_when_server_resets():
+    served = 0
+
+    async def reset_after_first(request: ServerRequest) -> bytes:
+        nonlocal served
+        served += 1
+        request.reset = served == 1
+        return make_response(request.url)
+
+    async def main():
+        async with serve(reset_after_first) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            responses = await okie.request_many(
+                [("GET", url + str(i)) for i in range(5)], connections=1,
+            )
+            await okie.close_all()
+            return responses
+
+    responses = asyncio.run(main())
+    assert [r.body for r in responses] == [b"/%d" % i for i in range(5)]
+
+
+def test_request_many_doesnt_pipeline_one_shot_bodies():
+    bodies = []
+
+    async def close_after_first(request: ServerRequest) -> bytes:
+        bodies.append(request.body)
+        request.close = len(bodies) == 1
+        return make_response(request.body, headers=((b"connection", b"close"),) * request.close)
+
+    async def chunks():
+        yield b"once"
+
+    async def main():
+        async with serve(close_after_first) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            builder = MultipartBuilder()
+            builder.add_file("file", chunks(), size=4)
+            builder.build()
+            responses = await okie.request_many(
+                [("GET", url + "0"), ("PUT", url, builder), ("GET", url + "1")]
+            )
+            await okie.close_all()
+            return responses
+
+    responses = asyncio.run(main())
+    # the body wasn't written into the pipeline cut after the first response
+    assert sum(body.count(b"once") for body in bodies) == 1
+    assert b"once" in responses[1].body
+    assert responses[0].status_code == responses[2].status_code == 200
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+from okie import Okie, HedgePolicy, RetryPolicy, MultipartBuilder
+from okie.policy import LatencyTracker
+
+from .server import Request, make_response, serve
+
+
+def test_slow_attempt_is_hedged():
+    calls = []
+
+    async def first_is_slow(request: Request) -> bytes:
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return make_response(b"attempt %d" % len(calls))
+
+    async def main():
+        async with serve(first_is_slow) as server:
+            okie = Okie(timeout=5, hedge=HedgePolicy(delay=0.05))
+            started = time.perf_counter()
+            response = await okie.request("GET", "http://127.0.0.1:%d/" % server.port)
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(0)
+            stats = okie.stats()
+            await okie.close_all()
+            return response, elapsed, stats, server.connections
+
+    response, elapsed, stats, connections = asyncio.run(main())
+    assert response.body == b"attempt 2"
+    assert elapsed < 0.5
+    assert connections == 2
+    # the slow attempt's connection isn't pooled
+    assert (stats.idle, stats.closed) == (1, 1)
+
+
+def test_hedge_delay_follows_latency_percentile():
+    hedge = HedgePolicy(delay=0.5, percentile=90, min_samples=10)
+    for latency in range(9):
+        hedge.latencies.record(latency / 100)
+    assert hedge.hedge_delay() == 0.5
+
+    hedge.latencies.record(0.09)
+    assert hedge.hedge_delay() == pytest.approx(0.09)
+
+    tracker = LatencyTracker(window=100)
+    for latency in range(1, 201):
+        tracker.record(latency)
+    assert tracker.percentile(50) == 151
+    assert tracker.percentile(100) == 200
+
+
+def test_reset_connection_is_retried():
+    calls = []
+
+    async def drop_first(request: Request) -> bytes:
+        calls.append(request)
+        if len(calls) == 1:
+            request.close = True
+            return b""
+        return make_response(b"retried")
+
+    async def main():
+        async with serve(drop_first) as server:
+            okie = Okie(timeout=5, retry=RetryPolicy(backoff=0))
+            url = "http://127.0.0.1:%d/" % server.port
+            response = await okie.request("GET", url)
+            with pytest.raises(ConnectionResetError):
+                calls.clear()
+                await okie.request("POST", url)
+            await okie.close_all()
+            return response
+
+    assert asyncio.run(main()).body == b"retried"
+    # POST isn't idempotent, so it's sent once
+    assert len(calls) == 1
+
+
+def test_one_shot_body_is_not_retried():
+    calls = []
+
+    async def drop_first(request: Request) -> bytes:
+        calls.append(request)
+        if len(calls) == 1:
+            request.close = True
+            return b""
+        return make_response(request.body)
+
+    async def chunks():
+        yield b"once"
+
+    async def main():
+        async with serve(drop_first) as server:
+            okie = Okie(timeout=5, retry=RetryPolicy(backoff=0))
+            builder = MultipartBuilder()
+            builder.add_file("file", chunks(), size=4)
+            builder.build()
+            assert not builder.replayable
+            with pytest.raises(ConnectionResetError):
+                await okie.request("PUT", "http://127.0.0.1:%d/" % server.port, data_builder=builder)
+            await okie.close_all()
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_retry_budget_throttles_retries():
+    retry = RetryPolicy(retries=5, max_tokens=4, token_ratio=0.5)
+    error = ConnectionResetError()
+    retry.on_failure()
+    assert retry.can_retry(0, error)
+    retry.on_failure()
+    assert not retry.can_retry(1, error)
+    assert not retry.can_retry(0, ValueError())
+
+    retry.on_success()
+    assert retry.can_retry(1, error)
+    assert not retry.can_retry(5, error)
+    assert 0 <= retry.backoff_delay(3) <= min(retry.max_backoff, retry.backoff * 8)
@@ -0,0 +1,132 @@
+import asyncio
+
+from okie import Okie
+
+from .server import Request, make_response, serve
+
+
+def test_concurrent_requests_scale_with_limits():
+    in_flight = peak = 0
+
+    async def slow(request: Request) -> bytes:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return make_response(b"ok")
+
+    async def main():
+        async with serve(slow) as server:
+            okie = Okie(timeout=5, max_connections_per_origin=4)
+            url = "http://127.0.0.1:%d/" % server.port
+            responses = await asyncio.gather(
+                *(okie.request("GET", url) for _ in range(12))
+            )
+            await okie.close_all()
+            return responses, server.connections
+
+    responses, connections = asyncio.run(main())
+    assert [r.body for r in responses] == [b"ok"] * 12
+    assert peak == 4
+    assert connections == 4
+
+
+def test_streams_are_pooled_per_origin():
+    async def main():
+        async with serve() as first, serve() as second:
+            okie = Okie(timeout=5)
+            for _ in range(3):
+                for server in (first, second):
+                    url = "http://127.0.0.1:%d/%d" % (server.port, server.port)
+                    response = await okie.request("GET", url)
+                    assert response.body == b"/%d" % server.port
+            await okie.close_all()
+            return first.connections, second.connections
+
+    assert asyncio.run(main()) == (1, 1)
+
+
+def test_global_limit_and_fifo_waiters():
+    order = []
+
+    async def main():
+        okie = Okie(timeout=5, max_connections=1)
+        origin = (b"http", b"a", 80)
+        await okie._acquire_slot(origin)
+
+        async def wait(i):
+            await okie._acquire_slot((b"http", b"host%d" % i, 80))
+            order.append(i)
+
+        tasks = [asyncio.ensure_future(wait(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert okie._in_use_count == 1 and len(okie._waiters) == 3
+
+        tasks[1].cancel()
+        okie._release_slot(origin)
+        for i in (0, 2):
+            await tasks[i]
+            okie._release_slot((b"http", b"host%d" % i, 80))
+        assert okie._in_use_count == 0 and not okie._waiters
+
+    asyncio.run(main())
+    assert order == [0, 2]
+
+
+def test_connection_close_is_not_reused():
+    async def close(request: Request) -> bytes:
+        return make_response(b"bye", headers=((b"connection", b"close"),))
+
+    async def main():
+        async with serve(close) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            for _ in range(3):
+                assert (await okie.request("GET", url)).body == b"bye"
+            assert okie._idle_count == 0
+            return server.connections
+
+    assert asyncio.run(main()) == 3
+
+
+def test_expired_connections_are_recycled():
+    async def main():
+        async with serve() as server:
+            url = "http://127.0.0.1:%d/" % server.port
+
+            okie = Okie(timeout=5, max_connection_requests=2)
+            for _ in range(4):
+                await okie.request("GET", url)
+            await okie.close_all()
+            assert server.connections == 2
+
+            okie = Okie(timeout=5, keepalive_timeout=0.01)
+            await okie.request("GET", url)
+            await asyncio.sleep(0.05)
+            await okie.request("GET", url)
+            await okie.close_all()
+            assert server.connections == 4
+
+    asyncio.run(main())
+
+
+def test_failed_exchange_is_not_reused():
+    async def main():
+        async with serve() as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+            try:
+                async with okie.make_connection(b"127.0.0.1", server.port, False):
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            assert okie._idle_count == 0
+            await okie.request("GET", url)
+            async with okie.make_connection(b"127.0.0.1", server.port, False) as conn:
+                assert conn.requests == 1
+                conn.reusable = True
+            assert okie._idle_count == 1
+            await okie.close_all()
+
+    asyncio.run(main())
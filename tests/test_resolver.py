@@ -0,0 +1,74 @@
+import asyncio
+import socket
+
+import pytest
+
+from okie import Okie
+from okie.ctrl import CachingResolver, Resolver
+from okie.ctrl.asyncio import connect_socket
+from okie.ctrl.resolver import resolve_literal
+
+from .server import serve
+
+
+class CountingResolver(Resolver):
+    def __init__(self):
+        self.lookups = 0
+
+    async def resolve(self, host, port):
+        self.lookups += 1
+        await asyncio.sleep(0.01)
+        if host == "missing.invalid":
+            raise socket.gaierror(socket.EAI_NONAME, "not found")
+        return resolve_literal("127.0.0.1", port)
+
+
+def test_caching_resolver_deduplicates_and_expires():
+    async def main():
+        counting = CountingResolver()
+        resolver = CachingResolver(counting, ttl=0.05, negative_ttl=0.05)
+
+        results = await asyncio.gather(*(resolver.resolve("example", 80) for _ in range(10)))
+        assert counting.lookups == 1 and all(r == results[0] for r in results)
+        await resolver.resolve("example", 80)
+        assert counting.lookups == 1
+
+        for _ in range(2):
+            with pytest.raises(socket.gaierror):
+                await resolver.resolve("missing.invalid", 80)
+        assert counting.lookups == 2
+
+        await asyncio.sleep(0.06)
+        await resolver.resolve("example", 80)
+        assert counting.lookups == 3
+
+    asyncio.run(main())
+
+
+def test_connect_falls_over_to_next_address():
+    async def main():
+        async with serve() as server:
+            closed = socket.socket()
+            closed.bind(("127.0.0.1", 0))
+            dead_port = closed.getsockname()[1]
+            closed.close()
+
+            addresses = resolve_literal("127.0.0.1", dead_port) + resolve_literal("127.0.0.1", server.port)
+            for delay in (None, 0.01):
+                sock = await connect_socket(addresses, delay)
+                assert sock.getpeername()[1] == server.port
+                sock.close()
+
+            with pytest.raises(OSError):
+                await connect_socket(addresses[:1], 0.01)
+
+            connections = server.connections
+            counting = CountingResolver()
+            okie = Okie(timeout=5, resolver=CachingResolver(counting), keepalive_timeout=0)
+            for _ in range(3):
+                response = await okie.request("GET", "http://localhost:%d/x" % server.port)
+                assert response.body == b"/x"
+            assert counting.lookups == 1 and server.connections - connections == 3
+            await okie.close_all()
+
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+import asyncio
+import io
+
+from okie import Okie
+
+from .server import Request, make_response, serve
+
+PAYLOAD = bytes(range(256)) * 4096
+
+
+async def large(request: Request) -> bytes:
+    return make_response(PAYLOAD)
+
+
+def test_stream_body_in_chunks():
+    async def main():
+        async with serve(large) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+
+            response = await okie.request("GET", url, stream=True)
+            assert response.body is None
+            assert okie._in_use_count == 1
+
+            chunks = [chunk async for chunk in response]
+            assert len(chunks) > 1
+            assert b"".join(chunks) == PAYLOAD
+            assert okie._in_use_count == 0 and okie._idle_count == 1
+
+            response = await okie.request("GET", url, stream=True)
+            buffer = io.BytesIO()
+            assert await response.save(buffer) == len(PAYLOAD)
+            assert buffer.getvalue() == PAYLOAD
+
+            await okie.close_all()
+            return server.connections
+
+    assert asyncio.run(main()) == 1
+
+
+def test_discarded_stream_is_not_reused():
+    async def main():
+        async with serve(large) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/" % server.port
+
+            async with await okie.request("GET", url, stream=True) as response:
+                assert response.status_code == 200
+            assert okie._in_use_count == 0 and okie._idle_count == 0
+
+            assert (await okie.request("GET", url)).body == PAYLOAD
+            await okie.close_all()
+            return server.connections
+
+    assert asyncio.run(main()) == 2
+
+
+def test_response_framings():
+    async def framed(request: Request) -> bytes:
+        path = request.url
+        if path == b"/chunked":
+            return (
+                b"HTTP/1.1 200 OK\r\ntransfer-encoding: chunked\r\n\r\n"
+                b"5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n"
+            )
+        if path == b"/interim":
+            return b"HTTP/1.1 100 Continue\r\n\r\n" + make_response(b"final")
+        if path == b"/empty":
+            return b"HTTP/1.1 204 No Content\r\n\r\n"
+        if path == b"/close":
+            request.close = True
+            return b"HTTP/1.1 200 OK\r\n\r\nuntil the end"
+        return make_response(b"x" * 10)
+
+    async def main():
+        async with serve(framed) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d" % server.port
+
+            response = await okie.request("GET", url + "/chunked")
+            assert response.body == b"hello world" and len(response) == 11
+            response = await okie.request("GET", url + "/interim")
+            assert response.status_code == 200 and response.body == b"final"
+            response = await okie.request("GET", url + "/empty")
+            assert response.status_code == 204 and response.body == b""
+            response = await okie.request("HEAD", url + "/")
+            assert response.body == b"" and len(response) == 10
+            assert server.connections == 1
+
+            response = await okie.request("GET", url + "/close")
+            assert response.body == b"until the end"
+            assert okie._idle_count == 0
+            await okie.close_all()
+
+    asyncio.run(main())
+
+
+def test_lazy_headers_and_decoding():
+    async def typed(request: Request) -> bytes:
+        if request.url == b"/latin":
+            return make_response(
+                "{\"name\": \"café\"}".encode("latin-1"),
+                headers=((b"Content-Type", b'application/json; charset="ISO-8859-1"'),),
+            )
+        return make_response(
+            "{\"name\": \"café\"}".encode(),
+            headers=((b"Content-Type", b"application/json"), (b"Set-Cookie", b"a=1"), (b"Set-Cookie", b"b=2")),
+        )
+
+    async def main():
+        async with serve(typed) as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d" % server.port
+
+            response = await okie.request("GET", url + "/utf")
+            assert response._headers is None
+            assert (b"Content-Type", b"application/json") in response.raw_headers
+            assert response.headers.getall("set-cookie") == ["a=1", "b=2"]
+            assert response.charset is None
+            assert await response.json() == {"name": "café"}
+
+            response = await okie.request("GET", url + "/latin", stream=True)
+            assert response.charset == "ISO-8859-1"
+            assert await response.text() == "{\"name\": \"café\"}"
+            assert await response.json() == {"name": "café"}
+            await okie.close_all()
+
+    asyncio.run(main())
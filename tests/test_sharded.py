@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from okie import ShardedOkie, FormURLEncodedBuilder, Request
+
+from .server import Request as ServerRequest, make_response, serve
+
+LARGE = b"x" * (2 ** 16 + 1)
+
+
+async def handler(request: ServerRequest) -> bytes:
+    if request.url == b"/large":
+        return make_response(LARGE)
+    return make_response(request.body or request.url, headers=((b"X-Url", request.url),))
+
+
+def test_requests_are_spread_over_workers():
+    async def main():
+        async with serve(handler) as server:
+            url = "http://127.0.0.1:%d" % server.port
+            async with ShardedOkie(workers=2, timeout=5, shm_threshold=2 ** 16) as okie:
+                builder = FormURLEncodedBuilder()
+                builder.add_field("a", "b")
+                builder.build()
+
+                posted = await okie.request("POST", url + "/form", data_builder=builder)
+                many = await okie.request_many(
+                    Request("GET", url + "/items", params={"page": i}) for i in range(10)
+                )
+                large = await okie.request("GET", url + "/large")
+                with pytest.raises(OSError):
+                    await okie.request("GET", "http://127.0.0.1:1/")
+            return posted, many, large, server.connections
+
+    posted, many, large, connections = asyncio.run(main())
+    assert posted.body == b"a=b" and posted.status_code == 200
+    assert [r.body for r in many] == [b"/items?page=%d" % i for i in range(10)]
+    assert many[0].headers["x-url"] == "/items?page=0"
+    assert large.body == LARGE
+    # every worker has its own pool
+    assert connections >= 2
+
+
+def test_dead_worker_is_left_out():
+    async def main():
+        async with serve(handler) as server:
+            url = "http://127.0.0.1:%d" % server.port
+            async with ShardedOkie(workers=2, timeout=5) as okie:
+                dead = okie._workers[0]
+                dead.process.kill()
+                await asyncio.wait_for(dead.reading, 5)
+
+                responses = await okie.request_many(("GET", url + "/%d" % i) for i in range(4))
+                alive = len(okie._workers)
+
+                okie._workers[0].process.kill()
+                await asyncio.wait_for(okie._workers[0].reading, 5)
+                with pytest.raises(ConnectionResetError):
+                    await okie.request("GET", url + "/")
+            return responses, alive
+
+    responses, alive = asyncio.run(main())
+    assert [r.body for r in responses] == [b"/%d" % i for i in range(4)]
+    assert alive == 1
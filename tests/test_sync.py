@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+import pytest
+
+from okie import SyncOkie
+
+from .server import serve
+
+
+def test_threads_share_one_pool():
+    ready = threading.Event()
+    stop = threading.Event()
+    state = {}
+
+    def run_server():
+        async def main():
+            async with serve() as server:
+                state["server"] = server
+                ready.set()
+                while not stop.is_set():
+                    await asyncio.sleep(0.01)
+
+        asyncio.run(main())
+
+    thread = threading.Thread(target=run_server)
+    thread.start()
+    ready.wait()
+    server = state["server"]
+    url = "http://127.0.0.1:%d/" % server.port
+
+    try:
+        with SyncOkie(timeout=5, max_connections_per_origin=4) as okie:
+            assert okie.request("GET", url + "first").body == b"/first"
+
+            results = {}
+
+            def worker(i: int):
+                futures = [okie.submit("GET", url + "%d/%d" % (i, j)) for j in range(10)]
+                results[i] = [f.result().body for f in futures]
+
+            workers = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+
+            with pytest.raises(OSError):
+                okie.request("GET", "http://127.0.0.1:1/")
+    finally:
+        stop.set()
+        thread.join()
+
+    assert results == {i: [b"/%d/%d" % (i, j) for j in range(10)] for i in range(8)}
+    assert server.connections <= 4
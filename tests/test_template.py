@@ -0,0 +1,66 @@
+import asyncio
+
+from okie import Okie, Headers, FormURLEncodedBuilder, ResponseCache, RetryPolicy
+
+from .server import Request, make_response, serve
+
+
+def test_template_sends_static_and_extra_headers():
+    received = []
+
+    async def record(request: Request) -> bytes:
+        received.append(request)
+        return make_response(request.body or b"empty")
+
+    async def main():
+        async with serve(record) as server:
+            okie = Okie(timeout=5, headers=Headers({"X-Default": "1"}))
+            template = okie.prepare(
+                "POST", "http://127.0.0.1:%d/items" % server.port,
+                headers=Headers({"X-Api-Key": "secret"}),
+            )
+
+            builder = FormURLEncodedBuilder()
+            builder.add_field("a", "b")
+            builder.build()
+            first = await template.send(body_builder=builder)
+            second = await template.send(extra_headers=Headers({"X-Trace": "2"}))
+            await okie.close_all()
+            return first, second, server.connections
+
+    first, second, connections = asyncio.run(main())
+    assert (first.body, second.body) == (b"a=b", b"empty")
+    assert connections == 1
+
+    for request in received:
+        assert (request.method, request.url) == ("POST", b"/items")
+        assert request.header(b"x-api-key") == b"secret"
+        assert request.header(b"x-default") == b"1"
+        assert request.header(b"host") == b"127.0.0.1"
+    assert received[0].header(b"content-type") == b"application/x-www-form-urlencoded"
+    assert received[1].header(b"x-trace") == b"2"
+    assert received[1].header(b"content-length") is None
+
+
+def test_template_goes_through_cache_and_retry():
+    received = []
+
+    async def handler(request: Request) -> bytes:
+        received.append(request)
+        if len(received) == 1:
+            request.close = True
+            return b""
+        return make_response(b"cached", headers=((b"cache-control", b"max-age=60"),))
+
+    async def main():
+        async with serve(handler) as server:
+            okie = Okie(timeout=5, cache=ResponseCache(), retry=RetryPolicy(backoff=0))
+            template = okie.prepare("GET", "http://127.0.0.1:%d/item" % server.port)
+            responses = [await template.send(), await template.send()]
+            await okie.close_all()
+            return responses
+
+    responses = asyncio.run(main())
+    assert [r.body for r in responses] == [b"cached", b"cached"]
+    # the dropped attempt was retried, the second send was served from the cache
+    assert len(received) == 2
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from okie import Okie, Timeout
+from okie.ctrl.asyncio import call_with_timeout
+
+from .server import Request, make_response, serve
+
+
+def test_call_with_timeout_runs_in_current_task():
+    async def current():
+        return asyncio.current_task()
+
+    async def main():
+        assert await call_with_timeout(current(), 1) is asyncio.current_task()
+        with pytest.raises(asyncio.TimeoutError):
+            await call_with_timeout(asyncio.sleep(1), 0.01)
+        # the task isn't left cancelled
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+
+def test_outer_cancellation_is_not_turned_into_timeout():
+    async def main():
+        task = asyncio.ensure_future(call_with_timeout(asyncio.sleep(1), 0.5))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+
+def test_read_timeout_discards_connection():
+    async def stall(request: Request) -> bytes:
+        if request.url == b"/stall":
+            # headers and part of the body, the rest never comes
+            await asyncio.sleep(0)
+            return b"HTTP/1.1 200 OK\r\ncontent-length: 10\r\n\r\nabc"
+        return make_response(b"ok")
+
+    async def main():
+        async with serve(stall) as server:
+            okie = Okie(timeout=Timeout(total=5, read=0.05))
+            url = "http://127.0.0.1:%d" % server.port
+            with pytest.raises(asyncio.TimeoutError):
+                await okie.request("GET", url + "/stall")
+            stats = okie.stats()
+            response = await okie.request("GET", url + "/")
+            await okie.close_all()
+            return stats, response, server.connections
+
+    stats, response, connections = asyncio.run(main())
+    assert (stats.idle, stats.busy, stats.closed) == (0, 0, 1)
+    assert response.body == b"ok"
+    assert connections == 2
+
+
+def test_pool_timeout_is_separate_from_total():
+    async def main():
+        async with serve() as server:
+            okie = Okie(timeout=5, max_connections=1)
+            url = "http://127.0.0.1:%d/" % server.port
+            held = await okie.request("GET", url, stream=True)
+            with pytest.raises(asyncio.TimeoutError):
+                await okie.request("GET", url, timeout=Timeout(total=5, pool=0.05))
+            assert await held.read() == b"/"
+            # plain number overrides only the total timeout
+            response = await okie.request("GET", url, timeout=1)
+            await okie.close_all()
+            return response
+
+    assert asyncio.run(main()).body == b"/"
@@ -0,0 +1,68 @@
+import asyncio
+import shutil
+import ssl
+import subprocess
+
+import pytest
+
+from okie import Okie
+from okie.ctrl import make_ssl_context
+
+from .server import serve
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is required to make a certificate")
+
+    path = tmp_path_factory.mktemp("tls")
+    cert, key = path / "cert.pem", path / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+            "-keyout", str(key), "-out", str(cert),
+        ],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def test_sessions_are_resumed(certificate):
+    cert, key = certificate
+    server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_context.load_cert_chain(cert, key)
+
+    async def main():
+        async with serve(ssl=server_context) as server:
+            okie = Okie(timeout=5, ssl_context=make_ssl_context(cafile=cert))
+            url = "https://localhost:%d/tls" % server.port
+            reused = []
+            for _ in range(3):
+                async with okie.make_connection(b"localhost", server.port, True) as conn:
+                    reused.append(conn.writer.get_extra_info("ssl_object").session_reused)
+                    conn.close()
+                # session is taken from the completed exchange
+                assert (await okie.request("GET", url)).body == b"/tls"
+                for idle in okie._idle_connections.values():
+                    for connection in idle:
+                        connection.close()
+            await okie.close_all()
+            return reused
+
+    assert asyncio.run(main()) == [False, True, True]
+
+
+def test_unknown_ca_is_rejected(certificate):
+    cert, key = certificate
+    server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_context.load_cert_chain(cert, key)
+
+    async def main():
+        async with serve(ssl=server_context) as server:
+            okie = Okie(timeout=5)
+            with pytest.raises(ssl.SSLCertVerificationError):
+                await okie.request("GET", "https://localhost:%d/" % server.port)
+
+    asyncio.run(main())
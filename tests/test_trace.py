@@ -0,0 +1,79 @@
+import asyncio
+
+from okie import Okie, Tracer
+
+from .server import Request, serve
+
+
+class Recorder(Tracer):
+    def __init__(self):
+        self.events = []
+
+    def on_pool_wait(self, origin, waited):
+        self.events.append("pool_wait")
+
+    def on_connect_start(self, origin):
+        self.events.append("connect_start")
+
+    def on_connect_end(self, origin, error):
+        self.events.append("connect_end")
+
+    def on_request_sent(self, method, url):
+        self.events.append("sent")
+
+    def on_first_byte(self, response):
+        self.events.append("first_byte")
+
+    def on_complete(self, response):
+        self.events.append("complete")
+
+    def on_error(self, url, error):
+        self.events.append("error")
+
+
+def test_hooks_timings_and_stats():
+    tracer = Recorder()
+
+    async def main():
+        async with serve() as server:
+            okie = Okie(timeout=5, tracer=tracer)
+            url = "http://127.0.0.1:%d/" % server.port
+            first = await okie.request("GET", url)
+            second = await okie.request("GET", url)
+            stats = okie.stats()
+            await okie.close_all()
+            return first, second, stats
+
+    first, second, stats = asyncio.run(main())
+    assert tracer.events == [
+        "connect_start", "connect_end", "sent", "first_byte", "complete",
+        "sent", "first_byte", "complete",
+    ]
+    assert first.timings.connect is not None and first.timings.total >= first.timings.ttfb
+    assert second.timings.connect is None and second.timings.total is not None
+    assert (stats.idle, stats.busy, stats.waiters) == (1, 0, 0)
+    assert (stats.created, stats.closed, stats.reused) == (1, 0, 1)
+
+
+def test_pool_wait_and_error_hooks():
+    tracer = Recorder()
+
+    async def hang_up(request: Request):
+        raise ConnectionResetError
+
+    async def main():
+        async with serve(hang_up) as server:
+            okie = Okie(timeout=5, max_connections=1, tracer=tracer)
+            url = "http://127.0.0.1:%d/" % server.port
+            results = await asyncio.gather(
+                *(okie.request("GET", url) for _ in range(2)), return_exceptions=True,
+            )
+            stats = okie.stats()
+            await okie.close_all()
+            return results, stats
+
+    results, stats = asyncio.run(main())
+    assert all(isinstance(result, Exception) for result in results)
+    assert tracer.events.count("error") == 2
+    assert "pool_wait" in tracer.events
+    assert stats.created == stats.closed == 2
@@ -0,0 +1,45 @@
+from okie import Headers, header_key
+from okie._builders.utils import encode_headers
+
+
+def test_header_key():
+    key = header_key("Accept-Encoding")
+    assert key == "accept-encoding" and key == "ACCEPT-ENCODING"
+    assert key != "accept"
+    assert "ENCODING" in key
+    assert {key: 1}["accept-encoding"] == 1
+
+
+def test_headers_lookup_and_multiple_values():
+    headers = Headers({"Content-Type": "text/plain"})
+    headers.add("Set-Cookie", "a=1")
+    headers.add("set-cookie", "b=2")
+
+    assert headers["content-type"] == headers["CONTENT-TYPE"] == "text/plain"
+    assert "Set-Cookie" in headers and "x" not in headers
+    assert headers.getall("SET-COOKIE") == ["a=1", "b=2"]
+    assert headers["set-cookie"] == "a=1, b=2"
+    assert list(headers) == ["content-type", "set-cookie"]
+    assert encode_headers(headers) == (
+        b"Content-Type: text/plain\r\nSet-Cookie: a=1\r\nSet-Cookie: b=2"
+    )
+
+    headers["set-cookie"] = "c=3"
+    assert headers.getall("set-cookie") == ["c=3"]
+    del headers["SET-COOKIE"]
+    assert len(headers) == 1
+
+
+def test_headers_copy_on_write_merge():
+    defaults = Headers({"Accept": "*/*", "User-Agent": "okie"})
+    merged = defaults.get_merged(Headers({"accept": "text/html", "X-Id": "1"}))
+    assert dict(merged) == {"accept": "*/*", "x-id": "1", "user-agent": "okie"}
+
+    copy = defaults.get_merged(None)
+    copy["accept"] = "text/html"
+    copy.add("x-id", "2")
+    assert defaults["accept"] == "*/*" and "x-id" not in defaults
+    assert copy["accept"] == "text/html"
+
+    defaults["accept"] = "application/json"
+    assert merged["accept"] == "*/*"
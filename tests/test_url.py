@@ -0,0 +1,49 @@
+import asyncio
+
+from okie import Okie, Query, Request as OkieRequest
+from okie.url import encode_query, parse_url, with_query
+
+from .server import serve
+
+
+def test_parse_url_keeps_query_and_drops_fragment():
+    parsed = parse_url("https://Example.com/items?page=2#top")
+    assert parsed.target == b"/items?page=2"
+    assert parsed.origin == (b"https", b"example.com", 443)
+    assert parse_url("http://example.com").target == b"/"
+
+    hits = parse_url.cache_info().hits
+    assert parse_url("https://Example.com/items?page=2#top") is parsed
+    assert parse_url.cache_info().hits == hits + 1
+
+
+def test_encode_query():
+    assert encode_query({"q": "a b&c", "page": 2}) == b"q=a+b%26c&page=2"
+    assert encode_query([("id", 1), ("id", 2)]) == encode_query({"id": [1, 2]}) == b"id=1&id=2"
+    assert encode_query(Query({"a": "1"})) == encode_query("a=1") == b"a=1"
+    assert encode_query(None) == encode_query({}) == b""
+
+    assert with_query(b"/items", {"a": 1}) == b"/items?a=1"
+    assert with_query(b"/items?a=1", Query({"b": 2})) == b"/items?a=1&b=2"
+    assert with_query(b"/items", None) == b"/items"
+
+
+def test_requests_send_query():
+    async def main():
+        async with serve() as server:
+            okie = Okie(timeout=5)
+            url = "http://127.0.0.1:%d/items?sort=id#frag" % server.port
+            page = Query({"per_page": 100})
+
+            single = await okie.request("GET", url, params=page)
+            many = await okie.request_many([
+                OkieRequest("GET", url, params={"page": i}) for i in range(3)
+            ])
+            template = okie.prepare("GET", url, params=page)
+            templated = await template.send()
+            await okie.close_all()
+            return single, many, templated
+
+    single, many, templated = asyncio.run(main())
+    assert single.body == templated.body == b"/items?sort=id&per_page=100"
+    assert [r.body for r in many] == [b"/items?sort=id&page=%d" % i for i in range(3)]